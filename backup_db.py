@@ -1,24 +1,95 @@
 # backup_db.py
-import os, zipfile, datetime, shutil
+"""
+Incremental backups of the SQLite database and uploads (see journal/backup.py).
+
+  python backup_db.py                       # new snapshot into backups/
+  python backup_db.py create --prune        # ... then apply retention
+  python backup_db.py list
+  python backup_db.py verify [SNAPSHOT]     # default: latest
+  python backup_db.py restore SNAPSHOT --target restored/
+  python backup_db.py prune --keep-daily 7 --keep-weekly 4 [--dry-run]
+
+BACKUP_DIR overrides the repository location (default: backups/ next to this file).
+"""
+import argparse
+import os
+
+from sqlalchemy.engine import make_url
+
+from journal import create_app
+from journal.backup import (BackupError, create_backup, list_snapshots, load_manifest,
+                            prune, restore, verify)
 
 ROOT = os.path.dirname(os.path.abspath(__file__))
-INSTANCE = os.path.join(ROOT, "instance")
-DB = os.path.join(INSTANCE, "database.db")
-UPLOADS = os.path.join(INSTANCE, "uploads")
-BACKUPS = os.path.join(ROOT, "backups")
-os.makedirs(BACKUPS, exist_ok=True)
-
-stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
-out_zip = os.path.join(BACKUPS, f"backup-{stamp}.zip")
-
-with zipfile.ZipFile(out_zip, "w", compression=zipfile.ZIP_DEFLATED) as z:
-    if os.path.exists(DB):
-        z.write(DB, arcname="database.db")
-    if os.path.isdir(UPLOADS):
-        for root, _, files in os.walk(UPLOADS):
-            for f in files:
-                full_path = os.path.join(root, f)
-                rel = os.path.relpath(full_path, INSTANCE)  # uploads/...
-                z.write(full_path, arcname=rel)
-
-print(f"✅ Backup written: {out_zip}")
+
+
+def _sources():
+    app = create_app()
+    url = make_url(app.config["SQLALCHEMY_DATABASE_URI"])
+    if url.get_backend_name() != "sqlite":
+        raise SystemExit(f"❌ Only SQLite databases are backed up here (dialect: {url.get_backend_name()}); "
+                         "use pg_dump for PostgreSQL.")
+    return os.path.abspath(url.database), app.config["UPLOAD_FOLDER"]
+
+
+def main():
+    p = argparse.ArgumentParser(description="Incremental database + uploads backups.")
+    p.add_argument("--repo", default=os.getenv("BACKUP_DIR") or os.path.join(ROOT, "backups"))
+    sub = p.add_subparsers(dest="cmd")
+
+    c = sub.add_parser("create", help="Take a snapshot (the default)")
+    c.add_argument("--workers", type=int, default=None, help="Compression processes (default: cores)")
+    c.add_argument("--level", type=int, default=6, help="zlib level for new chunks")
+    c.add_argument("--prune", action="store_true", help="Apply retention afterwards")
+
+    sub.add_parser("list", help="List snapshots")
+
+    v = sub.add_parser("verify", help="Check every chunk of a snapshot")
+    v.add_argument("snapshot", nargs="?")
+
+    r = sub.add_parser("restore", help="Rebuild a snapshot into a directory")
+    r.add_argument("snapshot")
+    r.add_argument("--target", required=True, help="Empty directory to restore into")
+
+    pr = sub.add_parser("prune", help="Drop old snapshots and unreferenced chunks")
+    pr.add_argument("--dry-run", action="store_true")
+    for name, default in (("--keep-last", 3), ("--keep-daily", 7), ("--keep-weekly", 4)):
+        for q in (pr, c):
+            q.add_argument(name, type=int, default=default)
+    args = p.parse_args()
+    cmd = args.cmd or "create"
+
+    try:
+        if cmd == "create":
+            db_path, uploads = _sources()
+            m = create_backup(args.repo, db_path, uploads, workers=getattr(args, "workers", None),
+                              level=getattr(args, "level", 6))
+            print(f"✅ Backup written: {os.path.join(args.repo, 'snapshots', m['name'] + '.json')}")
+            if getattr(args, "prune", False):
+                prune(args.repo, args.keep_last, args.keep_daily, args.keep_weekly)
+        elif cmd == "list":
+            for name in list_snapshots(args.repo):
+                files = load_manifest(args.repo, name)["files"]
+                size = sum(e["size"] for e in files.values())
+                print(f"{name}  {len(files):6d} file(s)  {size / 1048576:10.1f} MiB")
+        elif cmd == "verify":
+            names = list_snapshots(args.repo)
+            name = args.snapshot or (names[-1] if names else None)
+            if not name:
+                raise SystemExit("❌ No snapshots yet.")
+            verify(args.repo, name)
+            print(f"✅ {name} is intact.")
+        elif cmd == "restore":
+            if os.path.isdir(args.target) and os.listdir(args.target):
+                raise SystemExit(f"❌ {args.target} is not empty.")
+            db_path = restore(args.repo, args.snapshot, args.target)
+            print(f"✅ Restored. Point DATABASE_URL at sqlite:///{db_path} and UPLOAD_FOLDER at "
+                  f"{os.path.join(os.path.abspath(args.target), 'uploads')}, or copy them into instance/.")
+        elif cmd == "prune":
+            prune(args.repo, args.keep_last, args.keep_daily, args.keep_weekly, dry_run=args.dry_run)
+    except BackupError as e:
+        raise SystemExit(f"❌ {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,20 @@
 # delete_user.py
+"""
+Delete a user safely (with reassignment or cascade), or a batch of users
+(see journal/accounts.py):
+
+  python delete_user.py --id 12 --reassign-to-id 3
+  python delete_user.py --batch spam.csv --delete-submissions --delete-reviews --dry-run
+  python delete_user.py --batch leavers.csv --reassign-to-id 3 --force
+
+A batch file lists one user id per line, optionally followed by the id that
+receives their content (id,reassign_to_id); --reassign-to-id fills the blanks.
+"""
 import sys
 import argparse
 from journal import create_app, db
-from journal.models import User, Submission, Review
+from journal.accounts import CHUNK, AccountError, check_deletes, delete_users, load_mapping, totals
+from journal.models import User
 
 def parse_args():
     p = argparse.ArgumentParser(
@@ -12,6 +24,8 @@ def parse_args():
     g.add_argument("--id", type=int, help="User ID to delete")
     g.add_argument("--email", help="User email to delete")
     g.add_argument("--username", help="User username to delete")
+    g.add_argument("--batch", metavar="FILE",
+                   help="CSV or JSON of user ids to delete (id[,reassign_to_id] per line)")
 
     p.add_argument("--reassign-to-id", type=int,
                    help="User ID that will receive all authored submissions and reviews")
@@ -19,107 +33,75 @@ def parse_args():
                    help="Delete this user's authored submissions instead of reassigning")
     p.add_argument("--delete-reviews", action="store_true",
                    help="Delete this user's reviews instead of reassigning")
+    p.add_argument("--chunk-size", type=int, default=CHUNK,
+                   help=f"Users per transaction in batch mode (default {CHUNK})")
+    p.add_argument("--dry-run", action="store_true", help="Report what would happen, change nothing")
 
     p.add_argument("--force", action="store_true",
                    help="Do not prompt for confirmation")
     return p.parse_args()
 
+def _target_mapping(args):
+    if args.batch:
+        mapping = load_mapping(args.batch, blank_ok=True)
+        return {uid: to if to is not None else args.reassign_to_id for uid, to in mapping.items()}
+
+    # locate target user
+    q = User.query
+    if args.id is not None:
+        target = db.session.get(User, args.id)
+    elif args.email:
+        target = q.filter_by(email=args.email).first()
+    else:
+        target = q.filter_by(username=args.username).first()
+    if not target:
+        raise AccountError("Target user not found.")
+    if args.reassign_to_id == target.id:
+        raise AccountError("--reassign-to-id cannot be the same as the target user.")
+    return {target.id: args.reassign_to_id}
+
 def main():
     args = parse_args()
 
     app = create_app()
     with app.app_context():
-        # locate target user
-        q = User.query
-        if args.id is not None:
-            target = q.get(args.id)
-        elif args.email:
-            target = q.filter_by(email=args.email).first()
-        else:
-            target = q.filter_by(username=args.username).first()
-
-        if not target:
-            print("❌ Target user not found.")
+        try:
+            mapping = _target_mapping(args)
+            users, counts = check_deletes(mapping, args.delete_submissions, args.delete_reviews)
+        except (AccountError, OSError, ValueError) as e:
+            print(f"❌ {e}")
             sys.exit(1)
 
-        if target.role == "admin":
-            print("❌ Refusing to delete an admin account. Demote first if intentional.")
-            sys.exit(1)
-
-        # resolve reassignment user if provided
-        reassign_to = None
-        if args.reassign_to_id:
-            if args.reassign_to_id == target.id:
-                print("❌ --reassign-to-id cannot be the same as the target user.")
-                sys.exit(1)
-            reassign_to = User.query.get(args.reassign_to_id)
-            if not reassign_to:
-                print("❌ Reassignment user not found.")
-                sys.exit(1)
-
-        # sanity: require a strategy for submissions AND reviews
-        authored_count = Submission.query.filter_by(author_id=target.id).count()
-        reviews_count  = Review.query.filter_by(reviewer_id=target.id).count()
-
-        if authored_count:
-            if not (args.reassign_to_id or args.delete_submissions):
-                print(f"❌ User authored {authored_count} submission(s). "
-                      f"Provide --reassign-to-id or --delete-submissions.")
-                sys.exit(1)
-
-        if reviews_count:
-            if not (args.reassign_to_id or args.delete_reviews):
-                print(f"❌ User wrote {reviews_count} review(s). "
-                      f"Provide --reassign-to-id or --delete-reviews.")
-                sys.exit(1)
-
         # summary
-        print("About to delete user:")
-        print(f"  ID={target.id}  username={target.username}  email={target.email}  role={target.role}")
-        print(f"  Authored submissions: {authored_count}")
-        print(f"  Reviews: {reviews_count}")
-        if reassign_to:
-            print(f"  Reassigning to ID={reassign_to.id} ({reassign_to.username})")
+        print(f"About to delete {len(mapping)} user(s):")
+        for uid in list(mapping)[:20]:
+            u, c, to = users[uid], counts[uid], mapping[uid]
+            print(f"  ID={u.id}  username={u.username}  email={u.email}  role={u.role.value}  "
+                  f"submissions={c['authored']}  reviews={c['reviews']}  assigned={c['assigned']}"
+                  + (f"  → ID={to} ({users[to].username})" if to else ""))
+        if len(mapping) > 20:
+            print(f"  ... and {len(mapping) - 20} more")
+        t = totals(counts)
+        print(f"  Total: {t['authored']} submission(s), {t['reviews']} review(s), "
+              f"{t['assigned']} reviewer assignment(s) cleared, {t['panels']} panel seat(s) freed")
         if args.delete_submissions:
             print("  Will DELETE authored submissions.")
         if args.delete_reviews:
             print("  Will DELETE reviews.")
 
+        if args.dry_run:
+            print("Dry run: nothing changed.")
+            sys.exit(0)
+
         if not args.force:
             ok = input("Proceed? Type 'yes' to confirm: ").strip().lower() == "yes"
             if not ok:
                 print("Aborted.")
                 sys.exit(0)
 
-        # perform updates
-        if authored_count:
-            if args.delete_submissions:
-                Submission.query.filter_by(author_id=target.id).delete(synchronize_session=False)
-            else:
-                Submission.query.filter_by(author_id=target.id).update(
-                    {Submission.author_id: reassign_to.id}, synchronize_session=False
-                )
-
-        if reviews_count:
-            if args.delete_reviews:
-                Review.query.filter_by(reviewer_id=target.id).delete(synchronize_session=False)
-            else:
-                Review.query.filter_by(reviewer_id=target.id).update(
-                    {Review.reviewer_id: reassign_to.id}, synchronize_session=False
-                )
-
-        # clear reviewer assignment on submissions where this user was assigned
-        assigned_count = Submission.query.filter_by(assigned_reviewer_id=target.id).count()
-        if assigned_count:
-            Submission.query.filter_by(assigned_reviewer_id=target.id).update(
-                {Submission.assigned_reviewer_id: None}, synchronize_session=False
-            )
-            print(f"  Cleared assigned_reviewer on {assigned_count} submission(s).")
-
-        # finally delete the user
-        db.session.delete(target)
-        db.session.commit()
-        print("✅ User deleted successfully.")
+        deleted = delete_users(mapping, args.delete_submissions, args.delete_reviews,
+                               chunk_size=args.chunk_size)
+        print(f"✅ {deleted} user(s) deleted successfully.")
 
 if __name__ == "__main__":
     main()
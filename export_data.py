@@ -0,0 +1,71 @@
+# export_data.py
+"""
+Stream submissions, reviews or users to CSV / NDJSON / columnar NDJSON
+(see journal/export.py). Memory use does not grow with the row count.
+
+  python export_data.py reviews --since 2025-01-01 --until 2025-03-31 -o q1-reviews.csv.gz
+  python export_data.py submissions --status accepted --issue 12 --format ndjson
+  python export_data.py users --role reviewer --format columnar -o reviewers.ndjson
+
+Output goes to stdout unless -o is given; a .gz suffix (or --gzip) compresses it.
+"""
+import argparse
+import sys
+import time
+
+from journal import create_app
+from journal.export import DATASETS, FORMATS, ExportError, export, gzip
+
+
+def main():
+    p = argparse.ArgumentParser(description="Stream an export of journal data.")
+    p.add_argument("dataset", choices=sorted(DATASETS))
+    p.add_argument("--format", "-f", choices=sorted(FORMATS), default="csv")
+    p.add_argument("--output", "-o", help="File to write (default: stdout)")
+    p.add_argument("--gzip", action="store_true", help="Compress (implied by a .gz output name)")
+    p.add_argument("--status", help="Submission status (submissions, reviews)")
+    p.add_argument("--decision", help="Review decision (reviews)")
+    p.add_argument("--role", help="User role (users)")
+    p.add_argument("--since", help="Created on/after YYYY-MM-DD")
+    p.add_argument("--until", help="Created on/before YYYY-MM-DD")
+    p.add_argument("--department")
+    p.add_argument("--issue", help="Issue id")
+    p.add_argument("--batch-size", type=int, default=None)
+    args = p.parse_args()
+
+    filters = {k: getattr(args, k) for k in ("status", "decision", "role", "since", "until",
+                                             "department", "issue")}
+    compress = args.gzip or (args.output or "").endswith(".gz")
+
+    app = create_app()
+    with app.app_context():
+        t0 = time.perf_counter()
+        try:
+            chunks = export(args.dataset, args.format, filters,
+                            args.batch_size or app.config["EXPORT_BATCH_SIZE"])
+        except ExportError as e:
+            raise SystemExit(f"❌ {e}")
+
+        out = open(args.output, "wb") if args.output else sys.stdout.buffer
+        written = 0
+        try:
+            if compress:
+                for data in gzip(chunks):
+                    out.write(data)
+                    written += len(data)
+            else:
+                for chunk in chunks:
+                    data = chunk.encode("utf-8")
+                    out.write(data)
+                    written += len(data)
+        finally:
+            if args.output:
+                out.close()
+
+    if args.output:
+        print(f"✅ {args.dataset} → {args.output} ({written / 1048576:.1f} MiB in "
+              f"{time.perf_counter() - t0:.1f}s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,22 +2,28 @@ import os
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
 from flask_login import LoginManager
 from flask_wtf.csrf import CSRFProtect
 
+from .routing import RoutingSession
+
 # --- create extension instances at import time ---
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 bcrypt = Bcrypt()
 login_manager = LoginManager()
 csrf = CSRFProtect()
+limiter = Limiter(get_remote_address)
 
 
 login_manager.login_view = 'journal.login'
 login_manager.login_message_category = 'info'
 
 
-def create_app():
+def create_app(test_config=None):
     """Application factory."""
+    from . import database
     app = Flask(__name__, instance_relative_config=True)
 
     # Secret key
@@ -26,32 +32,157 @@ def create_app():
     # Ensure instance/ exists
     os.makedirs(app.instance_path, exist_ok=True)
 
-    # SQLite DB in instance folder
-    db_path = os.path.join(app.instance_path, 'database.db')
-    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    # Database: DATABASE_URL, else SQLite in the instance folder (see journal/database.py)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database.database_uri(app.instance_path)
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['DB_POOL_SIZE'] = int(os.getenv("DB_POOL_SIZE", "5"))
+    app.config['DB_MAX_OVERFLOW'] = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    app.config['DB_POOL_TIMEOUT'] = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    app.config['DB_POOL_RECYCLE'] = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    app.config['SQLITE_TUNING'] = os.getenv("SQLITE_TUNING", "1") not in ("0", "false", "False", "")
+    app.config['SQLITE_JOURNAL_MODE'] = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    app.config['SQLITE_SYNCHRONOUS'] = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    app.config['SQLITE_BUSY_TIMEOUT_MS'] = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    app.config['SQLITE_MMAP_SIZE'] = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    app.config['SQLITE_CACHE_SIZE_KB'] = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+
+    # Password hashing (journal/passwords.py): bcrypt cost for new hashes (older
+    # hashes are upgraded at login) and the per-process hashing pool
+    app.config['BCRYPT_LOG_ROUNDS'] = int(os.getenv("BCRYPT_LOG_ROUNDS", "12"))
+    app.config['AUTH_HASH_WORKERS'] = int(os.getenv("AUTH_HASH_WORKERS", str(os.cpu_count() or 1)))
+    app.config['AUTH_HASH_QUEUE'] = int(os.getenv("AUTH_HASH_QUEUE", "16"))
+    app.config['AUTH_HASH_WAIT'] = float(os.getenv("AUTH_HASH_WAIT", "5"))
+
+    # Login throttling (Flask-Limiter); use redis://... so gunicorn workers share counters
+    app.config['RATELIMIT_ENABLED'] = os.getenv("RATELIMIT_ENABLED", "1") not in ("0", "false", "False", "")
+    app.config['RATELIMIT_STORAGE_URI'] = os.getenv("RATELIMIT_STORAGE_URI", "memory://")
+    app.config['RATELIMIT_HEADERS_ENABLED'] = True
+    app.config['LOGIN_RATE_LIMIT'] = os.getenv("LOGIN_RATE_LIMIT", "10 per minute;60 per hour")
+    app.config['LOGIN_ACCOUNT_RATE_LIMIT'] = os.getenv("LOGIN_ACCOUNT_RATE_LIMIT", "5 per minute")
 
-    # Uploads folder
-    upload_dir = os.path.join(app.instance_path, 'uploads')
+    # current_user identities are cached per process (journal/identity.py); commits
+    # that change a User touch IDENTITY_EPOCH_FILE so every worker drops its cache
+    app.config['IDENTITY_CACHE_TTL'] = float(os.getenv("IDENTITY_CACHE_TTL", "30"))
+    app.config['IDENTITY_EPOCH_FILE'] = os.path.join(app.instance_path, 'identity.epoch')
+
+    # Public pages read from a replica ("ro" = read-only connection to the SQLite file);
+    # a browser that just wrote stays on the primary for REPLICA_STICKY_SECONDS
+    app.config['DATABASE_REPLICA_URL'] = os.getenv("DATABASE_REPLICA_URL", "")
+    app.config['REPLICA_STICKY_SECONDS'] = int(os.getenv("REPLICA_STICKY_SECONDS", "15"))
+
+    # Uploads folder (UPLOAD_FOLDER lets a load-test server use a generated store)
+    upload_dir = os.getenv("UPLOAD_FOLDER") or os.path.join(app.instance_path, 'uploads')
     os.makedirs(upload_dir, exist_ok=True)
     app.config['UPLOAD_FOLDER'] = upload_dir
     app.config['MAX_CONTENT_LENGTH'] = 10 * 1024 * 1024  # 10 MB
 
+    # sitemap.xml: files of at most SITEMAP_MAX_URLS URLs, regenerated after
+    # acceptances/issue changes or once SITEMAP_MAX_AGE seconds old
+    # absolute URLs in sitemap.xml/robots.txt use this (else SERVER_NAME), never the request Host
+    app.config['SITEMAP_BASE_URL'] = os.getenv("SITEMAP_BASE_URL", "")
+    app.config['SITEMAP_DIR'] = os.getenv("SITEMAP_DIR") or os.path.join(app.instance_path, 'sitemaps')
+    app.config['SITEMAP_MAX_URLS'] = int(os.getenv("SITEMAP_MAX_URLS", "50000"))
+    app.config['SITEMAP_MAX_AGE'] = int(os.getenv("SITEMAP_MAX_AGE", str(24 * 3600)))
+    app.config['SITEMAP_HTTP_MAX_AGE'] = int(os.getenv("SITEMAP_HTTP_MAX_AGE", "3600"))
+
+    # Rendered public pages (journal/pagecache.py): PAGE_CACHE=memory|filesystem|redis|off
+    app.config['PAGE_CACHE'] = os.getenv("PAGE_CACHE", "memory")
+    app.config['PAGE_CACHE_TTL'] = int(os.getenv("PAGE_CACHE_TTL", "3600"))
+    app.config['PAGE_CACHE_MAX_ENTRIES'] = int(os.getenv("PAGE_CACHE_MAX_ENTRIES", "2048"))
+    app.config['PAGE_CACHE_DIR'] = os.getenv("PAGE_CACHE_DIR") or os.path.join(app.instance_path, 'pagecache')
+    app.config['PAGE_CACHE_URL'] = os.getenv("PAGE_CACHE_URL", "redis://localhost:6379/0")
+
+    # Automatic reviewer assignment rounds (journal/assignment.py)
+    app.config['ASSIGN_REVIEWERS_PER_SUBMISSION'] = int(os.getenv("ASSIGN_REVIEWERS_PER_SUBMISSION", "2"))
+    app.config['ASSIGN_REVIEWER_CAP'] = int(os.getenv("ASSIGN_REVIEWER_CAP", "5"))
+
+    # Rows fetched per round trip by /admin/export and export_data.py
+    app.config['EXPORT_BATCH_SIZE'] = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
+
+    # Public search
+    app.config['SEARCH_PER_PAGE'] = int(os.getenv("SEARCH_PER_PAGE", "20"))
+
+    # Listing page sizes (?per_page= is clamped to MAX_PER_PAGE)
+    app.config['PER_PAGE'] = int(os.getenv("PER_PAGE", "25"))
+    app.config['MAX_PER_PAGE'] = int(os.getenv("MAX_PER_PAGE", "100"))
+
+    # Landing-page stats cache (seconds)
+    app.config['STATS_CACHE_TTL'] = int(os.getenv("STATS_CACHE_TTL", "60"))
+
+    # Reviewer analytics (/admin/analytics): new reviews are folded in every
+    # ANALYTICS_REFRESH_INTERVAL seconds, by a thread when ANALYTICS_REFRESH=thread,
+    # otherwise on the next page view; a full rebuild every ANALYTICS_REBUILD_AGE
+    app.config['ANALYTICS_REFRESH'] = os.getenv("ANALYTICS_REFRESH", "")
+    app.config['ANALYTICS_REFRESH_INTERVAL'] = float(os.getenv("ANALYTICS_REFRESH_INTERVAL", "300"))
+    app.config['ANALYTICS_REBUILD_AGE'] = float(os.getenv("ANALYTICS_REBUILD_AGE", str(6 * 3600)))
+
+    # Per-view SQL query budgets: "raise" | "log" | "" (unset = by TESTING/debug)
+    app.config['QUERY_BUDGET_MODE'] = os.getenv("QUERY_BUDGET_MODE")
+
+    # Request instrumentation (/admin/metrics); METRICS_TOKEN lets a scraper
+    # read /admin/metrics.prom with "Authorization: Bearer <token>"
+    app.config['INSTRUMENTATION'] = os.getenv("INSTRUMENTATION", "0") not in ("0", "false", "False", "")
+    app.config['METRICS_SAMPLE_SIZE'] = int(os.getenv("METRICS_SAMPLE_SIZE", "1000"))
+    app.config['METRICS_TOKEN'] = os.getenv("METRICS_TOKEN", "")
+
+    # Outbound mail: send_email() queues; MAIL_WORKER=thread runs the sender
+    # inside each app process, otherwise run `python mail_worker.py` separately
+    app.config['MAIL_WORKER'] = os.getenv("MAIL_WORKER", "")
+    app.config['MAIL_BATCH_SIZE'] = int(os.getenv("MAIL_BATCH_SIZE", "50"))
+    app.config['MAIL_POLL_INTERVAL'] = float(os.getenv("MAIL_POLL_INTERVAL", "2"))
+    app.config['MAIL_MAX_ATTEMPTS'] = int(os.getenv("MAIL_MAX_ATTEMPTS", "6"))
+    app.config['MAIL_RETRY_BASE'] = float(os.getenv("MAIL_RETRY_BASE", "30"))
+    app.config['MAIL_RETRY_MAX'] = float(os.getenv("MAIL_RETRY_MAX", "3600"))
+    app.config['MAIL_STALE_AFTER'] = float(os.getenv("MAIL_STALE_AFTER", "600"))
+    # >0: fold notifications into one digest per recipient every N seconds
+    app.config['MAIL_DIGEST_WINDOW'] = float(os.getenv("MAIL_DIGEST_WINDOW", "0"))
+
+    # PDF delivery: FILE_OFFLOAD=nginx (X-Accel-Redirect) or sendfile (X-Sendfile)
+    app.config['FILE_OFFLOAD'] = os.getenv("FILE_OFFLOAD", "")
+    app.config['FILE_ACCEL_PREFIX'] = os.getenv("FILE_ACCEL_PREFIX", "/protected-uploads")
+    # /article/<id>/pdf is not versioned: keep it short and let caches revalidate by ETag
+    app.config['PUBLIC_PDF_MAX_AGE'] = int(os.getenv("PUBLIC_PDF_MAX_AGE", "300"))
+
+    # overrides (benchmarks / scripts pointing at another DB)
+    if test_config:
+        app.config.update(test_config)
+
+    # pool sizing / SQLite connect args and the replica bind, derived from the final URIs
+    database.configure(app.config)
+
     # init extensions
     db.init_app(app)
     bcrypt.init_app(app)
     login_manager.init_app(app)
     csrf.init_app(app)
+    limiter.init_app(app)
+
+    from . import querybudget, metrics, routing, identity
+    database.init_app(app, db)
+    routing.init_app(app)
+    identity.init_app(app)
+    querybudget.init_app(app, db)
+    metrics.init_app(app, db)
 
     @app.context_processor
     def inject_role_helpers():
-        def role_val(user):
-            r = getattr(user, "role", None)
-            return getattr(r, "value", r)
-        return dict(role_val=role_val)
+        from .permissions import can, has_role
+        return dict(has_role=has_role, can=can)
+
+    if app.config['MAIL_WORKER'] == "thread":
+        from .mailqueue import start_worker
+        app.extensions['mail_worker'] = start_worker(app)
+
+    if app.config['ANALYTICS_REFRESH'] == "thread":
+        from .analytics import start_refresher
+        app.extensions['analytics_refresher'] = start_refresher(app)
 
-    # Register blueprint
+    # Register blueprints
     from .routes import journal_bp
+    from .public_routes import public_bp
+    from .api import api_bp
     app.register_blueprint(journal_bp)
+    app.register_blueprint(public_bp)
+    app.register_blueprint(api_bp)
 
     return app
@@ -0,0 +1,535 @@
+# journal/accounts.py
+"""
+Batch account operations: merge / delete (merge_users.py, delete_user.py)
+and CSV import of users and roles (set_roles.py --import).
+
+A batch is a mapping of user id -> user id: for merges "from -> into", for
+deletes "delete -> reassign to" (None: nothing to reassign to). It is read
+from CSV (two columns, optional header) or JSON ({"12": 3} or
+[{"from_id": 12, "into_id": 3}, ...] or [[12, 3], ...]).
+
+Every reference to a user is moved with set-based statements, one per
+column per chunk of CHUNK users:
+
+  UPDATE submission SET author_id = CASE author_id WHEN 12 THEN 3 ... END
+   WHERE author_id IN (12, ...)
+
+and each chunk is its own transaction, so a batch of thousands costs a few
+statements per chunk and a failure only rolls back the chunk in flight.
+Columns that point at a user: submission.author_id,
+submission.assigned_reviewer_id, review.reviewer_id,
+submission_file.uploaded_by_user_id and submission_reviewer.reviewer_id.
+
+The bulk statements bypass the ORM, so the session hooks never see them;
+the identity, stats, page and sitemap caches are invalidated explicitly
+after each chunk commits.
+
+import_users() validates a whole CSV first (two IN queries per chunk find the
+existing accounts), hashes every new password on a process pool, then writes
+with one executemany INSERT / UPDATE per chunk. Rows that cannot be applied
+are collected in the report with their line number instead of aborting.
+"""
+import csv
+import json
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from sqlalchemy import and_, bindparam, case, delete, exists, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+
+from . import db
+from .models import Review, Role, Submission, SubmissionFile, SubmissionStatus, User, submission_reviewer
+
+CHUNK = 500
+
+# (label, table column) for every reference to a user
+REFERENCES = (
+    ("authored", Submission.__table__.c.author_id),
+    ("assigned", Submission.__table__.c.assigned_reviewer_id),
+    ("reviews", Review.__table__.c.reviewer_id),
+    ("panels", submission_reviewer.c.reviewer_id),
+    ("uploads", SubmissionFile.__table__.c.uploaded_by_user_id),
+)
+
+
+class AccountError(ValueError):
+    pass
+
+
+# -----------------------------
+# Input
+# -----------------------------
+def _id(value, what, blank_ok=False):
+    if value in (None, "") and blank_ok:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise AccountError(f"{what} must be a user id, got {value!r}")
+
+
+def load_mapping(path: str, blank_ok: bool = False) -> dict:
+    """{first id: second id} from a CSV or JSON file; blank_ok allows an empty second column."""
+    pairs = []
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".json"):
+            data = json.load(f)
+            if isinstance(data, dict):
+                pairs = list(data.items())
+            else:
+                for item in data:
+                    if isinstance(item, dict):
+                        pairs.append((item.get("from_id", item.get("id")),
+                                      item.get("into_id", item.get("reassign_to_id"))))
+                    else:
+                        pairs.append((item[0], item[1] if len(item) > 1 else None))
+        else:
+            for n, row in enumerate(csv.reader(f)):
+                if not row or not row[0].strip() or row[0].lstrip().startswith("#"):
+                    continue
+                if n == 0 and not row[0].strip().isdigit():
+                    continue                                    # header
+                pairs.append((row[0].strip(), row[1].strip() if len(row) > 1 else None))
+
+    mapping = {}
+    for first, second in pairs:
+        first = _id(first, "first column")
+        second = _id(second, f"second column for {first}", blank_ok)
+        if mapping.get(first, second) != second:
+            raise AccountError(f"user {first} is mapped twice ({mapping[first]} and {second})")
+        mapping[first] = second
+    if not mapping:
+        raise AccountError(f"{path}: no rows")
+    return mapping
+
+
+def resolve_merges(mapping: dict) -> dict:
+    """Follow chains (5 -> 3, 3 -> 1 becomes 5 -> 1, 3 -> 1); reject self-merges and cycles."""
+    resolved = {}
+    for src in mapping:
+        if mapping[src] == src:
+            raise AccountError(f"user {src} is merged into itself")
+        seen, dst = {src}, mapping[src]
+        while dst in mapping:
+            if dst in seen:
+                raise AccountError(f"merge cycle through user {src}")
+            seen.add(dst)
+            dst = mapping[dst]
+        resolved[src] = dst
+    return resolved
+
+
+def chunks(items, size: int = CHUNK):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+# -----------------------------
+# Reporting
+# -----------------------------
+def load_users(ids) -> dict:
+    """id -> (id, username, email, role) for the ids that exist, one query per chunk."""
+    found = {}
+    for part in chunks(sorted(set(ids))):
+        for row in db.session.execute(
+                select(User.id, User.username, User.email, User.role).where(User.id.in_(part))):
+            found[row.id] = row
+    return found
+
+
+def reference_counts(user_ids) -> dict:
+    """user id -> {label: rows}; one GROUP BY per reference column per chunk."""
+    counts = {uid: {label: 0 for label, _ in REFERENCES} for uid in user_ids}
+    for part in chunks(counts):
+        for label, col in REFERENCES:
+            for uid, n in db.session.execute(
+                    select(col, func.count()).where(col.in_(part)).group_by(col)):
+                counts[uid][label] = n
+    return counts
+
+
+def totals(counts: dict) -> dict:
+    out = {label: 0 for label, _ in REFERENCES}
+    for c in counts.values():
+        for label, n in c.items():
+            out[label] += n
+    return out
+
+
+# -----------------------------
+# Shared statements
+# -----------------------------
+def _remap(col, part_map):
+    return case(part_map, value=col)
+
+
+def _move_panels(part_map):
+    """Move panel seats to the new reviewer, skipping seats they already hold."""
+    sr = submission_reviewer
+    other = aliased(sr)
+    target = _remap(sr.c.reviewer_id, part_map)
+    db.session.execute(insert(sr).from_select(
+        ["submission_id", "reviewer_id"],
+        select(sr.c.submission_id, target).distinct()
+        .where(sr.c.reviewer_id.in_(list(part_map)),
+               ~exists().where(and_(other.c.submission_id == sr.c.submission_id,
+                                    other.c.reviewer_id == target)))))
+    db.session.execute(delete(sr).where(sr.c.reviewer_id.in_(list(part_map))))
+
+
+def _accepted_authored_by(ids) -> list:
+    return list(db.session.execute(
+        select(Submission.id).where(Submission.author_id.in_(ids),
+                                    Submission.status == SubmissionStatus.ACCEPTED)).scalars())
+
+
+def _after_chunk(user_ids, articles=(), sitemap_changed=False):
+    # bulk statements bypass the session hooks in identity/stats/pagecache/sitemap
+    from . import analytics, identity, pagecache, sitemap, stats
+    for uid in user_ids:
+        identity.invalidate(uid, broadcast=False)
+    stats.invalidate()
+    analytics.invalidate()
+    if articles:
+        pagecache.bump("issues", *(f"article:{sid}" for sid in articles))
+    if sitemap_changed:
+        sitemap.invalidate()
+
+
+def _run(parts, apply_chunk, log):
+    """apply_chunk(part) -> (rows changed, accepted article ids touched, sitemap changed)."""
+    started = time.perf_counter()
+    done = 0
+    for n, part in enumerate(parts, 1):
+        try:
+            rows, articles, sitemap_changed = apply_chunk(part)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            log(f"[accounts] chunk {n}/{len(parts)} rolled back; {done} user(s) done before it")
+            raise
+        _after_chunk(part, articles, sitemap_changed)
+        done += len(part)
+        log(f"[accounts] chunk {n}/{len(parts)}: {len(part)} user(s), {rows} row(s) "
+            f"({time.perf_counter() - started:.1f}s)")
+    from .identity import bump_epoch
+    bump_epoch()
+    return done
+
+
+# -----------------------------
+# Merge
+# -----------------------------
+def check_merges(mapping: dict) -> tuple[dict, dict]:
+    """(resolved mapping, users) or AccountError naming every unknown id."""
+    resolved = resolve_merges(mapping)
+    users = load_users({*resolved, *resolved.values()})
+    missing = sorted({*resolved, *resolved.values()} - set(users))
+    if missing:
+        raise AccountError(f"unknown user id(s): {missing[:20]}{' ...' if len(missing) > 20 else ''}")
+    return resolved, users
+
+
+def merge_users(mapping: dict, chunk_size: int = CHUNK, log=print) -> int:
+    """Move everything owned by each "from" user to its "into" user and delete the "from" users."""
+    resolved, _ = check_merges(mapping)
+
+    def apply_chunk(part):
+        part_map = {src: resolved[src] for src in part}
+        articles = _accepted_authored_by(part)
+        rows = 0
+        for label, col in REFERENCES:
+            if label == "panels":
+                continue
+            rows += db.session.execute(
+                update(col.table).where(col.in_(part)).values({col: _remap(col, part_map)}),
+                execution_options={"synchronize_session": False}).rowcount
+        _move_panels(part_map)
+        db.session.execute(delete(User).where(User.id.in_(part)),
+                           execution_options={"synchronize_session": False})
+        return rows, articles, False
+
+    return _run(list(chunks(resolved, chunk_size)), apply_chunk, log)
+
+
+# -----------------------------
+# Delete
+# -----------------------------
+def check_deletes(mapping: dict, delete_submissions: bool = False, delete_reviews: bool = False):
+    """(users, reference counts) or AccountError listing every user that cannot go as asked."""
+    targets = {t for t in mapping.values() if t is not None}
+    users = load_users({*mapping, *targets})
+    problems = []
+    missing = sorted(set(mapping) - set(users))
+    if missing:
+        problems.append(f"unknown user id(s): {missing[:20]}")
+    missing = sorted(targets - set(users))
+    if missing:
+        problems.append(f"unknown reassignment id(s): {missing[:20]}")
+    clash = sorted(targets & set(mapping))
+    if clash:
+        problems.append(f"reassignment target(s) are being deleted too: {clash[:20]}")
+    admins = sorted(uid for uid in mapping if uid in users and users[uid].role == Role.ADMIN)
+    if admins:
+        problems.append(f"refusing to delete admin account(s) {admins[:20]}; demote first if intentional")
+
+    counts = reference_counts([uid for uid in mapping if uid in users])
+    stuck_subs = sorted(uid for uid, c in counts.items()
+                        if c["authored"] and mapping[uid] is None and not delete_submissions)
+    stuck_reviews = sorted(uid for uid, c in counts.items()
+                           if c["reviews"] and mapping[uid] is None and not delete_reviews)
+    if stuck_subs:
+        problems.append(f"user(s) {stuck_subs[:20]} authored submissions: give a reassignment id "
+                        f"or --delete-submissions")
+    if stuck_reviews:
+        problems.append(f"user(s) {stuck_reviews[:20]} wrote reviews: give a reassignment id "
+                        f"or --delete-reviews")
+    if problems:
+        raise AccountError("; ".join(problems))
+    return users, counts
+
+
+def _delete_submissions_of(part) -> int:
+    owned = select(Submission.id).where(Submission.author_id.in_(part)).scalar_subquery()
+    # no ON DELETE CASCADE on SQLite without PRAGMA foreign_keys, so children go first
+    db.session.execute(delete(Review).where(Review.submission_id.in_(owned)),
+                       execution_options={"synchronize_session": False})
+    db.session.execute(delete(SubmissionFile).where(SubmissionFile.submission_id.in_(owned)),
+                       execution_options={"synchronize_session": False})
+    db.session.execute(delete(submission_reviewer).where(submission_reviewer.c.submission_id.in_(owned)))
+    return db.session.execute(delete(Submission).where(Submission.author_id.in_(part)),
+                              execution_options={"synchronize_session": False}).rowcount
+
+
+def delete_users(mapping: dict, delete_submissions: bool = False, delete_reviews: bool = False,
+                 chunk_size: int = CHUNK, log=print) -> int:
+    """
+    Delete the users in `mapping`, reassigning their submissions and reviews to
+    the mapped user (or deleting them, as flagged). They leave every reviewer
+    panel; files they uploaded are credited to the reassignment user, else to
+    the submission's author.
+    """
+    check_deletes(mapping, delete_submissions, delete_reviews)
+
+    def apply_chunk(part):
+        part_map = {uid: mapping[uid] for uid in part if mapping[uid] is not None}
+        articles = _accepted_authored_by(part)
+        rows = 0
+        sub, rev, files = Submission.__table__, Review.__table__, SubmissionFile.__table__
+
+        if delete_submissions:
+            rows += _delete_submissions_of(part)
+        elif part_map:
+            rows += db.session.execute(
+                update(sub).where(sub.c.author_id.in_(list(part_map)))
+                .values(author_id=_remap(sub.c.author_id, part_map))).rowcount
+
+        if delete_reviews:
+            rows += db.session.execute(delete(rev).where(rev.c.reviewer_id.in_(part))).rowcount
+        elif part_map:
+            rows += db.session.execute(
+                update(rev).where(rev.c.reviewer_id.in_(list(part_map)))
+                .values(reviewer_id=_remap(rev.c.reviewer_id, part_map))).rowcount
+
+        rows += db.session.execute(
+            update(sub).where(sub.c.assigned_reviewer_id.in_(part)).values(assigned_reviewer_id=None)).rowcount
+        rows += db.session.execute(
+            delete(submission_reviewer).where(submission_reviewer.c.reviewer_id.in_(part))).rowcount
+
+        author_of = select(sub.c.author_id).where(sub.c.id == files.c.submission_id).scalar_subquery()
+        credit = func.coalesce(_remap(files.c.uploaded_by_user_id, part_map), author_of) if part_map \
+            else author_of
+        rows += db.session.execute(
+            update(files).where(files.c.uploaded_by_user_id.in_(part))
+            .values(uploaded_by_user_id=credit)).rowcount
+
+        db.session.execute(delete(User).where(User.id.in_(part)),
+                           execution_options={"synchronize_session": False})
+        return rows, articles, delete_submissions and bool(articles)
+
+    return _run(list(chunks(mapping, chunk_size)), apply_chunk, log)
+
+
+# -----------------------------
+# Import (set_roles.py --import)
+# -----------------------------
+IMPORT_FIELDS = ("email", "username", "role", "password", "department")
+
+
+def parse_role(value) -> Role:
+    """'Reviewer', ' REVIEWER', Role.REVIEWER -> Role.REVIEWER."""
+    if isinstance(value, Role):
+        return value
+    text = str(value or "").strip()
+    for role in Role:
+        if text.lower() in (role.value, role.name.lower()):
+            return role
+    raise AccountError(f"invalid role {value!r} (one of {', '.join(r.value for r in Role)})")
+
+
+@dataclass
+class ImportReport:
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    errors: list = field(default_factory=list)       # (line, who, message)
+
+    def error(self, line, who, message):
+        self.errors.append((line, who, message))
+
+
+def read_import(path: str):
+    """(line number, {field: value}) per CSV row; the header names the columns."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        names = [(n or "").strip().lower() for n in reader.fieldnames or ()]
+        unknown = sorted(set(names) - set(IMPORT_FIELDS) - {""})
+        if unknown:
+            raise AccountError(f"unknown column(s) {unknown}; expected {', '.join(IMPORT_FIELDS)}")
+        if "email" not in names and "username" not in names:
+            raise AccountError("the header needs an email or username column")
+        reader.fieldnames = names
+        for row in reader:
+            yield reader.line_num, {k: (v or "").strip() for k, v in row.items() if k}
+
+
+def _existing(column, values) -> dict:
+    found = {}
+    for part in chunks(sorted(values)):
+        for row in db.session.execute(
+                select(User.id, User.username, User.email, User.role, User.department)
+                .where(column.in_(part))):
+            found[getattr(row, column.key)] = row
+    return found
+
+
+def import_users(rows, default_role: Role | None = None, update_passwords: bool = False,
+                 chunk_size: int = CHUNK, workers: int | None = None, dry_run: bool = False,
+                 log=print) -> ImportReport:
+    """
+    Create or update users from (line, row) pairs (see read_import). Rows are
+    matched to accounts by email, else username. Existing accounts get their
+    role and department updated (and password, with update_passwords); new ones
+    need email, username, password and a role. A bad row is reported and
+    skipped; it never stops the rest.
+    """
+    from .passwords import hash_many
+
+    report = ImportReport()
+    rows = list(rows)
+    # emails match exactly, as they do at login
+    by_email = _existing(User.email, {r["email"] for _, r in rows if r.get("email")})
+    by_name = _existing(User.username, {r["username"] for _, r in rows if r.get("username")})
+
+    creates, updates, seen = [], [], set()
+    for line, r in rows:
+        email, username = r.get("email", ""), r.get("username", "")
+        who = email or username or f"line {line}"
+        key = (email or username).lower()
+        if not key:
+            report.error(line, who, "no email or username")
+            continue
+        if key in seen:
+            report.error(line, who, "appears more than once in the file")
+            continue
+        seen.add(key)
+        try:
+            role = parse_role(r["role"]) if r.get("role") else default_role
+        except AccountError as e:
+            report.error(line, who, str(e))
+            continue
+
+        user = by_email.get(email) if email else by_name.get(username)
+        if user is not None:
+            if username and username != user.username:
+                report.error(line, who, f"email belongs to {user.username!r}, not {username!r}")
+                continue
+            change = {}
+            if role is not None and role != user.role:
+                change["role"] = role
+            if r.get("department") and r["department"] != (user.department or ""):
+                change["department"] = r["department"]
+            if update_passwords and r.get("password"):
+                change["password"] = r["password"]
+            if change:
+                updates.append((line, user, change))
+            else:
+                report.unchanged += 1
+            continue
+
+        missing = [f for f, v in (("email", email), ("username", username),
+                                  ("password", r.get("password")), ("role", role)) if not v]
+        if missing:
+            report.error(line, who, f"new user needs {', '.join(missing)}")
+            continue
+        if "@" not in email:
+            report.error(line, who, "not an email address")
+            continue
+        if username in by_name:
+            report.error(line, who, f"username {username!r} is taken")
+            continue
+        by_name[username] = None        # a later row may not claim it either
+        creates.append((line, {"email": email, "username": username, "password": r["password"],
+                               "role": role, "department": r.get("department") or None}))
+
+    if dry_run:
+        report.created, report.updated = len(creates), len(updates)
+        return report
+
+    # every bcrypt hash in the file, spread over all cores
+    started = time.perf_counter()
+    plain = [row["password"] for _, row in creates] + \
+            [c["password"] for _, _, c in updates if "password" in c]
+    hashed = iter(hash_many(plain, workers=workers))
+    for _, row in creates:
+        row["password"] = next(hashed)
+    for _, _, c in updates:
+        if "password" in c:
+            c["password"] = next(hashed)
+    if plain:
+        log(f"[accounts] hashed {len(plain)} password(s) in {time.perf_counter() - started:.1f}s")
+
+    for part in chunks(creates, chunk_size):
+        try:
+            db.session.execute(insert(User), [row for _, row in part])
+            db.session.commit()
+            report.created += len(part)
+        except IntegrityError:
+            # a concurrent signup took a name: fall back to row by row for this batch
+            db.session.rollback()
+            for line, row in part:
+                try:
+                    db.session.execute(insert(User), [row])
+                    db.session.commit()
+                    report.created += 1
+                except IntegrityError:
+                    db.session.rollback()
+                    report.error(line, row["email"], "email or username already exists")
+        log(f"[accounts] created {report.created}/{len(creates)}")
+
+    # one executemany per set of changed columns
+    groups = defaultdict(list)
+    for line, user, change in updates:
+        groups[tuple(sorted(change))].append({"uid": user.id, **change})
+    t = User.__table__
+    for cols, params in groups.items():
+        for part in chunks(params, chunk_size):
+            db.session.execute(update(t).where(t.c.id == bindparam("uid"))
+                               .values({c: bindparam(c) for c in cols}), part)
+            db.session.commit()
+            report.updated += len(part)
+    if updates:
+        log(f"[accounts] updated {report.updated} user(s)")
+
+    # executemany bypasses the session hooks
+    from . import identity, stats
+    if updates:
+        for _, user, _ in updates:
+            identity.invalidate(user.id, broadcast=False)
+        identity.bump_epoch()
+    if creates or updates:
+        stats.invalidate()
+    return report
@@ -0,0 +1,290 @@
+# journal/analytics.py
+"""
+Reviewer workload and turnaround analytics (/admin/analytics).
+
+The review facts come from one column-only SELECT: each review joined to its
+submission's created_at, department and issue. It is streamed with yield_per,
+and each batch is transposed into columns with zip(*rows). The columns are
+folded into running aggregates with whole-column builtins: map/zip over the
+columns, Counter.update, and dict(zip(...)) for first/last values per key.
+No Python statement runs once per review. This is the NumPy-style layout
+without a numpy dependency, in the same way that export.py's columnar format
+stands in for Parquet.
+
+Measures:
+  - time to first review: the earliest review of a submission minus its
+    created_at
+  - review turnaround: each review's created_at minus its submission's
+  - open load per reviewer: assignment.open_loads(), the same figure the
+    assignment planner balances on
+  - decision mix per department and per issue
+  - acceptance rate over time: ACCEPT / (ACCEPT + REJECT) decisions per month
+    the decision was made
+
+Reviews are only ever added in the app, so a refresh reads just the rows past
+the highest review id already folded in. A full rebuild happens when the
+state is older than ANALYTICS_REBUILD_AGE, or after invalidate(); the bulk
+merges and deletes in accounts.py rewrite review.reviewer_id in place and
+call it. Open loads are live panel state and are re-read on every refresh
+(one GROUP BY).
+
+Refreshes are scheduled. With ANALYTICS_REFRESH=thread, create_app starts an
+AnalyticsRefresher that refreshes every ANALYTICS_REFRESH_INTERVAL seconds.
+Without it, report() refreshes on demand once the cached report is that old.
+Each process keeps its own state, like stats.py.
+"""
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from datetime import datetime, timedelta
+from functools import partial
+from itertools import groupby, repeat
+from operator import itemgetter, methodcaller, sub, truediv
+
+from flask import current_app
+from sqlalchemy import select
+
+from . import db
+from .models import Issue, Review, ReviewDecision, Role, Submission, User
+
+_EPOCH = datetime(1970, 1, 1)
+_DAY = 86400.0
+_YIELD_PER = 5000
+
+# histogram bucket edges, in days
+TURNAROUND_EDGES = (1, 3, 7, 14, 30, 60)
+QUANTILES = (0.5, 0.75, 0.9)
+
+_lock = threading.Lock()
+_state = None           # ReviewFacts, replaced wholesale on a rebuild
+_report = None          # last report(), read without the lock
+
+
+def _seconds(column):
+    # datetimes -> float seconds, for the whole column at once
+    return array("d", map(methodcaller("total_seconds"), map(sub, column, repeat(_EPOCH))))
+
+
+def _days(later, earlier):
+    return array("d", map(truediv, map(sub, later, earlier), repeat(_DAY)))
+
+
+def _extreme(keys, values, newest: bool) -> dict:
+    """key -> smallest (newest=False) or largest value; dict() keeps the last write per key."""
+    order = sorted(range(len(values)), key=values.__getitem__, reverse=not newest)
+    return dict(zip(map(keys.__getitem__, order), map(values.__getitem__, order)))
+
+
+def _merge(into: dict, new: dict, newest: bool):
+    # only keys seen in earlier batches need comparing
+    better = max if newest else min
+    for k in new.keys() & into.keys():
+        new[k] = better(new[k], into[k])
+    into.update(new)
+
+
+def _quantiles(values) -> dict:
+    ordered = sorted(values)
+    if not ordered:
+        return dict.fromkeys((*QUANTILES, 1.0))
+    last = len(ordered) - 1
+    out = {q: ordered[min(last, int(q * len(ordered)))] for q in QUANTILES}
+    out[1.0] = ordered[-1]
+    return out
+
+
+def _histogram(values, edges=TURNAROUND_EDGES) -> list:
+    counts = Counter(map(partial(bisect_right, edges), values))
+    labels = [f"< {edges[0]}d"] + [f"{a}–{b}d" for a, b in zip(edges, edges[1:])] + [f"≥ {edges[-1]}d"]
+    total = sum(counts.values()) or 1
+    return [{"label": label, "count": counts[i], "share": counts[i] / total}
+            for i, label in enumerate(labels)]
+
+
+class ReviewFacts:
+    """Running aggregates over every review folded in so far."""
+
+    def __init__(self):
+        self.built_at = time.time()
+        self.watermark = 0                  # highest review id folded in
+        self.reviews = 0
+        self.reviewer = array("q")          # per review, parallel to turnaround
+        self.turnaround = array("d")        # days from submission to review
+        self.submitted = {}                 # submission id -> created_at (seconds)
+        self.first_review = {}              # submission id -> earliest review (seconds)
+        self.last_review = {}               # reviewer id -> latest review (seconds)
+        self.by_department = Counter()      # (department, decision) -> reviews
+        self.by_issue = Counter()           # (issue id, decision) -> reviews
+        self.by_month = Counter()           # ("YYYY-MM", decision) -> reviews
+
+    def extend(self, batch_size: int = _YIELD_PER) -> int:
+        """Fold in reviews past the watermark; returns how many."""
+        stmt = (select(Review.id, Review.submission_id, Review.reviewer_id, Review.decision,
+                       Review.created_at, Submission.created_at, Submission.department,
+                       Submission.issue_id)
+                .join(Submission, Review.submission_id == Submission.id)
+                .where(Review.id > self.watermark,
+                       Review.created_at.is_not(None), Submission.created_at.is_not(None))
+                .order_by(Review.id)
+                .execution_options(stream_results=True, yield_per=batch_size))
+        added = 0
+        for rows in db.session.execute(stmt).partitions():
+            ids, subs, reviewers, decisions, reviewed, submitted, depts, issues = zip(*rows)
+            self._fold(subs, reviewers, decisions, reviewed, submitted, depts, issues)
+            self.watermark = ids[-1]
+            added += len(ids)
+        self.reviews += added
+        return added
+
+    def _fold(self, subs, reviewers, decisions, reviewed, submitted, depts, issues):
+        reviewed_s, submitted_s = _seconds(reviewed), _seconds(submitted)
+        self.reviewer.extend(reviewers)
+        self.turnaround.extend(_days(reviewed_s, submitted_s))
+        self.submitted.update(zip(subs, submitted_s))
+        _merge(self.first_review, _extreme(subs, reviewed_s, newest=False), newest=False)
+        _merge(self.last_review, _extreme(reviewers, reviewed_s, newest=True), newest=True)
+        self.by_department.update(zip(depts, decisions))
+        self.by_issue.update(zip(issues, decisions))
+        self.by_month.update(zip(map(methodcaller("strftime", "%Y-%m"), reviewed), decisions))
+
+    # -----------------------------
+    # Derived measures
+    # -----------------------------
+    def time_to_first_review(self) -> array:
+        sids = list(self.first_review)
+        return _days(map(self.first_review.__getitem__, sids), map(self.submitted.__getitem__, sids))
+
+    def per_reviewer(self) -> dict:
+        """reviewer id -> (reviews, median turnaround days)."""
+        order = sorted(range(len(self.reviewer)), key=self.reviewer.__getitem__)
+        out = {}
+        for rid, idx in groupby(order, key=self.reviewer.__getitem__):
+            days = sorted(map(self.turnaround.__getitem__, idx))
+            out[rid] = (len(days), days[len(days) // 2])
+        return out
+
+    def report(self) -> dict:
+        from .assignment import open_loads
+        loads = open_loads()
+        per_reviewer = self.per_reviewer()
+        reviewer_ids = loads.keys() | per_reviewer.keys()
+
+        names = dict(db.session.execute(
+            select(User.id, User.username).where((User.role == Role.REVIEWER) | User.id.in_(reviewer_ids))
+        ).all())
+        reviewers = []
+        for rid in names.keys() | reviewer_ids:
+            done, median = per_reviewer.get(rid, (0, None))
+            last = self.last_review.get(rid)
+            reviewers.append({"id": rid, "username": names.get(rid, f"#{rid}"), "open": loads.get(rid, 0),
+                              "reviews": done, "median_days": median,
+                              "last_review": _EPOCH + timedelta(seconds=last) if last is not None else None})
+        reviewers.sort(key=itemgetter("open", "reviews"), reverse=True)
+
+        issues = {iid: f"{year} · vol. {volume} no. {number}" for iid, year, volume, number in
+                  db.session.execute(select(Issue.id, Issue.year, Issue.volume, Issue.number)).all()}
+
+        ttfr = self.time_to_first_review()
+        acceptance = []
+        for m in sorted({m for m, _ in self.by_month}):
+            acc, rej = self.by_month[m, ReviewDecision.ACCEPT], self.by_month[m, ReviewDecision.REJECT]
+            if acc + rej:
+                acceptance.append({"month": m, "accepted": acc, "rejected": rej, "rate": acc / (acc + rej)})
+
+        return {
+            "generated_at": datetime.utcnow(),
+            "built_at": datetime.utcfromtimestamp(self.built_at),
+            "reviews": self.reviews,
+            "reviewed_submissions": len(self.first_review),
+            "time_to_first_review": {"quantiles": _quantiles(ttfr), "histogram": _histogram(ttfr)},
+            "turnaround": {"quantiles": _quantiles(self.turnaround), "histogram": _histogram(self.turnaround)},
+            "reviewers": reviewers,
+            "decisions": list(ReviewDecision),
+            "by_department": _mix(self.by_department, lambda d: d or "—"),
+            "by_issue": _mix(self.by_issue, lambda i: issues.get(i, f"#{i}") if i is not None else "No issue"),
+            "acceptance": acceptance,
+        }
+
+
+def _mix(counts: Counter, label) -> list:
+    """[{"label", "total", "counts": {decision: n}}], largest group first."""
+    groups = {}
+    for (key, decision), n in counts.items():
+        g = groups.setdefault(key, {"label": label(key), "total": 0, "counts": Counter()})
+        g["total"] += n
+        g["counts"][decision] += n
+    return sorted(groups.values(), key=itemgetter("total"), reverse=True)
+
+
+# -----------------------------
+# Cache
+# -----------------------------
+def _age(rep) -> float:
+    return (datetime.utcnow() - rep["generated_at"]).total_seconds()
+
+
+def refresh(full: bool = False, max_age: float | None = None) -> dict:
+    """Fold in new reviews (or rebuild) and recompute the report.
+
+    With max_age, a report at most that old is returned as is; callers that
+    queued on the lock then reuse the refresh that just finished.
+    """
+    global _state, _report
+    with _lock:
+        if max_age is not None and not full and _report is not None and _age(_report) <= max_age:
+            return _report
+        state = _state
+        rebuild_age = current_app.config.get("ANALYTICS_REBUILD_AGE", 6 * 3600)
+        if full or state is None or time.time() - state.built_at > rebuild_age:
+            state = ReviewFacts()
+        state.extend()
+        _state, _report = state, state.report()
+    return _report
+
+
+def report() -> dict:
+    """The cached report, refreshed first when older than ANALYTICS_REFRESH_INTERVAL."""
+    interval = current_app.config.get("ANALYTICS_REFRESH_INTERVAL", 300)
+    current = _report
+    if current is None or _age(current) > interval:
+        return refresh(max_age=interval)
+    return current
+
+
+def invalidate():
+    """Rebuild from scratch on the next refresh (reviews were rewritten, not just added)."""
+    global _state
+    with _lock:
+        _state = None
+
+
+class AnalyticsRefresher(threading.Thread):
+    def __init__(self, app, interval: float | None = None):
+        super().__init__(name="analytics-refresher", daemon=True)
+        self.app = app
+        self.interval = interval or app.config.get("ANALYTICS_REFRESH_INTERVAL", 300)
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                with self.app.app_context():
+                    refresh()
+            except Exception as e:
+                print(f"[analytics] refresh error: {e}")
+            finally:
+                with self.app.app_context():
+                    db.session.remove()
+            self._stop_event.wait(self.interval)
+
+    def stop(self, timeout: float | None = None):
+        self._stop_event.set()
+        self.join(timeout)
+
+
+def start_refresher(app) -> AnalyticsRefresher:
+    refresher = AnalyticsRefresher(app)
+    refresher.start()
+    return refresher
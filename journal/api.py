@@ -0,0 +1,330 @@
+# journal/api.py
+"""
+JSON API, version 1 (/api/v1), for integration scripts.
+
+  GET /api/v1/submissions[?scope=&status=&department=&issue_id=]   GET /api/v1/submissions/<id>
+  GET /api/v1/reviews[?submission_id=]                              GET /api/v1/reviews/<id>
+  GET /api/v1/issues                                                GET /api/v1/issues/<id>
+  GET /api/v1/users[?role=]   (admins)                              GET /api/v1/users/<id>
+
+Common parameters:
+  fields=id,title,status   only these columns are SELECTed (load_only) and returned
+  per_page=, after=, before=   keyset pagination, as in the HTML listings;
+                           responses carry links.next / links.prev
+
+Authentication is the normal login session. Every response has an ETag, so
+a repeat GET with If-None-Match gets 304.
+
+Who wrote and who reviews a submission (author_id, assigned_reviewer_id) is
+only returned to callers that pass authorize("view") on it: the author, its
+panel and admins. Everyone else gets the public field set, and asking for
+those fields is a 400, as for an unknown field.
+
+Serialisers are built once per (resource, fields) and cached: a tuple of
+(name, attribute getter, converter) chosen from the column types, so
+rendering a row is a plain loop with no per-row inspection of the model.
+"""
+from functools import lru_cache
+from operator import attrgetter
+
+from flask import Blueprint, abort, jsonify, request, url_for
+from sqlalchemy import Enum as SAEnum, DateTime
+from sqlalchemy.orm import load_only
+from werkzeug.exceptions import HTTPException
+
+from . import db
+from .models import Issue, Review, ReviewDecision, Role, Submission, SubmissionStatus, User, submission_reviewer
+from .pagination import keyset_paginate
+from .permissions import authorize, current_auth
+from .querybudget import query_budget
+from .routing import use_replica
+
+api_bp = Blueprint("api", __name__, url_prefix="/api/v1")
+
+
+class Resource:
+    def __init__(self, model, fields, order, always=("id",), descending=True, private=()):
+        self.model = model
+        self.fields = fields                 # public name -> column name
+        self.order = order                   # keyset columns
+        self.always = always                 # loaded whatever ?fields= says (keys, permission checks)
+        self.descending = descending
+        # returned only to callers allowed to view the object; still loaded via `always`
+        self.public = {n: c for n, c in fields.items() if n not in private}
+
+    def columns(self, names):
+        return [getattr(self.model, self.fields.get(n, n)) for n in names]
+
+
+SUBMISSIONS = Resource(Submission, {n: n for n in (
+    "id", "title", "abstract", "keywords", "authors_text", "department", "status",
+    "created_at", "author_id", "assigned_reviewer_id", "issue_id")},
+    order=[Submission.created_at, Submission.id],
+    always=("id", "created_at", "status", "author_id", "assigned_reviewer_id"),
+    private=("author_id", "assigned_reviewer_id"))
+REVIEWS = Resource(Review, {n: n for n in (
+    "id", "submission_id", "reviewer_id", "score", "decision", "comment", "created_at")},
+    order=[Review.created_at, Review.id], always=("id", "created_at", "submission_id", "reviewer_id"))
+ISSUES = Resource(Issue, {n: n for n in ("id", "volume", "number", "year", "published_at")},
+                  order=[Issue.year, Issue.volume, Issue.number, Issue.id],
+                  always=("id", "year", "volume", "number"))
+# username order, like /admin/users: read off ix_user_role_username when filtered by role
+USERS = Resource(User, {n: n for n in ("id", "username", "email", "role", "department")},
+                 order=[User.username, User.id], always=("id", "username"), descending=False)
+
+
+# -----------------------------
+# Serialisation
+# -----------------------------
+def _enum_value(v):
+    return None if v is None else v.value
+
+
+def _iso(v):
+    return None if v is None else v.isoformat()
+
+
+@lru_cache(maxsize=256)
+def serializer(resource: Resource, names: tuple):
+    """obj -> dict for exactly `names`; built once per field set."""
+    plain, converted = [], []
+    for name in names:
+        col = resource.model.__table__.c[resource.fields[name]]
+        get = attrgetter(col.key)
+        if isinstance(col.type, SAEnum):
+            converted.append((name, get, _enum_value))
+        elif isinstance(col.type, DateTime):
+            converted.append((name, get, _iso))
+        else:
+            plain.append((name, get))
+    plain, converted = tuple(plain), tuple(converted)
+
+    def serialize(obj):
+        out = {name: get(obj) for name, get in plain}
+        for name, get, conv in converted:
+            out[name] = conv(get(obj))
+        return out
+    return serialize
+
+
+def _fields(resource: Resource, private_ok: bool = True) -> tuple:
+    available = resource.fields if private_ok else resource.public
+    raw = request.args.get("fields")
+    if not raw:
+        return tuple(available)
+    names = tuple(dict.fromkeys(n.strip() for n in raw.split(",") if n.strip()))
+    unknown = [n for n in names if n not in available]
+    if unknown or not names:
+        abort(400, f"unknown field(s) {unknown}; available: {', '.join(available)}")
+    return names
+
+
+def _load(resource: Resource, names):
+    # only the requested columns (+ the sort key); any lazy load would be a bug, so raise
+    wanted = dict.fromkeys((*resource.always, *names))
+    return load_only(*resource.columns(wanted), raiseload=True)
+
+
+def _enum(cls, value):
+    try:
+        return cls[str(value).strip().upper()]
+    except KeyError:
+        abort(400, f"unknown {cls.__name__} {value!r} (one of {', '.join(m.value for m in cls)})")
+
+
+def _int_arg(name):
+    value = request.args.get(name)
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        abort(400, f"{name} must be an integer")
+
+
+def _respond(payload):
+    resp = jsonify(payload)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    resp.add_etag()
+    return resp.make_conditional(request)
+
+
+def _listing(resource: Resource, query, order=None, private_ok=True):
+    names = _fields(resource, private_ok)
+    page = keyset_paginate(query.options(_load(resource, names)), order or resource.order,
+                           descending=resource.descending)
+    ser = serializer(resource, names)
+
+    args = {k: v for k, v in request.args.items() if k not in ("after", "before")}
+    links = {}
+    if page.has_next:
+        links["next"] = url_for(request.endpoint, **request.view_args, **args, after=page.next_cursor)
+    if page.has_prev:
+        links["prev"] = url_for(request.endpoint, **request.view_args, **args, before=page.prev_cursor)
+    return _respond({"data": [ser(obj) for obj in page.items], "links": links,
+                     "meta": {"per_page": page.per_page, "count": len(page.items)}})
+
+
+def _single(resource: Resource, obj, private_ok=True):
+    return _respond({"data": serializer(resource, _fields(resource, private_ok))(obj)})
+
+
+def _get(resource: Resource, id_):
+    return db.session.get(resource.model, id_, options=[_load(resource, _fields(resource))]) or abort(404)
+
+
+def _login():
+    ctx = current_auth()
+    if not ctx.authenticated:
+        abort(401, "log in first")
+    return ctx
+
+
+# -----------------------------
+# Blueprint plumbing
+# -----------------------------
+@api_bp.before_request
+def _read_from_replica():
+    if request.method in ("GET", "HEAD"):
+        use_replica()
+
+
+@api_bp.errorhandler(HTTPException)
+def _error(e):
+    return jsonify(error=e.name, message=e.description), e.code
+
+
+# -----------------------------
+# Submissions
+# -----------------------------
+@api_bp.route("/submissions")
+@query_budget(2)
+def submissions():
+    """
+    scope=accepted (default; anyone), authored (your own), reviewing (your
+    reviewer panels), all (admins). Each scope is one indexed query.
+    Only scope=accepted can contain submissions the caller may not view, so
+    it gets the public fields (unless the caller is an admin).
+    """
+    scope = request.args.get("scope") or "accepted"
+    q = Submission.query
+    order = None
+    if scope == "accepted":
+        q = q.filter(Submission.status == SubmissionStatus.ACCEPTED)
+    elif scope == "authored":
+        q = q.filter(Submission.author_id == _login().user_id)
+    elif scope == "reviewing":
+        sr = submission_reviewer
+        q = q.join(sr, sr.c.submission_id == Submission.id).filter(sr.c.reviewer_id == _login().user_id)
+        # same ordering as the reviewer queue: straight off the panel index
+        order = [sr.c.submission_id.label("id")]
+    elif scope == "all":
+        if not _login().has("ADMIN"):
+            abort(403)
+    else:
+        abort(400, "scope is one of accepted, authored, reviewing, all")
+
+    if request.args.get("status"):
+        if scope == "accepted":
+            abort(400, "status cannot be combined with scope=accepted")
+        q = q.filter(Submission.status == _enum(SubmissionStatus, request.args["status"]))
+    if request.args.get("department"):
+        q = q.filter(Submission.department == request.args["department"])
+    issue_id = _int_arg("issue_id")
+    if issue_id is not None:
+        q = q.filter(Submission.issue_id == issue_id)
+    private_ok = scope != "accepted" or current_auth().has("ADMIN")
+    return _listing(SUBMISSIONS, q, order, private_ok)
+
+
+@api_bp.route("/submissions/<int:submission_id>")
+@query_budget(3)
+def submission(submission_id):
+    sub = _get(SUBMISSIONS, submission_id)
+    if sub.status != SubmissionStatus.ACCEPTED:
+        _login()
+        authorize("view", sub)
+        return _single(SUBMISSIONS, sub)
+    # published: anyone may read it, but only the author/panel/admins see who is behind it
+    return _single(SUBMISSIONS, sub, current_auth().can("view", sub))
+
+
+# -----------------------------
+# Reviews
+# -----------------------------
+@api_bp.route("/reviews")
+@query_budget(4)
+def reviews():
+    """Reviews of ?submission_id= (anyone who may view it); otherwise your own, or all for admins."""
+    ctx = _login()
+    q = Review.query
+    submission_id = _int_arg("submission_id")
+    if submission_id is not None:
+        sub = db.session.get(Submission, submission_id,
+                             options=[load_only(Submission.id, Submission.author_id,
+                                                Submission.assigned_reviewer_id, raiseload=True)])
+        if sub is None:
+            abort(404)
+        authorize("view", sub)
+        q = q.filter(Review.submission_id == submission_id)
+    elif not ctx.has("ADMIN"):
+        q = q.filter(Review.reviewer_id == ctx.user_id)
+    if request.args.get("decision"):
+        q = q.filter(Review.decision == _enum(ReviewDecision, request.args["decision"]))
+    return _listing(REVIEWS, q)
+
+
+@api_bp.route("/reviews/<int:review_id>")
+@query_budget(4)
+def review(review_id):
+    ctx = _login()
+    rev = _get(REVIEWS, review_id)
+    if rev.reviewer_id != ctx.user_id:
+        sub = db.session.get(Submission, rev.submission_id,
+                             options=[load_only(Submission.id, Submission.author_id,
+                                                Submission.assigned_reviewer_id, raiseload=True)])
+        authorize("view", sub)
+    return _single(REVIEWS, rev)
+
+
+# -----------------------------
+# Issues
+# -----------------------------
+@api_bp.route("/issues")
+@query_budget(2)
+def issues():
+    return _listing(ISSUES, Issue.query)
+
+
+@api_bp.route("/issues/<int:issue_id>")
+@query_budget(2)
+def issue(issue_id):
+    return _single(ISSUES, _get(ISSUES, issue_id))
+
+
+# -----------------------------
+# Users
+# -----------------------------
+def _admin():
+    ctx = _login()
+    if not ctx.has("manage_users"):
+        abort(403)
+
+
+@api_bp.route("/users")
+@query_budget(2)
+def users():
+    _admin()
+    q = User.query
+    if request.args.get("role"):
+        q = q.filter(User.role == _enum(Role, request.args["role"]))
+    return _listing(USERS, q)
+
+
+@api_bp.route("/users/<int:user_id>")
+@query_budget(2)
+def user(user_id):
+    ctx = _login()
+    if user_id != ctx.user_id:
+        _admin()
+    return _single(USERS, _get(USERS, user_id))
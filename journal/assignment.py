@@ -0,0 +1,280 @@
+# journal/assignment.py
+"""
+Reviewer assignment: bulk apply and an automatic load-balancing planner.
+
+plan_round() loads everything it needs in four column-only queries:
+  - pending submissions
+  - reviewers
+  - each reviewer's open load (submissions under review they are assigned to
+    and have not reviewed yet)
+  - the keywords of everything each reviewer has been assigned before, which
+    serves as their expertise profile
+
+It then walks the submissions oldest-first, once. Each reviewer under their
+cap is scored on department match, keyword overlap and current load, and the
+best `per_submission` are taken. Loads are updated in memory as it goes, so
+later submissions see earlier picks. Authors are never assigned their own
+submission.
+
+apply_assignments() writes a whole round in one transaction: one executemany
+INSERT into submission_reviewer of the seats not already held (only those
+reviewers are emailed; authors are refused on their own submissions), and
+one executemany UPDATE that moves the submissions to under review and sets
+assigned_reviewer_id to the first reviewer. The UPDATE only touches rows that are still pending, so a
+submission someone else assigned meanwhile makes the round fail and roll back
+(AssignmentConflict) instead of double-assigning it.
+"""
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from flask import url_for
+from sqlalchemy import and_, bindparam, exists, func, insert, or_, select, update
+
+from . import db
+from .models import Review, ReviewDecision, Role, Submission, SubmissionStatus, User, submission_reviewer
+from .notifications import notify
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#.-]*")
+
+# score weights: a department match is worth about three shared keywords;
+# a reviewer at their cap loses about as much as two shared keywords
+W_DEPARTMENT = 3.0
+W_KEYWORD = 1.0
+W_LOAD = 2.0
+
+
+class AssignmentError(ValueError):
+    pass
+
+
+class AssignmentConflict(AssignmentError):
+    pass
+
+
+@dataclass
+class Pick:
+    submission_id: int
+    reviewer_ids: list
+    scores: list = field(default_factory=list)
+
+
+def keywords(text) -> set:
+    """Normalised keyword set from a comma/semicolon separated keywords field."""
+    out = set()
+    for part in re.split(r"[,;]", (text or "").lower()):
+        part = " ".join(_WORD.findall(part))
+        if part:
+            out.add(part)
+    return out
+
+
+def open_loads() -> dict:
+    """reviewer id -> number of under-review submissions they still owe a review for."""
+    sr = submission_reviewer
+    reviewed = exists().where(and_(Review.submission_id == sr.c.submission_id,
+                                   Review.reviewer_id == sr.c.reviewer_id))
+    rows = db.session.execute(
+        select(sr.c.reviewer_id, func.count())
+        .join(Submission, Submission.id == sr.c.submission_id)
+        .where(Submission.status == SubmissionStatus.UNDER_REVIEW, ~reviewed)
+        .group_by(sr.c.reviewer_id)
+    )
+    return dict(rows.all())
+
+
+def _profiles() -> dict:
+    sr = submission_reviewer
+    rows = db.session.execute(
+        select(sr.c.reviewer_id, Submission.keywords)
+        .join(Submission, Submission.id == sr.c.submission_id)
+        .where(Submission.keywords.is_not(None))
+    )
+    profiles = defaultdict(set)
+    for rid, kw in rows:
+        profiles[rid] |= keywords(kw)
+    return profiles
+
+
+def plan_round(per_submission: int = 2, cap: int = 5, limit: int | None = None) -> tuple[list, list]:
+    """(picks, unassigned submission ids) for the current pending submissions; writes nothing."""
+    if per_submission < 1 or cap < 1:
+        raise AssignmentError("per_submission and cap must be at least 1")
+
+    subs = db.session.execute(
+        select(Submission.id, Submission.author_id, Submission.department, Submission.keywords)
+        .where(Submission.status == SubmissionStatus.PENDING)
+        .order_by(Submission.created_at, Submission.id)
+        .limit(limit)
+    ).all()
+    reviewers = db.session.execute(
+        select(User.id, User.department).where(User.role == Role.REVIEWER).order_by(User.id)
+    ).all()
+    load = open_loads()
+    profiles = _profiles()
+
+    dept = {rid: (d or "").strip().lower() for rid, d in reviewers}
+    # inverted index: keyword -> reviewers who have handled it
+    by_keyword = defaultdict(list)
+    for rid, kws in profiles.items():
+        if rid in dept:
+            for kw in kws:
+                by_keyword[kw].append(rid)
+
+    picks, unassigned = [], []
+    for sid, author_id, sub_dept, sub_kw in subs:
+        overlap = defaultdict(int)
+        for kw in keywords(sub_kw):
+            for rid in by_keyword.get(kw, ()):
+                overlap[rid] += 1
+        sub_dept = (sub_dept or "").strip().lower()
+
+        scored = []
+        for rid in dept:
+            current = load.get(rid, 0)
+            if rid == author_id or current >= cap:
+                continue
+            score = (W_DEPARTMENT * (sub_dept != "" and dept[rid] == sub_dept)
+                     + W_KEYWORD * overlap.get(rid, 0)
+                     - W_LOAD * current / cap)
+            scored.append((-score, current, rid))
+        if not scored:
+            unassigned.append(sid)
+            continue
+        scored.sort()
+        chosen = scored[:per_submission]
+        for _, _, rid in chosen:
+            load[rid] = load.get(rid, 0) + 1
+        picks.append(Pick(sid, [rid for _, _, rid in chosen], [round(-s, 2) for s, _, _ in chosen]))
+    return picks, unassigned
+
+
+def apply_assignments(picks, notify_reviewers: bool = True, only_pending: bool = True) -> int:
+    """
+    Assign every (submission, reviewers) pick in one transaction; returns
+    submissions assigned. only_pending=False also lets editors add reviewers to
+    submissions already under review (their first reviewer is kept).
+    """
+    picks = [p for p in picks if p.reviewer_ids]
+    if not picks:
+        return 0
+
+    sub_ids = [p.submission_id for p in picks]
+    reviewer_ids = {rid for p in picks for rid in p.reviewer_ids}
+    known = set(db.session.execute(
+        select(User.id).where(User.id.in_(reviewer_ids), User.role == Role.REVIEWER)).scalars())
+    if known != reviewer_ids:
+        raise AssignmentError(f"not reviewers: {sorted(reviewer_ids - known)}")
+
+    # seats already held (panel or first reviewer) are not re-inserted or re-notified
+    sr = submission_reviewer
+    authors, held = {}, set()
+    for sid, author_id, first in db.session.execute(
+            select(Submission.id, Submission.author_id, Submission.assigned_reviewer_id)
+            .where(Submission.id.in_(sub_ids))):
+        authors[sid] = author_id
+        if first is not None:
+            held.add((sid, first))
+    held |= set(db.session.execute(
+        select(sr.c.submission_id, sr.c.reviewer_id).where(sr.c.submission_id.in_(sub_ids))).all())
+    own = sorted(p.submission_id for p in picks if authors.get(p.submission_id) in p.reviewer_ids)
+    if own:
+        raise AssignmentError(f"authors cannot review their own submission: {own}")
+    seats = [(p.submission_id, rid) for p in picks for rid in p.reviewer_ids
+             if (p.submission_id, rid) not in held]
+
+    try:
+        if seats:
+            db.session.execute(
+                insert(sr).prefix_with("OR IGNORE", dialect="sqlite"),
+                [{"submission_id": sid, "reviewer_id": rid} for sid, rid in seats],
+            )
+        t = Submission.__table__
+        # or_() rather than IN: expanding parameters cannot go through executemany
+        allowed = t.c.status == SubmissionStatus.PENDING
+        if not only_pending:
+            allowed = or_(allowed, t.c.status == SubmissionStatus.UNDER_REVIEW)
+        result = db.session.execute(
+            update(t)
+            .where(t.c.id == bindparam("sid"), allowed)
+            .values(status=SubmissionStatus.UNDER_REVIEW,
+                    assigned_reviewer_id=func.coalesce(t.c.assigned_reviewer_id, bindparam("rid"))),
+            [{"sid": p.submission_id, "rid": p.reviewer_ids[0]} for p in picks],
+        )
+        if result.rowcount != len(picks):
+            state = "pending" if only_pending else "open for review"
+            raise AssignmentConflict(
+                f"{len(picks) - result.rowcount} of {len(picks)} submission(s) are not {state}")
+        if notify_reviewers and seats:
+            _notify(seats)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    # the bulk UPDATE bypasses the ORM, so the session hooks never saw it
+    from .stats import invalidate
+    invalidate()
+    return len(picks)
+
+
+def _notify(seats):
+    """One assignment email per newly taken (submission id, reviewer id) seat."""
+    subs = {row.id: row for row in db.session.execute(
+        select(Submission.id, Submission.title, Submission.authors_text, User.username.label("author"))
+        .join(User, User.id == Submission.author_id)
+        .where(Submission.id.in_({sid for sid, _ in seats})))}
+    people = {row.id: row for row in db.session.execute(
+        select(User.id, User.username, User.email)
+        .where(User.id.in_({rid for _, rid in seats})))}
+    queue_url = url_for("journal.reviewer_queue", _external=True)
+    for sid, rid in seats:
+        sub, r = subs[sid], people[rid]
+        if r.email:
+            notify(r.email, r.username, "assignment",
+                   reviewer_name=r.username, title=sub.title,
+                   author_name=sub.author or sub.authors_text,
+                   download_url=url_for("journal.download_submission", submission_id=sid, _external=True),
+                   queue_url=queue_url)
+
+
+def panel_reviews(submission) -> dict:
+    """Panel reviewer id -> their latest Review of the submission (None until they file one)."""
+    panel = dict.fromkeys(db.session.execute(
+        select(submission_reviewer.c.reviewer_id)
+        .where(submission_reviewer.c.submission_id == submission.id)
+    ).scalars())
+    if submission.assigned_reviewer_id is not None:
+        panel.setdefault(submission.assigned_reviewer_id)
+    for review in (Review.query.filter_by(submission_id=submission.id)
+                   .order_by(Review.created_at, Review.id)):
+        if review.reviewer_id in panel:
+            panel[review.reviewer_id] = review
+    return panel
+
+
+def panel_outcome(reviews: dict):
+    """
+    ACCEPTED / REJECTED once every panel member has reviewed and they all
+    recommend the same; None otherwise (still outstanding, revisions asked
+    for, or a split panel that the editor decides).
+    """
+    if not reviews or None in reviews.values():
+        return None
+    decisions = {r.decision for r in reviews.values()}
+    if decisions == {ReviewDecision.ACCEPT}:
+        return SubmissionStatus.ACCEPTED
+    if decisions == {ReviewDecision.REJECT}:
+        return SubmissionStatus.REJECTED
+    return None
+
+
+def is_assigned(submission, user_id) -> bool:
+    """True if `user_id` is on the submission's reviewer panel."""
+    if submission.assigned_reviewer_id == user_id:
+        return True
+    return db.session.execute(
+        select(submission_reviewer.c.reviewer_id)
+        .where(submission_reviewer.c.submission_id == submission.id,
+               submission_reviewer.c.reviewer_id == user_id)
+    ).first() is not None
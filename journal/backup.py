@@ -0,0 +1,284 @@
+# journal/backup.py
+"""
+Incremental, deduplicating backups of the SQLite database and the upload folder.
+
+Repository layout (BACKUP_DIR):
+  chunks/<ab>/<sha256>      zlib-compressed chunk, named by the hash of its plain bytes
+  snapshots/<stamp>.json    manifest: every file as a list of chunk hashes
+
+The database is copied with SQLite's online backup API, so the snapshot is
+consistent even while the app is writing. It is then split into fixed-size
+chunks; pages that did not change since last night hash to chunks we already
+hold. An upload whose size and mtime match the previous snapshot is not
+opened at all; its entry is carried over. Everything else is hashed,
+compressed and written by a process pool, one task per chunk, and chunks
+already in the repository are skipped.
+
+prune() keeps the newest snapshot per day / per week for the requested
+number of days / weeks and deletes chunks nothing references any more.
+restore() rebuilds the files into a directory, checking every chunk hash
+and file size, and runs PRAGMA integrity_check on the database.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+CHUNK_SIZE = 4 * 1024 * 1024
+DB_NAME = "database.db"
+UPLOADS_PREFIX = "uploads/"
+
+
+class BackupError(Exception):
+    pass
+
+
+def _chunk_path(repo: str, digest: str) -> str:
+    return os.path.join(repo, "chunks", digest[:2], digest)
+
+
+def _store_chunk(task):
+    """Pool worker: hash one slice of a file, compress and write it unless present."""
+    repo, path, offset, length, level = task
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read(length)
+    digest = hashlib.sha256(data).hexdigest()
+    dest = _chunk_path(repo, digest)
+    if os.path.exists(dest):
+        return digest, len(data), 0
+    packed = zlib.compress(data, level)
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dest), suffix=".tmp")
+    with os.fdopen(fd, "wb") as out:
+        out.write(packed)
+    # two workers may race on the same chunk; either copy is correct
+    os.replace(tmp, dest)
+    return digest, len(data), len(packed)
+
+
+def _read_chunk(repo: str, digest: str) -> bytes:
+    try:
+        with open(_chunk_path(repo, digest), "rb") as f:
+            data = zlib.decompress(f.read())
+    except FileNotFoundError:
+        raise BackupError(f"missing chunk {digest}")
+    except zlib.error as e:
+        raise BackupError(f"corrupt chunk {digest}: {e}")
+    if hashlib.sha256(data).hexdigest() != digest:
+        raise BackupError(f"chunk {digest} does not match its hash")
+    return data
+
+
+def snapshot_sqlite(db_path: str, dest: str):
+    """Consistent copy of a live SQLite database (online backup API)."""
+    src = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    dst = sqlite3.connect(dest)
+    try:
+        src.backup(dst, pages=4096)
+    finally:
+        dst.close()
+        src.close()
+
+
+# -----------------------------
+# Snapshots
+# -----------------------------
+def _snapshots_dir(repo):
+    return os.path.join(repo, "snapshots")
+
+
+def list_snapshots(repo: str) -> list[str]:
+    try:
+        names = os.listdir(_snapshots_dir(repo))
+    except FileNotFoundError:
+        return []
+    return sorted(n[:-5] for n in names if n.endswith(".json"))
+
+
+def load_manifest(repo: str, name: str) -> dict:
+    try:
+        with open(os.path.join(_snapshots_dir(repo), f"{name}.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise BackupError(f"no snapshot {name!r}")
+
+
+def _walk(root):
+    for base, _, files in os.walk(root):
+        for fname in files:
+            if fname.endswith(".tmp"):
+                continue
+            full = os.path.join(base, fname)
+            yield os.path.relpath(full, root).replace(os.sep, "/"), full
+
+
+def create_backup(repo: str, db_path: str | None, uploads: str | None,
+                  workers: int | None = None, level: int = 6, chunk_size: int = CHUNK_SIZE,
+                  log=print) -> dict:
+    os.makedirs(_snapshots_dir(repo), exist_ok=True)
+    previous = list_snapshots(repo)
+    prev_files = load_manifest(repo, previous[-1])["files"] if previous else {}
+
+    started = time.perf_counter()
+    name = datetime.now().strftime("%Y%m%d-%H%M%S")
+    files, pending = {}, []      # pending: (arcname, path, size, mtime_ns)
+    reused = 0
+
+    with tempfile.TemporaryDirectory(dir=repo) as tmp:
+        if db_path:
+            if not os.path.exists(db_path):
+                raise BackupError(f"database not found: {db_path}")
+            copy = os.path.join(tmp, DB_NAME)
+            snapshot_sqlite(db_path, copy)
+            st = os.stat(copy)
+            pending.append((DB_NAME, copy, st.st_size, None))
+
+        if uploads and os.path.isdir(uploads):
+            for rel, full in _walk(uploads):
+                st = os.stat(full)
+                arcname = UPLOADS_PREFIX + rel
+                old = prev_files.get(arcname)
+                if old and old["size"] == st.st_size and old.get("mtime_ns") == st.st_mtime_ns:
+                    files[arcname] = old
+                    reused += 1
+                else:
+                    pending.append((arcname, full, st.st_size, st.st_mtime_ns))
+
+        tasks, owners = [], []
+        for idx, (_, path, size, _) in enumerate(pending):
+            for offset in range(0, max(size, 1), chunk_size):
+                tasks.append((repo, path, offset, chunk_size, level))
+                owners.append(idx)
+
+        new_chunks = new_bytes = 0
+        chunks = [[] for _ in pending]
+        if tasks:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for owner, (digest, plain, packed) in zip(owners, pool.map(_store_chunk, tasks, chunksize=4)):
+                    if plain or not chunks[owner]:
+                        chunks[owner].append(digest)
+                    if packed:
+                        new_chunks += 1
+                        new_bytes += packed
+
+        for (arcname, path, size, mtime_ns), digests in zip(pending, chunks):
+            files[arcname] = {"size": size, "mtime_ns": mtime_ns, "chunks": digests}
+
+    manifest = {"name": name, "created": datetime.now().isoformat(timespec="seconds"),
+                "chunk_size": chunk_size, "files": files}
+    path = os.path.join(_snapshots_dir(repo), f"{name}.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f)
+    os.replace(path + ".tmp", path)
+
+    log(f"[backup] {name}: {len(files)} file(s), {reused} unchanged upload(s) skipped, "
+        f"{len(pending)} read, {new_chunks} new chunk(s) ({new_bytes / 1048576:.1f} MiB) "
+        f"in {time.perf_counter() - started:.1f}s")
+    return manifest
+
+
+# -----------------------------
+# Retention
+# -----------------------------
+def select_keep(names: list[str], keep_last: int, keep_daily: int, keep_weekly: int) -> set:
+    keep = set(names[-keep_last:]) if keep_last else set()
+    days, weeks = {}, {}
+    for name in reversed(names):               # newest first
+        ts = datetime.strptime(name, "%Y%m%d-%H%M%S")
+        day, week = ts.date(), ts.isocalendar()[:2]
+        if day not in days and len(days) < keep_daily:
+            days[day] = name
+        if week not in weeks and len(weeks) < keep_weekly:
+            weeks[week] = name
+    return keep | set(days.values()) | set(weeks.values())
+
+
+def prune(repo: str, keep_last: int = 3, keep_daily: int = 7, keep_weekly: int = 4,
+          dry_run: bool = False, log=print) -> tuple[list, int]:
+    names = list_snapshots(repo)
+    keep = select_keep(names, keep_last, keep_daily, keep_weekly)
+    drop = [n for n in names if n not in keep]
+
+    referenced = set()
+    for name in keep:
+        for entry in load_manifest(repo, name)["files"].values():
+            referenced.update(entry["chunks"])
+
+    orphans = []
+    chunk_root = os.path.join(repo, "chunks")
+    if os.path.isdir(chunk_root):
+        for rel, full in _walk(chunk_root):
+            if os.path.basename(rel) not in referenced:
+                orphans.append(full)
+
+    if not dry_run:
+        for name in drop:
+            os.remove(os.path.join(_snapshots_dir(repo), f"{name}.json"))
+        for full in orphans:
+            os.remove(full)
+    log(f"[backup] {'would drop' if dry_run else 'dropped'} {len(drop)} snapshot(s) and "
+        f"{len(orphans)} unreferenced chunk(s); keeping {len(keep)}")
+    return drop, len(orphans)
+
+
+# -----------------------------
+# Verify / restore
+# -----------------------------
+def _rebuild(repo, entry, out=None):
+    # every chunk is checked against its hash as it is read
+    size = 0
+    for digest in entry["chunks"]:
+        data = _read_chunk(repo, digest)
+        size += len(data)
+        if out is not None:
+            out.write(data)
+    if size != entry["size"]:
+        raise BackupError(f"size mismatch ({size} != {entry['size']})")
+
+
+def verify(repo: str, name: str, log=print) -> int:
+    manifest = load_manifest(repo, name)
+    for arcname, entry in manifest["files"].items():
+        try:
+            _rebuild(repo, entry)
+        except BackupError as e:
+            raise BackupError(f"{arcname}: {e}")
+    log(f"[backup] {name}: {len(manifest['files'])} file(s) verified")
+    return len(manifest["files"])
+
+
+def restore(repo: str, name: str, target: str, log=print) -> str:
+    """Rebuild snapshot `name` under `target` (database.db + uploads/); returns the DB path."""
+    manifest = load_manifest(repo, name)
+    target = os.path.abspath(target)
+    for arcname, entry in manifest["files"].items():
+        dest = os.path.abspath(os.path.join(target, arcname))
+        if not dest.startswith(target + os.sep):
+            raise BackupError(f"refusing to restore outside {target}: {arcname}")
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        with open(dest + ".tmp", "wb") as out:
+            try:
+                _rebuild(repo, entry, out)
+            except BackupError as e:
+                raise BackupError(f"{arcname}: {e}")
+        os.replace(dest + ".tmp", dest)
+        if entry.get("mtime_ns"):
+            os.utime(dest, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+
+    db_path = os.path.join(target, DB_NAME)
+    if DB_NAME in manifest["files"]:
+        conn = sqlite3.connect(db_path)
+        try:
+            result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+        finally:
+            conn.close()
+        if result != "ok":
+            raise BackupError(f"restored database failed integrity_check: {result}")
+    log(f"[backup] restored {name} ({len(manifest['files'])} file(s)) into {target}")
+    return db_path
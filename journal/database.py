@@ -0,0 +1,124 @@
+# journal/database.py
+"""
+Database configuration.
+
+DATABASE_URL selects the database (postgres://... is accepted as an alias for
+postgresql://); without it we use instance/database.db. Pool sizing comes from
+DB_POOL_SIZE / DB_MAX_OVERFLOW / DB_POOL_TIMEOUT / DB_POOL_RECYCLE.
+
+SQLite files additionally get per-connection pragmas (SQLITE_TUNING=0 turns
+them off):
+  journal_mode=WAL       readers no longer block the writer and vice versa
+  synchronous=NORMAL     fsync at checkpoints instead of every commit (safe in WAL)
+  busy_timeout           a second writer waits for the lock instead of failing
+                         immediately with "database is locked"
+  mmap_size, cache_size  keep hot pages in memory across requests
+"""
+import os
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+REPLICA_BIND = "replica"
+
+
+def database_uri(instance_path: str) -> str:
+    uri = os.getenv("DATABASE_URL", "")
+    if uri.startswith("postgres://"):
+        uri = "postgresql://" + uri[len("postgres://"):]
+    return uri or f"sqlite:///{os.path.join(instance_path, 'database.db')}"
+
+
+def _is_sqlite_file(uri: str) -> bool:
+    url = make_url(uri)
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:") \
+        and "mode=memory" not in uri
+
+
+def replica_uri(config) -> str | None:
+    """
+    DATABASE_REPLICA_URL: a replica URI, or "ro" for a second, read-only
+    connection to the primary SQLite file (see journal/routing.py).
+    """
+    value = config.get("DATABASE_REPLICA_URL")
+    if not value:
+        return None
+    if value == "ro":
+        primary = config["SQLALCHEMY_DATABASE_URI"]
+        if not _is_sqlite_file(primary):
+            raise RuntimeError("DATABASE_REPLICA_URL=ro needs a SQLite database file")
+        path = os.path.abspath(make_url(primary).database)
+        return f"sqlite:///file:{path}?mode=ro&uri=true"
+    if value.startswith("postgres://"):
+        value = "postgresql://" + value[len("postgres://"):]
+    return value
+
+
+def engine_options(config, uri=None) -> dict:
+    uri = uri or config["SQLALCHEMY_DATABASE_URI"]
+    url = make_url(uri)
+    if url.get_backend_name() == "sqlite":
+        if not _is_sqlite_file(uri):
+            return {}
+        return {
+            "pool_size": config["DB_POOL_SIZE"],
+            "max_overflow": config["DB_MAX_OVERFLOW"],
+            "pool_timeout": config["DB_POOL_TIMEOUT"],
+            "connect_args": {
+                # pysqlite's own lock wait, in seconds; matches busy_timeout
+                "timeout": config["SQLITE_BUSY_TIMEOUT_MS"] / 1000 if config["SQLITE_TUNING"] else 5,
+                "check_same_thread": False,
+            },
+        }
+    return {
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": True,
+    }
+
+
+def configure(config):
+    """Engine options and the replica bind; call before db.init_app()."""
+    config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", engine_options(config))
+    replica = replica_uri(config)
+    if replica:
+        binds = config.setdefault("SQLALCHEMY_BINDS", {})
+        binds.setdefault(REPLICA_BIND, {"url": replica, **engine_options(config, replica)})
+
+
+def sqlite_pragmas(config, read_only=False) -> list[str]:
+    # journal mode and durability belong to the writer; read-only connections can't set them
+    writer = [] if read_only else [
+        f"PRAGMA journal_mode={config['SQLITE_JOURNAL_MODE']}",
+        f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}",
+    ]
+    return writer + [
+        f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}",
+        # negative = KiB rather than pages
+        f"PRAGMA cache_size=-{int(config['SQLITE_CACHE_SIZE_KB'])}",
+    ]
+
+
+def _pragma_hook(pragmas):
+    def _apply_pragmas(dbapi_conn, connection_record):
+        cur = dbapi_conn.cursor()
+        try:
+            for stmt in pragmas:
+                cur.execute(stmt)
+        finally:
+            cur.close()
+    return _apply_pragmas
+
+
+def init_app(app, db):
+    config = app.config
+    if not config["SQLITE_TUNING"]:
+        return
+    with app.app_context():
+        for key, engine in db.engines.items():
+            if _is_sqlite_file(engine.url.render_as_string()):
+                pragmas = sqlite_pragmas(config, read_only=key is not None)
+                event.listen(engine, "connect", _pragma_hook(pragmas))
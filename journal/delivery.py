@@ -0,0 +1,112 @@
+# journal/delivery.py
+"""
+Manuscript delivery for public_pdf and download_submission.
+
+Responses carry a strong ETag (SHA-256 of the file), honour If-None-Match /
+If-Modified-Since (304) and Range (206). Accepted articles are public but only
+cached for PUBLIC_PDF_MAX_AGE seconds: the URL is the same for every version,
+so a new upload or a retraction must reach browsers and CDNs, which then
+revalidate with the ETag (a 304, no body).
+
+FILE_OFFLOAD moves the byte-pushing to the front-end server once access has
+been checked here:
+  nginx     X-Accel-Redirect: FILE_ACCEL_PREFIX/<path under UPLOAD_FOLDER>
+            (needs an `internal` location aliased to the upload folder)
+  sendfile  X-Sendfile: <absolute path>   (Apache mod_xsendfile, lighttpd)
+The front-end then handles Range itself; we still answer 304s.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from flask import current_app, request
+from werkzeug.utils import send_file
+
+_HASH_CHUNK = 1024 * 1024
+_ETAG_CACHE_SIZE = 4096
+
+
+class _ETagCache:
+    """Content hashes keyed by (path, mtime, size): a replaced file gets a new key."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+
+    def get(self, path, st):
+        key = (path, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            etag = self._data.get(key)
+            if etag is not None:
+                self._data.move_to_end(key)
+                return etag
+        etag = file_sha256(path)
+        with self._lock:
+            self._data[key] = etag
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return etag
+
+
+_etags = _ETagCache(_ETAG_CACHE_SIZE)
+
+
+def file_sha256(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _offload_response(path, st, etag, download_name, as_attachment):
+    cfg = current_app.config
+    resp = current_app.response_class(mimetype="application/pdf")
+    if cfg.get("FILE_OFFLOAD") == "nginx":
+        rel = os.path.relpath(path, cfg["UPLOAD_FOLDER"]).replace(os.sep, "/")
+        resp.headers["X-Accel-Redirect"] = f"{cfg.get('FILE_ACCEL_PREFIX', '').rstrip('/')}/{rel}"
+    else:
+        resp.headers["X-Sendfile"] = os.path.abspath(path)
+    resp.headers.set("Content-Disposition", "attachment" if as_attachment else "inline",
+                     filename=download_name)
+    resp.last_modified = st.st_mtime
+    resp.set_etag(etag)
+    resp = resp.make_conditional(request.environ)
+    if resp.status_code == 304:
+        resp.headers.pop("X-Accel-Redirect", None)
+        resp.headers.pop("X-Sendfile", None)
+    return resp
+
+
+def send_pdf(path, download_name, as_attachment=False, public=False, etag=None):
+    """
+    Conditional, range-capable PDF response, or None when the file is missing
+    (callers decide between 404 and a flash/redirect).
+
+    public=True marks the file as a published article (shared caches may keep it).
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    etag = etag or _etags.get(path, st)
+
+    if current_app.config.get("FILE_OFFLOAD") in ("nginx", "sendfile"):
+        resp = _offload_response(path, st, etag, download_name, as_attachment)
+    else:
+        resp = send_file(path, request.environ, mimetype="application/pdf",
+                         as_attachment=as_attachment, download_name=download_name,
+                         conditional=True, etag=etag, last_modified=st.st_mtime,
+                         response_class=current_app.response_class)
+
+    if public:
+        resp.cache_control.no_cache = None
+        resp.cache_control.public = True
+        resp.cache_control.max_age = current_app.config.get("PUBLIC_PDF_MAX_AGE", 300)
+    else:
+        # access depends on the session: never store in shared caches, revalidate via ETag
+        resp.cache_control.private = True
+        resp.cache_control.no_cache = True
+    return resp
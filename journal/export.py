@@ -0,0 +1,199 @@
+# journal/export.py
+"""
+Streaming exports of submissions, reviews and users.
+
+Each dataset is one column-only SELECT executed with stream_results/yield_per,
+so rows are pulled from the database in batches of EXPORT_BATCH_SIZE and
+written out as they arrive; memory stays flat whatever the row count. Output
+formats:
+
+  csv       header + rows
+  ndjson    one JSON object per row
+  columnar  NDJSON row groups: {"columns": [...], "rows": n, "data": {col: [values]}}
+            (the Parquet layout without a pyarrow dependency; load a group
+            straight into a DataFrame with pandas.DataFrame(group["data"]))
+
+gzip() wraps any of them in a streaming gzip encoder.
+"""
+import csv
+import enum
+import io
+import json
+import zlib
+from datetime import date, datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from . import db
+from .models import Issue, Review, ReviewDecision, Submission, SubmissionStatus, User, Role
+
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "columnar": ("application/x-ndjson", "columnar.ndjson"),
+}
+
+
+class ExportError(ValueError):
+    pass
+
+
+def _submissions(f):
+    author = aliased(User)
+    stmt = (select(Submission.id, Submission.title, Submission.status, Submission.department,
+                   Submission.keywords, Submission.author_id, author.username.label("author"),
+                   Submission.assigned_reviewer_id, Submission.issue_id,
+                   Issue.year.label("issue_year"), Issue.volume.label("issue_volume"),
+                   Issue.number.label("issue_number"), Submission.created_at)
+            .join(author, Submission.author_id == author.id)
+            .outerjoin(Issue, Submission.issue_id == Issue.id)
+            .order_by(Submission.id))
+    if f.get("status"):
+        stmt = stmt.where(Submission.status == _enum(SubmissionStatus, f["status"]))
+    return _common(stmt, f, Submission.created_at)
+
+
+def _reviews(f):
+    reviewer = aliased(User)
+    stmt = (select(Review.id, Review.submission_id, Submission.title.label("submission_title"),
+                   Submission.status.label("submission_status"), Submission.department,
+                   Submission.issue_id, Review.reviewer_id, reviewer.username.label("reviewer"),
+                   Review.score, Review.decision, Review.created_at, Review.comment)
+            .join(Submission, Review.submission_id == Submission.id)
+            .join(reviewer, Review.reviewer_id == reviewer.id)
+            .order_by(Review.id))
+    if f.get("status"):
+        stmt = stmt.where(Submission.status == _enum(SubmissionStatus, f["status"]))
+    if f.get("decision"):
+        stmt = stmt.where(Review.decision == _enum(ReviewDecision, f["decision"]))
+    return _common(stmt, f, Review.created_at)
+
+
+def _users(f):
+    stmt = (select(User.id, User.username, User.email, User.role, User.department)
+            .order_by(User.id))
+    if f.get("role"):
+        stmt = stmt.where(User.role == _enum(Role, f["role"]))
+    if f.get("department"):
+        stmt = stmt.where(User.department == f["department"])
+    return stmt
+
+
+def _common(stmt, f, created_col):
+    if f.get("since"):
+        stmt = stmt.where(created_col >= _date(f["since"]))
+    if f.get("until"):
+        # inclusive of the whole day
+        stmt = stmt.where(created_col < datetime.combine(_date(f["until"]), datetime.max.time()))
+    if f.get("department"):
+        stmt = stmt.where(Submission.department == f["department"])
+    if f.get("issue"):
+        try:
+            stmt = stmt.where(Submission.issue_id == int(f["issue"]))
+        except ValueError:
+            raise ExportError(f"issue must be an id, got {f['issue']!r}")
+    return stmt
+
+
+DATASETS = {"submissions": _submissions, "reviews": _reviews, "users": _users}
+
+
+def _enum(cls, value):
+    try:
+        return cls[str(value).upper()]
+    except KeyError:
+        raise ExportError(f"unknown {cls.__name__}: {value!r} "
+                          f"(one of {', '.join(m.name.lower() for m in cls)})")
+
+
+def _date(value):
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ExportError(f"dates are YYYY-MM-DD, got {value!r}")
+
+
+def _plain(v):
+    if isinstance(v, enum.Enum):
+        return v.value
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    return v
+
+
+def build_query(dataset: str, filters: dict):
+    if dataset not in DATASETS:
+        raise ExportError(f"unknown dataset {dataset!r} (one of {', '.join(DATASETS)})")
+    return DATASETS[dataset](filters)
+
+
+def stream_rows(stmt, batch_size: int):
+    """(column names, row iterator); rows arrive from the cursor batch_size at a time."""
+    result = db.session.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+    return list(result.keys()), result
+
+
+def _csv(columns, rows, batch_size):
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    w.writerow(columns)
+    n = 0
+    for row in rows:
+        w.writerow([_plain(v) for v in row])
+        n += 1
+        if n % batch_size == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+def _ndjson(columns, rows, batch_size):
+    out = []
+    for row in rows:
+        out.append(json.dumps({c: _plain(v) for c, v in zip(columns, row)}, ensure_ascii=False))
+        if len(out) >= batch_size:
+            yield "\n".join(out) + "\n"
+            out = []
+    if out:
+        yield "\n".join(out) + "\n"
+
+
+def _columnar(columns, rows, batch_size):
+    def group(data, n):
+        return json.dumps({"columns": columns, "rows": n, "data": dict(zip(columns, data))},
+                          ensure_ascii=False) + "\n"
+    data, n = [[] for _ in columns], 0
+    for row in rows:
+        for col, v in zip(data, row):
+            col.append(_plain(v))
+        n += 1
+        if n >= batch_size:
+            yield group(data, n)
+            data, n = [[] for _ in columns], 0
+    if n:
+        yield group(data, n)
+
+
+_WRITERS = {"csv": _csv, "ndjson": _ndjson, "columnar": _columnar}
+
+
+def export(dataset: str, fmt: str, filters: dict, batch_size: int = 2000):
+    """Iterator of text chunks for `dataset` in `fmt`; run inside an app context."""
+    if fmt not in _WRITERS:
+        raise ExportError(f"unknown format {fmt!r} (one of {', '.join(_WRITERS)})")
+    columns, rows = stream_rows(build_query(dataset, filters), batch_size)
+    return _WRITERS[fmt](columns, rows, batch_size)
+
+
+def gzip(chunks, level: int = 6):
+    """Compress an iterator of text chunks into gzip bytes as it goes."""
+    z = zlib.compressobj(level, zlib.DEFLATED, 31)      # wbits=31: gzip container
+    for chunk in chunks:
+        data = z.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield z.flush()
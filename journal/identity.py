@@ -0,0 +1,182 @@
+# journal/identity.py
+"""
+Cached identities for Flask-Login.
+
+current_user is a frozen Principal (id, username, email, role) instead of an
+ORM User, loaded with one column-only query and kept in a per-process TTL
+cache keyed by (user id, session version). The session version is minted at
+login, so a fresh login never sees an older cached identity.
+
+Invalidation:
+  - commits that touch a User drop that user's entries right away;
+  - the same commits touch IDENTITY_EPOCH_FILE, and every process drops its
+    whole cache when it sees the file change (checked at most once a second),
+    which is how set_roles.py / merge_users.py / delete_user.py reach the
+    gunicorn workers;
+  - anything else is picked up after IDENTITY_CACHE_TTL seconds.
+"""
+import os
+import secrets
+import threading
+import time
+from dataclasses import dataclass
+
+from flask import current_app, has_app_context, session
+from flask_login import UserMixin, user_logged_in
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from . import db, login_manager
+from .models import Role, User
+
+_SESSION_KEY = "_identity_v"
+_CHANGED_KEY = "journal_identity_changed"
+_EPOCH_CHECK_INTERVAL = 1.0
+
+
+@dataclass(frozen=True, eq=False)
+class Principal(UserMixin):
+    id: int
+    username: str
+    email: str
+    role: Role
+
+    @property
+    def is_admin(self):
+        return self.role is Role.ADMIN
+
+    @property
+    def is_reviewer(self):
+        return self.role is Role.REVIEWER
+
+    @property
+    def is_author(self):
+        return self.role is Role.AUTHOR
+
+    def has_role(self, *roles) -> bool:
+        return self.role in roles
+
+
+class IdentityCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+        self._epoch = None
+        self._epoch_checked = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, loader, ttl):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[1] > now:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        value = loader()
+        if value is not None:
+            with self._lock:
+                self._data[key] = (value, now + ttl)
+        return value
+
+    def invalidate(self, user_id=None):
+        with self._lock:
+            if user_id is None:
+                self._data.clear()
+            else:
+                for key in [k for k in self._data if k[0] == user_id]:
+                    del self._data[key]
+
+    def check_epoch(self, path):
+        now = time.monotonic()
+        if now - self._epoch_checked < _EPOCH_CHECK_INTERVAL:
+            return
+        self._epoch_checked = now
+        try:
+            epoch = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            epoch = 0
+        if self._epoch is not None and epoch != self._epoch:
+            self.invalidate()
+        self._epoch = epoch
+
+
+_cache = IdentityCache()
+
+
+def _load_principal(user_id: int):
+    row = db.session.execute(
+        select(User.id, User.username, User.email, User.role).where(User.id == user_id)
+    ).first()
+    return Principal(*row) if row is not None else None
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    try:
+        uid = int(user_id)
+    except (TypeError, ValueError):
+        return None
+    cfg = current_app.config
+    _cache.check_epoch(cfg["IDENTITY_EPOCH_FILE"])
+    return _cache.get((uid, session.get(_SESSION_KEY)), lambda: _load_principal(uid),
+                      cfg.get("IDENTITY_CACHE_TTL", 30))
+
+
+def invalidate(user_id=None, broadcast=True):
+    """Drop cached identities (one user or all); broadcast tells the other processes."""
+    _cache.invalidate(user_id)
+    if broadcast and has_app_context():
+        bump_epoch()
+
+
+def bump_epoch():
+    path = current_app.config["IDENTITY_EPOCH_FILE"]
+    try:
+        with open(path, "a"):
+            pass
+        os.utime(path)
+    except OSError as e:
+        print(f"[identity] could not touch {path}: {e}")
+
+
+def cache_info() -> dict:
+    return {"pid": os.getpid(), "entries": len(_cache._data), "hits": _cache.hits, "misses": _cache.misses}
+
+
+# -----------------------------
+# Hooks
+# -----------------------------
+def _on_login(sender, user, **extra):
+    session[_SESSION_KEY] = secrets.token_hex(4)
+
+
+@event.listens_for(Session, "after_flush")
+def _note_user_changes(sess, flush_context):
+    for obj in sess.deleted:
+        if isinstance(obj, User):
+            sess.info.setdefault(_CHANGED_KEY, set()).add(obj.id)
+    for obj in sess.dirty:
+        # a new submission/assignment marks the User dirty via its collections; ignore those
+        if isinstance(obj, User) and sess.is_modified(obj, include_collections=False):
+            sess.info.setdefault(_CHANGED_KEY, set()).add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(sess):
+    changed = sess.info.pop(_CHANGED_KEY, None)
+    if changed:
+        for uid in changed:
+            _cache.invalidate(uid)
+        if has_app_context():
+            bump_epoch()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(sess):
+    sess.info.pop(_CHANGED_KEY, None)
+
+
+def init_app(app):
+    user_logged_in.connect(_on_login, app)
@@ -0,0 +1,27 @@
+# journal/loading.py
+"""
+Eager-loading profiles for the listing views.
+
+Each profile names exactly the relationships its template touches, so a page
+of N rows costs a fixed number of queries instead of N+1 lazy loads.
+Many-to-one links use joinedload (one LEFT JOIN, safe with LIMIT);
+collections use selectinload (one extra IN query per page).
+"""
+from sqlalchemy.orm import joinedload
+
+from .models import Review, Submission
+
+# admin_submissions.html, review_queue.html: author column
+SUBMISSION_LISTING = (
+    joinedload(Submission.author),
+)
+
+# public_issues.html / public_search.html cards: author fallback for authors_text
+PUBLIC_CARDS = (
+    joinedload(Submission.author),
+)
+
+# submission_detail.html: reviewer name per review
+SUBMISSION_REVIEWS = (
+    joinedload(Review.reviewer),
+)
@@ -4,6 +4,8 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+from flask import has_app_context
+
 
 def _smtp_config():
     return {
@@ -16,42 +18,78 @@ def _smtp_config():
     }
 
 
-def send_email(to_addr: str, subject: str, html_body: str, text_body: str | None = None) -> bool:
-    """
-    Sends an email via SMTP using environment variables.
-
-    Required ENV:
-      SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASS, SMTP_USE_TLS (0/1), MAIL_FROM
-    If missing, falls back to printing the email (no exception).
-    """
-    cfg = _smtp_config()
-
-    if not (cfg["host"] and cfg["user"] and cfg["password"]):
-        # Dev fallback: print instead of sending
-        print("\n=== EMAIL (DEV PRINT) ===")
-        print("To:   ", to_addr)
-        print("From: ", cfg["from_addr"])
-        print("Subj: ", subject)
-        print("BODY (HTML):\n", html_body)
-        print("=========================\n")
-        return True
-
+def build_message(from_addr: str, to_addr: str, subject: str,
+                  html_body: str, text_body: str | None = None) -> MIMEMultipart:
     msg = MIMEMultipart("alternative")
     msg["Subject"] = subject
-    msg["From"] = cfg["from_addr"]
+    msg["From"] = from_addr
     msg["To"] = to_addr
 
     if text_body:
         msg.attach(MIMEText(text_body, "plain"))
     msg.attach(MIMEText(html_body, "html"))
+    return msg
+
+
+def dev_print(cfg, to_addr: str, subject: str, html_body: str):
+    print("\n=== EMAIL (DEV PRINT) ===")
+    print("To:   ", to_addr)
+    print("From: ", cfg["from_addr"])
+    print("Subj: ", subject)
+    print("BODY (HTML):\n", html_body)
+    print("=========================\n")
 
+
+def open_smtp(cfg) -> smtplib.SMTP:
+    server = smtplib.SMTP(cfg["host"], cfg["port"], timeout=30)
+    if cfg["use_tls"]:
+        server.starttls()
+    if cfg["user"] and cfg["password"]:
+        server.login(cfg["user"], cfg["password"])
+    return server
+
+
+def send_email_now(to_addr: str, subject: str, html_body: str, text_body: str | None = None) -> bool:
+    """
+    Sends one email synchronously over a fresh SMTP connection.
+
+    Only for code running without an app/database (one-off scripts); request
+    handlers should use send_email(), which queues.
+    """
+    cfg = _smtp_config()
+
+    if not cfg["host"]:
+        # Dev fallback: print instead of sending
+        dev_print(cfg, to_addr, subject, html_body)
+        return True
+
+    msg = build_message(cfg["from_addr"], to_addr, subject, html_body, text_body)
     try:
-        with smtplib.SMTP(cfg["host"], cfg["port"]) as server:
-            if cfg["use_tls"]:
-                server.starttls()
-            server.login(cfg["user"], cfg["password"])
+        with open_smtp(cfg) as server:
             server.sendmail(cfg["from_addr"], [to_addr], msg.as_string())
         return True
     except Exception as e:
         print(f"[mailer] send_email failed: {e}")
         return False
+
+
+def send_email(to_addr: str, subject: str, html_body: str, text_body: str | None = None,
+               commit: bool = True) -> bool:
+    """
+    Queues an email in the outbox; journal.mailqueue delivers it in the
+    background over a pooled SMTP connection, retrying with backoff.
+
+    commit=False leaves the row in the caller's transaction, so the mail only
+    goes out if the surrounding change is committed.
+
+    ENV (read by the sender):
+      SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASS, SMTP_USE_TLS (0/1), MAIL_FROM
+    Without SMTP_HOST the sender prints the email instead (no exception).
+    Login is skipped when SMTP_USER/SMTP_PASS are empty.
+    """
+    if not has_app_context():
+        return send_email_now(to_addr, subject, html_body, text_body)
+
+    from .mailqueue import enqueue
+    enqueue(to_addr, subject, html_body, text_body, commit=commit)
+    return True
@@ -0,0 +1,223 @@
+# journal/mailqueue.py
+"""
+Outbox delivery for journal.mailer.
+
+Request handlers only insert OutboundEmail rows. A sender (MailWorker thread
+started by create_app when MAIL_WORKER=thread, or `python mail_worker.py` as
+its own process) claims due rows in batches, sends them over one reused SMTP
+connection, and reschedules failures with exponential backoff until
+MAIL_MAX_ATTEMPTS is reached.
+
+Claims are a single conditional UPDATE tagged with the sender's id, so any
+number of threads/processes can drain the same outbox without double sends.
+"""
+import os
+import random
+import smtplib
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+
+from . import db
+from .mailer import _smtp_config, build_message, dev_print, open_smtp
+from .models import EmailStatus, OutboundEmail
+
+
+def enqueue(to_addr, subject, html_body, text_body=None, commit=True) -> OutboundEmail:
+    row = OutboundEmail(
+        to_addr=to_addr,
+        subject=subject,
+        html_body=html_body,
+        text_body=text_body,
+        status=EmailStatus.PENDING,
+        next_attempt_at=datetime.utcnow(),
+    )
+    db.session.add(row)
+    if commit:
+        db.session.commit()
+    return row
+
+
+class SMTPPool:
+    """One long-lived SMTP session, reopened on demand after errors or idling."""
+
+    def __init__(self, cfg=None, idle_timeout: float = 60.0):
+        self.cfg = cfg or _smtp_config()
+        self.idle_timeout = idle_timeout
+        self._server = None
+        self._last_used = 0.0
+        self.connects = 0
+
+    def _connection(self):
+        if self._server is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            # relays drop idle sessions; probe rather than fail the next send
+            try:
+                self._server.noop()
+            except (smtplib.SMTPException, OSError):
+                self.close()
+        if self._server is None:
+            self._server = open_smtp(self.cfg)
+            self.connects += 1
+        return self._server
+
+    def send(self, to_addr, subject, html_body, text_body=None):
+        msg = build_message(self.cfg["from_addr"], to_addr, subject, html_body, text_body).as_string()
+        try:
+            self._connection().sendmail(self.cfg["from_addr"], [to_addr], msg)
+        except smtplib.SMTPServerDisconnected:
+            # stale session: one fresh connection, then let the error surface
+            self.close()
+            self._connection().sendmail(self.cfg["from_addr"], [to_addr], msg)
+        self._last_used = time.monotonic()
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._server = None
+
+
+def _backoff(attempts: int, base: float, cap: float) -> timedelta:
+    delay = min(cap, base * (2 ** (attempts - 1)))
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def requeue_stale(stale_after: float):
+    """Give back rows claimed by a sender that died mid-batch."""
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_after)
+    db.session.execute(
+        update(OutboundEmail)
+        .where(OutboundEmail.status == EmailStatus.SENDING,
+               OutboundEmail.claimed_at < cutoff)
+        .values(status=EmailStatus.PENDING, claimed_by=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+
+def claim_batch(sender_id: str, batch_size: int) -> list:
+    now = datetime.utcnow()
+    due = (select(OutboundEmail.id)
+           .where(OutboundEmail.status == EmailStatus.PENDING,
+                  OutboundEmail.next_attempt_at <= now)
+           .order_by(OutboundEmail.id)
+           .limit(batch_size)
+           .scalar_subquery())
+    db.session.execute(
+        update(OutboundEmail)
+        .where(OutboundEmail.id.in_(due), OutboundEmail.status == EmailStatus.PENDING)
+        .values(status=EmailStatus.SENDING, claimed_by=sender_id, claimed_at=now,
+                attempts=OutboundEmail.attempts + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return (OutboundEmail.query
+            .filter_by(status=EmailStatus.SENDING, claimed_by=sender_id)
+            .order_by(OutboundEmail.id)
+            .all())
+
+
+def process_batch(app, pool: SMTPPool, sender_id: str) -> int:
+    """Deliver one batch of due messages; returns how many rows were handled."""
+    cfg = app.config
+    rows = claim_batch(sender_id, cfg.get("MAIL_BATCH_SIZE", 50))
+    if not rows:
+        return 0
+
+    for row in rows:
+        try:
+            if pool.cfg["host"]:
+                pool.send(row.to_addr, row.subject, row.html_body, row.text_body)
+            else:
+                dev_print(pool.cfg, row.to_addr, row.subject, row.html_body)
+        except Exception as e:
+            pool.close()
+            row.last_error = f"{type(e).__name__}: {e}"[:2000]
+            row.claimed_by = None
+            if row.attempts >= cfg.get("MAIL_MAX_ATTEMPTS", 6):
+                row.status = EmailStatus.FAILED
+                print(f"[mailqueue] giving up on email {row.id} to {row.to_addr}: {row.last_error}")
+            else:
+                row.status = EmailStatus.PENDING
+                row.next_attempt_at = datetime.utcnow() + _backoff(
+                    row.attempts, cfg.get("MAIL_RETRY_BASE", 30), cfg.get("MAIL_RETRY_MAX", 3600))
+        else:
+            row.status = EmailStatus.SENT
+            row.sent_at = datetime.utcnow()
+            row.last_error = None
+    db.session.commit()
+    return len(rows)
+
+
+def drain(app, pool: SMTPPool | None = None, sender_id: str | None = None) -> int:
+    """Send everything currently due, then return the number of rows handled."""
+    pool = pool or SMTPPool()
+    sender_id = sender_id or f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    total = 0
+    with app.app_context():
+        try:
+            while True:
+                n = process_batch(app, pool, sender_id)
+                if not n:
+                    break
+                total += n
+        finally:
+            db.session.remove()
+    return total
+
+
+class MailWorker(threading.Thread):
+    def __init__(self, app, poll_interval: float | None = None):
+        super().__init__(name="mail-worker", daemon=True)
+        self.app = app
+        self.poll_interval = poll_interval or app.config.get("MAIL_POLL_INTERVAL", 2.0)
+        self.sender_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.pool = SMTPPool()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        stale_after = self.app.config.get("MAIL_STALE_AFTER", 600)
+        last_stale_check = 0.0
+        while not self._stop_event.is_set():
+            sent = 0
+            try:
+                with self.app.app_context():
+                    if time.monotonic() - last_stale_check > stale_after:
+                        requeue_stale(stale_after)
+                        last_stale_check = time.monotonic()
+                    if self.app.config.get("MAIL_DIGEST_WINDOW"):
+                        from .notifications import build_digests
+                        build_digests(self.app)
+                    sent = process_batch(self.app, self.pool, self.sender_id)
+            except Exception as e:
+                print(f"[mailqueue] worker error: {e}")
+            finally:
+                with self.app.app_context():
+                    db.session.remove()
+            if not sent:
+                self._stop_event.wait(self.poll_interval)
+        self.pool.close()
+
+    def stop(self, timeout: float | None = None):
+        self._stop_event.set()
+        self.join(timeout)
+        if self.app.config.get("MAIL_DIGEST_WINDOW"):
+            # don't strand events that were waiting for their window; they are
+            # queued in the outbox for the next sender to pick up
+            from .notifications import build_digests
+            with self.app.app_context():
+                try:
+                    build_digests(self.app, force=True)
+                finally:
+                    db.session.remove()
+
+
+def start_worker(app) -> MailWorker:
+    worker = MailWorker(app)
+    worker.start()
+    return worker
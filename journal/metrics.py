@@ -0,0 +1,185 @@
+# journal/metrics.py
+"""
+Opt-in per-request instrumentation (INSTRUMENTATION=1).
+
+For every request we record the endpoint, wall time, SQL statement count and
+time, template render time and response size. Samples live in a bounded
+per-endpoint reservoir in this process; /admin/metrics shows percentiles and
+/admin/metrics.prom exposes the same data as Prometheus summaries.
+
+Each gunicorn worker keeps its own numbers (the pid is part of the output).
+"""
+import os
+import threading
+import time
+from collections import deque
+
+from flask import (
+    before_render_template, g, has_request_context, request, request_finished,
+    request_started, template_rendered
+)
+from sqlalchemy import event
+
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+FIELDS = ("wall_ms", "sql_count", "sql_ms", "template_ms", "response_bytes")
+
+
+class EndpointStats:
+    def __init__(self, sample_size):
+        self.count = 0
+        self.sums = dict.fromkeys(FIELDS, 0.0)
+        self.samples = {f: deque(maxlen=sample_size) for f in FIELDS}
+
+    def add(self, record):
+        self.count += 1
+        for f in FIELDS:
+            self.sums[f] += record[f]
+            self.samples[f].append(record[f])
+
+
+class MetricsRegistry:
+    def __init__(self, sample_size=1000):
+        self.sample_size = sample_size
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self.started_at = time.time()
+
+    def record(self, endpoint, record):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = EndpointStats(self.sample_size)
+            stats.add(record)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+            self.started_at = time.time()
+
+    def snapshot(self):
+        """Per-endpoint count, totals and percentiles, busiest endpoint first."""
+        with self._lock:
+            rows = []
+            for endpoint, stats in self._endpoints.items():
+                row = {"endpoint": endpoint, "count": stats.count, "sums": dict(stats.sums)}
+                for f in FIELDS:
+                    row[f] = _percentiles(stats.samples[f])
+                rows.append(row)
+        rows.sort(key=lambda r: r["sums"]["wall_ms"], reverse=True)
+        return rows
+
+
+def _percentiles(values):
+    ordered = sorted(values)
+    if not ordered:
+        return dict.fromkeys(QUANTILES, 0.0)
+    last = len(ordered) - 1
+    return {q: ordered[min(last, int(q * len(ordered)))] for q in QUANTILES}
+
+
+registry = MetricsRegistry()
+
+
+# -----------------------------
+# Hooks
+# -----------------------------
+def _on_request_started(sender, **extra):
+    g._metrics = {"start": time.perf_counter(), "sql_count": 0, "sql_s": 0.0,
+                  "template_s": 0.0, "template_depth": 0, "template_start": 0.0}
+
+
+def _on_before_render(sender, template, context, **extra):
+    m = g.get("_metrics")
+    if m is not None:
+        # extends/include render inside the outer call; only time the outermost one
+        if m["template_depth"] == 0:
+            m["template_start"] = time.perf_counter()
+        m["template_depth"] += 1
+
+
+def _on_template_rendered(sender, template, context, **extra):
+    m = g.get("_metrics")
+    if m is not None and m["template_depth"]:
+        m["template_depth"] -= 1
+        if m["template_depth"] == 0:
+            m["template_s"] += time.perf_counter() - m["template_start"]
+
+
+def _on_request_finished(sender, response, **extra):
+    m = g.pop("_metrics", None)
+    if m is None:
+        return
+    size = response.content_length
+    if size is None and not response.is_streamed:
+        size = len(response.get_data())
+    registry.record(request.endpoint or "<unmatched>", {
+        "wall_ms": (time.perf_counter() - m["start"]) * 1000,
+        "sql_count": m["sql_count"],
+        "sql_ms": m["sql_s"] * 1000,
+        "template_ms": m["template_s"] * 1000,
+        "response_bytes": size or 0,
+    })
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_metrics_t0", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stack = conn.info.get("_metrics_t0")
+    if not stack:
+        return
+    elapsed = time.perf_counter() - stack.pop()
+    if has_request_context():
+        m = g.get("_metrics")
+        if m is not None:
+            m["sql_count"] += 1
+            m["sql_s"] += elapsed
+
+
+def init_app(app, db):
+    if not app.config.get("INSTRUMENTATION"):
+        return
+    registry.sample_size = app.config.get("METRICS_SAMPLE_SIZE", 1000)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    request_started.connect(_on_request_started, app)
+    before_render_template.connect(_on_before_render, app)
+    template_rendered.connect(_on_template_rendered, app)
+    request_finished.connect(_on_request_finished, app)
+
+
+# -----------------------------
+# Export
+# -----------------------------
+_PROM_METRICS = (
+    ("wall_ms", "journal_request_duration_seconds", 0.001, "Wall time per request"),
+    ("sql_count", "journal_request_sql_queries", 1, "SQL statements per request"),
+    ("sql_ms", "journal_request_sql_seconds", 0.001, "Time spent in SQL per request"),
+    ("template_ms", "journal_request_template_seconds", 0.001, "Template render time per request"),
+    ("response_bytes", "journal_response_size_bytes", 1, "Response body size"),
+)
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(rows=None) -> str:
+    rows = registry.snapshot() if rows is None else rows
+    pid = os.getpid()
+    out = []
+    for field, name, scale, help_text in _PROM_METRICS:
+        out.append(f"# HELP {name} {help_text}")
+        out.append(f"# TYPE {name} summary")
+        for row in rows:
+            labels = f'endpoint="{_label(row["endpoint"])}",pid="{pid}"'
+            for q, v in row[field].items():
+                out.append(f'{name}{{{labels},quantile="{q}"}} {v * scale:.6g}')
+            out.append(f"{name}_sum{{{labels}}} {row['sums'][field] * scale:.6g}")
+            out.append(f"{name}_count{{{labels}}} {row['count']}")
+    return "\n".join(out) + "\n"
@@ -1,7 +1,7 @@
 import enum
 from datetime import datetime
 from flask_login import UserMixin
-from . import db, login_manager
+from . import db
 
 
 # ------------ Enums ------------
@@ -26,15 +26,31 @@ class ReviewDecision(enum.Enum):
     REVISE = "REVISE"  # kept for backward compatibility
 
 
-# ------------ Flask-Login loader ------------
-@login_manager.user_loader
-def load_user(user_id):
-    return User.query.get(int(user_id))
+class EmailStatus(enum.Enum):
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
 
 
 # ------------ Models ------------
+# Everyone assigned to review a submission (journal.assignment); the first one
+# is also kept in Submission.assigned_reviewer_id
+submission_reviewer = db.Table(
+    "submission_reviewer",
+    db.Column("submission_id", db.Integer, db.ForeignKey("submission.id", ondelete="CASCADE"),
+              primary_key=True),
+    db.Column("reviewer_id", db.Integer, db.ForeignKey("user.id", ondelete="CASCADE"),
+              primary_key=True),
+    db.Index("ix_submission_reviewer_reviewer", "reviewer_id", "submission_id"),
+)
+
+
 class User(db.Model, UserMixin):
     __tablename__ = "user"
+    __table_args__ = (
+        db.Index("ix_user_role_username", "role", "username"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -75,6 +91,15 @@ class User(db.Model, UserMixin):
 
 class Submission(db.Model):
     __tablename__ = "submission"
+    # listings filter on one of these and page by (created_at, id); SQLite
+    # appends the rowid (= id) to every index, so keyset seeks stay in the index
+    __table_args__ = (
+        db.Index("ix_submission_created_at", "created_at"),
+        db.Index("ix_submission_status_created_at", "status", "created_at"),
+        db.Index("ix_submission_author_created_at", "author_id", "created_at"),
+        db.Index("ix_submission_reviewer_created_at", "assigned_reviewer_id", "created_at"),
+        db.Index("ix_submission_issue_status_created_at", "issue_id", "status", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -89,6 +114,7 @@ class Submission(db.Model):
 
     author_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     assigned_reviewer_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=True)
+    issue_id = db.Column(db.Integer, db.ForeignKey("issue.id"), nullable=True)
 
     author = db.relationship(
         "User",
@@ -100,13 +126,39 @@ class Submission(db.Model):
         back_populates="assigned_reviews",
         foreign_keys=[assigned_reviewer_id],
     )
+    issue = db.relationship("Issue", back_populates="submissions")
+    reviewers = db.relationship("User", secondary=submission_reviewer, lazy=True)
 
     def __repr__(self):
         return f"<Submission {self.title[:20]}... {self.status.value}>"
 
 
+class Issue(db.Model):
+    __tablename__ = "issue"
+    __table_args__ = (
+        db.UniqueConstraint("volume", "number", "year", name="uq_issue_volume_number_year"),
+        db.Index("ix_issue_year_volume_number", "year", "volume", "number"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    volume = db.Column(db.Integer, nullable=False)
+    number = db.Column(db.Integer, nullable=False)
+    year   = db.Column(db.Integer, nullable=False)
+    published_at = db.Column(db.DateTime, nullable=True)
+
+    submissions = db.relationship("Submission", back_populates="issue", lazy=True)
+
+    def __repr__(self):
+        return f"<Issue v{self.volume} n{self.number} ({self.year})>"
+
+
 class Review(db.Model):
     __tablename__ = "review"
+    __table_args__ = (
+        db.Index("ix_review_submission_created_at", "submission_id", "created_at"),
+        db.Index("ix_review_reviewer_created_at", "reviewer_id", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -119,3 +171,83 @@ class Review(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     submission = db.relationship("Submission", backref=db.backref("reviews", lazy=True))
+    reviewer = db.relationship("User", foreign_keys=[reviewer_id])
+
+
+class SubmissionFile(db.Model):
+    """One uploaded version of a manuscript; the bytes live in journal.storage under sha256."""
+    __tablename__ = "submission_file"
+    __table_args__ = (
+        db.UniqueConstraint("submission_id", "version", name="uq_submission_file_sub_ver"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    submission_id = db.Column(db.Integer, db.ForeignKey("submission.id", ondelete="CASCADE"),
+                              nullable=False, index=True)
+    version  = db.Column(db.Integer, nullable=False)
+    filename = db.Column(db.String(255), nullable=False)   # name as uploaded
+    note     = db.Column(db.String(255), nullable=True)
+    sha256   = db.Column(db.String(64), nullable=True, index=True)
+    size     = db.Column(db.Integer, nullable=True)
+
+    uploaded_by_user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    uploaded_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    submission = db.relationship(
+        "Submission",
+        backref=db.backref("files", lazy=True, order_by="SubmissionFile.version",
+                           cascade="all, delete-orphan", passive_deletes=True),
+    )
+
+    def __repr__(self):
+        return f"<SubmissionFile {self.submission_id} v{self.version} {self.sha256[:12] if self.sha256 else '-'}>"
+
+
+# Durable outbox: written on the request path, delivered by journal.mailqueue
+class OutboundEmail(db.Model):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        db.Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    to_addr   = db.Column(db.String(255), nullable=False)
+    subject   = db.Column(db.String(255), nullable=False)
+    html_body = db.Column(db.Text, nullable=False)
+    text_body = db.Column(db.Text, nullable=True)
+
+    status   = db.Column(db.Enum(EmailStatus), nullable=False, default=EmailStatus.PENDING)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text, nullable=True)
+
+    claimed_by = db.Column(db.String(64), nullable=True)
+    claimed_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at    = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<OutboundEmail {self.id} to={self.to_addr} {self.status.value}>"
+
+
+# Notification waiting to be folded into a per-recipient digest (journal.notifications)
+class MailEvent(db.Model):
+    __tablename__ = "mail_event"
+    __table_args__ = (
+        db.Index("ix_mail_event_pending", "digested_at", "to_addr", "created_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    to_addr = db.Column(db.String(255), nullable=False)
+    recipient_name = db.Column(db.String(100), nullable=True)
+    kind    = db.Column(db.String(32), nullable=False)
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+
+    created_at  = db.Column(db.DateTime, default=datetime.utcnow)
+    digested_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<MailEvent {self.kind} to={self.to_addr}>"
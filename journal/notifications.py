@@ -0,0 +1,103 @@
+# journal/notifications.py
+"""
+Editorial notifications (assignment, decision, reviewer approval/rejection).
+
+With MAIL_DIGEST_WINDOW=0 every notify() renders its own template from
+templates/email/ and queues one email. With a window (seconds), notify() only
+records a MailEvent; build_digests() - run by the mail worker - groups pending
+events per recipient once the oldest is a window old, renders
+email/digest.html once per recipient and queues all digests in one
+transaction, so the outbox drain sends them over a single SMTP session.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from flask import current_app, render_template
+from sqlalchemy import select, update
+
+from . import db
+from .mailer import send_email
+from .models import MailEvent
+
+KINDS = {
+    "assignment": ("email/assignment.html", "FACOMS Journal — New review assignment"),
+    "decision":   ("email/decision.html",   "FACOMS Journal — Decision on your submission"),
+    "approval":   ("email/approval.html",   "FACOMS Journal — Reviewer request approved"),
+    "rejection":  ("email/rejection.html",  "FACOMS Journal — Reviewer request"),
+}
+
+DIGEST_TEMPLATE = "email/digest.html"
+
+
+def notify(to_addr: str, name: str, kind: str, **context):
+    """
+    Queue a notification inside the caller's transaction; it is only sent if
+    the caller commits.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"unknown notification kind: {kind}")
+
+    if not current_app.config.get("MAIL_DIGEST_WINDOW"):
+        template, subject = KINDS[kind]
+        html = render_template(template, **context)
+        send_email(to_addr, subject, html, commit=False)
+        return
+
+    db.session.add(MailEvent(to_addr=to_addr, recipient_name=name, kind=kind, payload=context))
+
+
+def _subject(events) -> str:
+    if len(events) == 1:
+        return KINDS[events[0].kind][1]
+    return f"FACOMS Journal — {len(events)} updates for you"
+
+
+def build_digests(app, now: datetime | None = None, force: bool = False) -> int:
+    """
+    Fold due events into one queued email per recipient. Returns the number
+    of digests queued. force=True ignores the window (e.g. at shutdown).
+    """
+    window = app.config.get("MAIL_DIGEST_WINDOW", 0)
+    now = now or datetime.utcnow()
+    cutoff = now if force else now - timedelta(seconds=window)
+
+    # plain rows: the payloads are only read once, no need for tracked instances
+    pending = db.session.execute(
+        select(MailEvent.id, MailEvent.to_addr, MailEvent.recipient_name,
+               MailEvent.kind, MailEvent.payload, MailEvent.created_at)
+        .where(MailEvent.digested_at.is_(None))
+        .order_by(MailEvent.to_addr, MailEvent.created_at, MailEvent.id)
+    ).all()
+    if not pending:
+        return 0
+
+    by_recipient = defaultdict(list)
+    for ev in pending:
+        by_recipient[ev.to_addr].append(ev)
+
+    # compiled once and cached by the Jinja environment; rendered once per recipient
+    template = app.jinja_env.get_template(DIGEST_TEMPLATE)
+
+    done_ids = []
+    digests = 0
+    for to_addr, events in by_recipient.items():
+        # the window runs from the recipient's oldest waiting event
+        if events[0].created_at > cutoff:
+            continue
+        grouped = defaultdict(list)
+        for ev in events:
+            grouped[ev.kind].append(ev.payload)
+        html = template.render(name=events[-1].recipient_name or to_addr, events=grouped, count=len(events))
+        send_email(to_addr, _subject(events), html, commit=False)
+        done_ids.extend(ev.id for ev in events)
+        digests += 1
+
+    if done_ids:
+        db.session.execute(
+            update(MailEvent)
+            .where(MailEvent.id.in_(done_ids))
+            .values(digested_at=now)
+            .execution_options(synchronize_session=False)
+        )
+    db.session.commit()
+    return digests
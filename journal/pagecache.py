@@ -0,0 +1,297 @@
+# journal/pagecache.py
+"""
+Rendered-fragment cache for public pages.
+
+A cached view renders its content block through a `_*_body.html` partial.
+The HTML is stored under a key made of the page's identity (e.g. the article
+id) and the current version of every namespace it depends on ("article:<id>",
+"issues"). The surrounding base.html (navigation, flashed messages) is still
+rendered per request, so logged-in users see their own menu.
+
+Commits that change what a public page shows bump the affected namespace
+versions (hooks at the bottom of this file). Old fragments then become
+unreachable and age out after PAGE_CACHE_TTL seconds. Responses carry an ETag
+derived from the same key plus the viewer, so a repeat visit answers 304
+without rendering or querying anything.
+
+PAGE_CACHE picks the backend: "memory" (per-process LRU, the default),
+"filesystem" (PAGE_CACHE_DIR, shared by the workers on one host), "redis"
+(PAGE_CACHE_URL, shared by every host), or "off". register_backend() adds
+others. With "memory", a commit only bumps versions in the worker that made
+it; the other workers catch up within PAGE_CACHE_TTL seconds.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from flask import current_app, has_app_context, make_response, render_template, request, session
+from flask_login import current_user
+from markupsafe import Markup
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from .models import Issue, Submission, SubmissionStatus
+
+_DIRTY_KEY = "journal_pagecache_dirty"
+
+# Submission columns rendered on public pages
+_SHOWN = ("title", "abstract", "keywords", "authors_text", "department", "created_at")
+
+
+class PageCache(ABC):
+    """Backend interface: string values with a TTL in seconds (0 = no expiry)."""
+
+    @abstractmethod
+    def get(self, key: str) -> str | None: ...
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: float = 0) -> None: ...
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+    @classmethod
+    def from_config(cls, config):
+        return cls()
+
+
+class MemoryPageCache(PageCache):
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[1] and entry[1] < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, ttl=0):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl if ttl else 0)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config["PAGE_CACHE_MAX_ENTRIES"])
+
+
+class FileSystemPageCache(PageCache):
+    """One file per key: an expiry timestamp line, then the value."""
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.root, digest[:2], digest)
+
+    def get(self, key):
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                expires = float(f.readline())
+                if expires and expires < time.time():
+                    return None
+                return f.read()
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def set(self, key, value, ttl=0):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(f"{time.time() + ttl if ttl else 0}\n{value}")
+        os.replace(tmp, path)
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+        os.makedirs(self.root, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config["PAGE_CACHE_DIR"])
+
+
+class RedisPageCache(PageCache):
+    """Any client with redis-py's get/set/scan_iter/delete will do (tests pass a stand-in)."""
+
+    def __init__(self, client, prefix: str = "journal:page:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def set(self, key, value, ttl=0):
+        self.client.set(self.prefix + key, value, ex=int(ttl) or None)
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+    @classmethod
+    def from_config(cls, config):
+        import redis
+        return cls(redis.Redis.from_url(config["PAGE_CACHE_URL"]))
+
+
+BACKENDS = {"memory": MemoryPageCache, "filesystem": FileSystemPageCache, "redis": RedisPageCache}
+
+
+def register_backend(name: str, cls):
+    BACKENDS[name] = cls
+
+
+def get_cache(app=None) -> PageCache | None:
+    app = app or current_app._get_current_object()
+    backend = app.config.get("PAGE_CACHE", "memory")
+    if backend in ("", "off"):
+        return None
+    cache = app.extensions.get("page_cache")
+    if cache is None:
+        if backend not in BACKENDS:
+            raise RuntimeError(f"unknown PAGE_CACHE: {backend}")
+        cache = app.extensions["page_cache"] = BACKENDS[backend].from_config(app.config)
+    return cache
+
+
+# -----------------------------
+# Versions
+# -----------------------------
+def _new_version() -> str:
+    return format(time.time_ns(), "x")
+
+
+def version(cache: PageCache, namespace: str) -> str:
+    v = cache.get(f"ver:{namespace}")
+    if v is None:
+        # never fall back to a constant: an evicted version must not revive old fragments
+        v = _new_version()
+        cache.set(f"ver:{namespace}", v)
+    return v
+
+
+def bump(*namespaces):
+    cache = get_cache()
+    if cache is None:
+        return
+    try:
+        for ns in namespaces:
+            cache.set(f"ver:{ns}", _new_version())
+    except Exception as e:
+        # the commit already happened; stale pages expire after PAGE_CACHE_TTL
+        print(f"[pagecache] could not bump {sorted(namespaces)}: {e}")
+
+
+# -----------------------------
+# Views
+# -----------------------------
+def _viewer() -> str:
+    if not current_user.is_authenticated:
+        return "anon"
+    role = getattr(current_user.role, "value", current_user.role)
+    return f"{current_user.get_id()}:{role}"
+
+
+def cached_page(template: str, key: str, render, depends=()):
+    """
+    Render `template` around the fragment returned by `render()`, which only
+    runs (and only touches the database) on a cache miss.
+    """
+    cache = get_cache()
+    if cache is None:
+        return render_template(template, fragment=Markup(render()))
+
+    try:
+        versions = ":".join(version(cache, ns) for ns in depends)
+    except Exception as e:
+        print(f"[pagecache] backend unavailable, rendering uncached: {e}")
+        return render_template(template, fragment=Markup(render()))
+    full_key = f"frag:{key}:{versions}"
+    # flashed messages are one-off content; never answer 304 over them
+    etag = None
+    if not session.get("_flashes"):
+        etag = hashlib.sha1(f"{full_key}|{_viewer()}".encode()).hexdigest()[:24]
+        if etag in request.if_none_match:
+            resp = make_response("", 304)
+            resp.set_etag(etag)
+            resp.headers["Cache-Control"] = "private, no-cache"
+            return resp
+
+    html = cache.get(full_key)
+    if html is None:
+        html = render()
+        cache.set(full_key, html, current_app.config["PAGE_CACHE_TTL"])
+
+    resp = make_response(render_template(template, fragment=Markup(html)))
+    if etag:
+        resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
+
+
+# -----------------------------
+# Invalidation hooks
+# -----------------------------
+def _touched(obj, added_or_deleted=False) -> set:
+    if isinstance(obj, Issue):
+        return {"issues"}
+    if not isinstance(obj, Submission):
+        return set()
+    if added_or_deleted:
+        return {f"article:{obj.id}", "issues"} if obj.status == SubmissionStatus.ACCEPTED else set()
+    attrs = inspect(obj).attrs
+    namespaces = set()
+    status = attrs.status.history
+    shown = any(getattr(attrs, name).history.has_changes() for name in _SHOWN)
+    if status.has_changes() or shown:
+        namespaces.add(f"article:{obj.id}")
+    was_or_is_accepted = SubmissionStatus.ACCEPTED in (*status.added, *status.deleted) \
+        or obj.status == SubmissionStatus.ACCEPTED
+    if (status.has_changes() and was_or_is_accepted) or attrs.issue_id.history.has_changes() \
+            or (shown and obj.status == SubmissionStatus.ACCEPTED):
+        namespaces.add("issues")
+    return namespaces
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_dirty(sess, flush_context):
+    touched = set()
+    for obj in (*sess.new, *sess.deleted):
+        touched |= _touched(obj, added_or_deleted=True)
+    for obj in sess.dirty:
+        touched |= _touched(obj)
+    if touched:
+        sess.info.setdefault(_DIRTY_KEY, set()).update(touched)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(sess):
+    touched = sess.info.pop(_DIRTY_KEY, None)
+    if touched and has_app_context():
+        bump(*touched)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(sess):
+    sess.info.pop(_DIRTY_KEY, None)
@@ -0,0 +1,150 @@
+# journal/pagination.py
+"""
+Keyset (cursor) pagination for the listing views.
+
+Pages are addressed by the sort key of the row at the edge of the previous
+page (`?after=<cursor>` / `?before=<cursor>`), so page N costs the same as
+page 1 on an index over the sort columns. Every ordering ends with the
+primary key to keep it stable when timestamps tie.
+"""
+import base64
+import json
+from datetime import datetime
+
+from flask import abort, current_app, request
+from sqlalchemy import and_, or_
+
+
+class KeysetPage:
+    def __init__(self, items, per_page, next_cursor=None, prev_cursor=None, link_args=None):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        # extra query args the pager links must carry (e.g. an explicit per_page)
+        self.link_args = link_args or {}
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+# -----------------------------
+# Cursor encoding
+# -----------------------------
+def _json_default(value):
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    raise TypeError(f"cannot encode {type(value).__name__} in a cursor")
+
+
+def _json_hook(obj):
+    if "$dt" in obj:
+        return datetime.fromisoformat(obj["$dt"])
+    return obj
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps(list(values), default=_json_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, width: int) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw, object_hook=_json_hook)
+    except (ValueError, TypeError):
+        abort(400)
+    if not isinstance(values, list) or len(values) != width:
+        abort(400)
+    return values
+
+
+# -----------------------------
+# Query helpers
+# -----------------------------
+def _seek(columns, values, less_than: bool):
+    """Row-value comparison `(c1, c2, ...) < (v1, v2, ...)` (or `>`), spelled out portably."""
+    clauses = []
+    for i, col in enumerate(columns):
+        eqs = [columns[j] == values[j] for j in range(i)]
+        step = col < values[i] if less_than else col > values[i]
+        clauses.append(and_(*eqs, step))
+    return or_(*clauses)
+
+
+def _row_key(row, keys):
+    return [getattr(row, k) for k in keys]
+
+
+def page_size() -> int:
+    default = current_app.config.get("PER_PAGE", 25)
+    maximum = current_app.config.get("MAX_PER_PAGE", 100)
+    size = request.args.get("per_page", default, type=int)
+    return min(max(1, size), maximum)
+
+
+def keyset_paginate(query, columns, descending=True) -> KeysetPage:
+    """
+    Paginate `query` by `columns` (the last one must be unique, normally the
+    primary key). Reads `after`, `before` and `per_page` from the request.
+    """
+    per_page = page_size()
+    keys = [c.key for c in columns]
+    after = request.args.get("after")
+    before = request.args.get("before")
+
+    if before:
+        # walk backwards: flip comparison and ordering, then restore order
+        values = decode_cursor(before, len(columns))
+        order = [c.asc() if descending else c.desc() for c in columns]
+        rows = (query.filter(_seek(columns, values, less_than=not descending))
+                .order_by(*order).limit(per_page + 1).all())
+        has_more_before = len(rows) > per_page
+        rows = list(reversed(rows[:per_page]))
+        has_more_after = True
+    else:
+        order = [c.desc() if descending else c.asc() for c in columns]
+        q = query
+        if after:
+            q = q.filter(_seek(columns, decode_cursor(after, len(columns)), less_than=descending))
+        rows = q.order_by(*order).limit(per_page + 1).all()
+        has_more_after = len(rows) > per_page
+        rows = rows[:per_page]
+        has_more_before = bool(after)
+
+    next_cursor = encode_cursor(_row_key(rows[-1], keys)) if rows and has_more_after else None
+    prev_cursor = encode_cursor(_row_key(rows[0], keys)) if rows and has_more_before else None
+
+    link_args = {}
+    if "per_page" in request.args:
+        link_args["per_page"] = per_page
+    return KeysetPage(rows, per_page, next_cursor, prev_cursor, link_args)
+
+
+def page_key(width: int) -> str:
+    """
+    The page keyset_paginate would serve for this request, as a cache key:
+    the clamped per_page and the re-encoded cursor. Other query args are
+    ignored, so they cannot mint new cache entries.
+    """
+    explicit = "!" if "per_page" in request.args else ""
+    before = request.args.get("before")
+    after = request.args.get("after")
+    if before:
+        cursor = "before=" + encode_cursor(decode_cursor(before, width))
+    elif after:
+        cursor = "after=" + encode_cursor(decode_cursor(after, width))
+    else:
+        cursor = ""
+    return f"{page_size()}{explicit}:{cursor}"
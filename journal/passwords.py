@@ -0,0 +1,112 @@
+# journal/passwords.py
+"""
+Password hashing.
+
+BCRYPT_LOG_ROUNDS sets the work factor for new hashes (Flask-Bcrypt reads the
+same key). A successful login whose stored hash was made at a different cost
+is re-hashed at the current one, so raising or lowering the cost needs no
+migration.
+
+bcrypt releases the GIL, so each hash occupies a core. Checks and hashes run
+on a small per-process pool (AUTH_HASH_WORKERS threads); at most
+AUTH_HASH_QUEUE more may wait up to AUTH_HASH_WAIT seconds for a slot. After
+that, PasswordBusy is raised and the login view answers 503, rather than
+letting a burst of logins starve every other request the worker serves.
+
+hash_many() is for offline bulk work (user imports): it spreads the hashes
+over a process pool, one per core by default.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from flask import current_app
+
+from . import bcrypt
+
+
+class PasswordBusy(Exception):
+    """Every hashing slot is taken; try again shortly."""
+
+
+class _HashPool:
+    def __init__(self, workers: int, queue: int):
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwhash")
+        self._slots = threading.BoundedSemaphore(workers + queue)
+
+    def run(self, fn, *args, wait: float):
+        if not self._slots.acquire(timeout=wait):
+            raise PasswordBusy()
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+def _pool(app) -> _HashPool:
+    pool = app.extensions.get("password_pool")
+    # forked workers (gunicorn --preload) must not reuse the parent's threads
+    if pool is None or pool.pid != os.getpid():
+        pool = _HashPool(app.config["AUTH_HASH_WORKERS"], app.config["AUTH_HASH_QUEUE"])
+        pool.pid = os.getpid()
+        app.extensions["password_pool"] = pool
+    return pool
+
+
+def hash_cost(hashed: str) -> int | None:
+    """The log2 rounds encoded in a $2b$NN$... hash, or None if unrecognised."""
+    parts = (hashed or "").split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def needs_rehash(hashed: str, rounds: int | None = None) -> bool:
+    rounds = rounds or current_app.config["BCRYPT_LOG_ROUNDS"]
+    return hash_cost(hashed) != rounds
+
+
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.generate_password_hash(password, rounds).decode("utf-8")
+
+
+def _hash_task(task):
+    return _hash(*task)
+
+
+def hash_many(passwords, rounds: int | None = None, workers: int | None = None) -> list[str]:
+    """Hash a list of passwords on a process pool; results keep the input order."""
+    passwords = list(passwords)
+    if not passwords:
+        return []
+    rounds = rounds or current_app.config["BCRYPT_LOG_ROUNDS"]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_hash_task, [(pw, rounds) for pw in passwords], chunksize=8))
+
+
+def hash_password(password: str) -> str:
+    app = current_app._get_current_object()
+    return _pool(app).run(_hash, password, app.config["BCRYPT_LOG_ROUNDS"],
+                          wait=app.config["AUTH_HASH_WAIT"])
+
+
+def check_password(user, password: str) -> bool:
+    """
+    Verify `password` for `user`; on success, upgrade a hash made at another
+    cost in place (the caller commits).
+    """
+    app = current_app._get_current_object()
+    pool = _pool(app)
+    wait = app.config["AUTH_HASH_WAIT"]
+    try:
+        ok = pool.run(bcrypt.check_password_hash, user.password, password, wait=wait)
+    except ValueError:
+        # not a bcrypt hash (e.g. a placeholder on a merged account)
+        return False
+    if ok and needs_rehash(user.password, app.config["BCRYPT_LOG_ROUNDS"]):
+        user.password = pool.run(_hash, password, app.config["BCRYPT_LOG_ROUNDS"], wait=wait)
+    return ok
@@ -0,0 +1,171 @@
+# journal/permissions.py
+"""
+Role and object-level authorisation.
+
+Roles: role_required("ADMIN") / permission_required("assign") resolve their
+arguments once, when the view is decorated, into a frozenset of Role members;
+the per-request check is a single set-membership test on current_user.role
+(a Role, see identity.Principal).
+
+Objects: POLICIES maps an action on a submission to a tuple of predicates
+(is_admin, is_author, is_panel_reviewer, ...); the action is allowed if any
+predicate holds. Cheap predicates go first, so an admin or the author never
+costs the panel lookup.
+
+Both go through one AuthContext per request (current_auth(), kept on flask.g)
+that memoises decisions: a view that checks "view" and then a template that
+asks can("download") for the same submission query the panel once.
+"""
+from functools import lru_cache, wraps
+
+from flask import abort, g, has_request_context, redirect, request, url_for
+from flask_login import current_user
+
+from .models import Role, SubmissionStatus
+
+# permission name -> roles that hold it
+PERMISSIONS = {
+    "submit": frozenset({Role.AUTHOR}),
+    "review": frozenset({Role.REVIEWER}),
+    "assign": frozenset({Role.ADMIN}),
+    "manage_users": frozenset({Role.ADMIN}),
+    "export": frozenset({Role.ADMIN}),
+    "publish": frozenset({Role.ADMIN}),
+}
+
+
+def as_role(role) -> Role:
+    return role if isinstance(role, Role) else Role[str(role).strip().upper()]
+
+
+@lru_cache(maxsize=None)
+def roles_for(*names) -> frozenset:
+    """Role names / Role members / permission names -> frozenset of Role."""
+    out = set()
+    for name in names:
+        if isinstance(name, str) and name in PERMISSIONS:
+            out |= PERMISSIONS[name]
+        else:
+            try:
+                out.add(as_role(name))
+            except KeyError:
+                raise ValueError(f"unknown role or permission {name!r}")
+    return frozenset(out)
+
+
+# -----------------------------
+# Object policies
+# -----------------------------
+def is_admin(ctx, obj=None) -> bool:
+    return ctx.role is Role.ADMIN
+
+
+def is_author(ctx, sub) -> bool:
+    return sub.author_id == ctx.user_id
+
+
+def is_panel_reviewer(ctx, sub) -> bool:
+    return ctx.on_panel(sub)
+
+
+DECIDED = frozenset({SubmissionStatus.ACCEPTED, SubmissionStatus.REJECTED})
+
+
+def is_open_panel_reviewer(ctx, sub) -> bool:
+    # a decided submission takes no more reviews
+    return sub.status not in DECIDED and ctx.on_panel(sub)
+
+POLICIES = {
+    "view": (is_admin, is_author, is_panel_reviewer),
+    "download": (is_admin, is_author, is_panel_reviewer),
+    "review": (is_open_panel_reviewer,),
+}
+
+
+# -----------------------------
+# Per-request context
+# -----------------------------
+def _user():
+    # current_user is a LocalProxy (a few microseconds per attribute access);
+    # Flask-Login keeps the loaded user on g._login_user, so read it once
+    user = g.get("_login_user")
+    return user if user is not None else current_user._get_current_object()
+
+
+class AuthContext:
+    __slots__ = ("user", "user_id", "role", "_panels", "_decisions")
+
+    def __init__(self, user):
+        self.user = user
+        authenticated = bool(user) and user.is_authenticated
+        self.user_id = user.id if authenticated else None
+        self.role = user.role if authenticated else None
+        self._panels = {}
+        self._decisions = {}
+
+    @property
+    def authenticated(self) -> bool:
+        return self.user_id is not None
+
+    def has(self, *roles) -> bool:
+        return self.role in roles_for(*roles)
+
+    def on_panel(self, sub) -> bool:
+        hit = self._panels.get(sub.id)
+        if hit is None:
+            from .assignment import is_assigned
+            hit = self._panels[sub.id] = self.authenticated and is_assigned(sub, self.user_id)
+        return hit
+
+    def can(self, action: str, obj) -> bool:
+        key = (action, type(obj).__name__, obj.id)
+        hit = self._decisions.get(key)
+        if hit is None:
+            hit = self._decisions[key] = self.authenticated and any(p(self, obj) for p in POLICIES[action])
+        return hit
+
+
+def current_auth() -> AuthContext:
+    user = _user()
+    ctx = g.get("_auth")
+    if ctx is None or ctx.user is not user:
+        # rebuilt if the user changed mid-request (login / logout)
+        ctx = g._auth = AuthContext(user)
+    return ctx
+
+
+def can(action: str, obj) -> bool:
+    return current_auth().can(action, obj)
+
+
+def authorize(action: str, obj):
+    """abort(403) unless the current user may `action` `obj`."""
+    if not current_auth().can(action, obj):
+        abort(403)
+
+
+def has_role(*roles) -> bool:
+    return has_request_context() and current_auth().has(*roles)
+
+
+# -----------------------------
+# Decorators
+# -----------------------------
+def role_required(*roles):
+    # resolved once at import time; the check itself is an enum membership test
+    allowed = roles_for(*roles)
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            user = _user()
+            if not user.is_authenticated:
+                return redirect(url_for("journal.login", next=request.url))
+            if user.role not in allowed:
+                abort(403)
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+permission_required = role_required
@@ -1,14 +1,20 @@
 # journal/public_routes.py
 from flask import (
     Blueprint, render_template, request, current_app,
-    send_from_directory, abort, Response, url_for
+    abort, Response, url_for
 )
-from sqlalchemy import or_, func
-from datetime import datetime
-import os
 
-from . import db
 from .models import Submission, SubmissionStatus, Issue
+from .search import search_submissions
+from .stats import landing_snapshot
+from .pagination import keyset_paginate, page_key
+from .querybudget import query_budget
+from .delivery import send_pdf
+from .storage import manuscript_location, pdf_filename
+from .routing import use_replica
+from . import loading
+from . import sitemap as sitemaps
+from .pagecache import cached_page
 
 public_bp = Blueprint(
     'public',
@@ -18,26 +24,23 @@ public_bp = Blueprint(
     static_url_path='/static'
 )
 
-def _pdf_filename(submission_id: int) -> str:
-    return f"submission_{submission_id}.pdf"
 
+@public_bp.before_request
+def _read_from_replica():
+    # every public view is read-only
+    if request.method in ("GET", "HEAD"):
+        use_replica()
 
 @public_bp.route('/')
 def landing():
-    # Latest accepted articles (for landing page cards)
-    latest = (Submission.query
-              .filter_by(status=SubmissionStatus.ACCEPTED)
-              .order_by(Submission.id.desc())
-              .limit(6)
-              .all())
-
-    # Safe, SQLAlchemy-2.0 compatible stats (no raw SQL strings)
+    # Latest accepted articles + counters, served from the stats cache
+    snap = landing_snapshot()
     stats = {
-        "submissions": db.session.query(Submission).count(),
-        "accepted": db.session.query(Submission).filter_by(status=SubmissionStatus.ACCEPTED).count(),
-        "reviewers": db.session.query(func.count(func.distinct(Submission.assigned_reviewer_id))).scalar() or 0,
+        "submissions": snap["total_submissions"],
+        "accepted": snap["accepted"],
+        "reviewers": snap["assigned_reviewers"],
     }
-    return render_template('landing.html', latest=latest, stats=stats)
+    return render_template('landing.html', latest=snap["latest"], stats=stats)
 
 
 # --- static content pages ---
@@ -63,28 +66,41 @@ def contact():
 
 
 # --- browse issues / articles ---
+# page bodies are cached by journal/pagecache.py; the render callbacks only run on a miss
 @public_bp.route('/issues')
+@query_budget(3)
 def issues():
-    issues = (Issue.query
-              .order_by(Issue.year.desc(), Issue.volume.desc(), Issue.number.desc())
-              .all())
-    ahead = (Submission.query
-             .filter_by(status=SubmissionStatus.ACCEPTED, issue_id=None)
-             .order_by(Submission.created_at.desc())
-             .all())
-    return render_template('public_issues.html', issues=issues, ahead=ahead)
+    def render():
+        issues = (Issue.query
+                  .order_by(Issue.year.desc(), Issue.volume.desc(), Issue.number.desc())
+                  .all())
+        ahead = keyset_paginate(
+            Submission.query.filter_by(status=SubmissionStatus.ACCEPTED, issue_id=None)
+            .options(*loading.PUBLIC_CARDS),
+            [Submission.created_at, Submission.id],
+        )
+        return render_template('_issues_body.html', issues=issues, ahead=ahead)
+    # only what keyset_paginate reads; ?x=1 must not make a new entry
+    key = f"issues:{page_key(2)}"
+    return cached_page('public_issues.html', key, render, depends=["issues"])
 
 @public_bp.route('/issues/<int:year>/v<int:volume>/n<int:number>')
 def issue_detail(year, volume, number):
-    issue = Issue.query.filter_by(year=year, volume=volume, number=number).first_or_404()
-    return render_template('public_issue_detail.html', issue=issue)
+    def render():
+        issue = Issue.query.filter_by(year=year, volume=volume, number=number).first_or_404()
+        return render_template('_issue_detail_body.html', issue=issue)
+    return cached_page('public_issue_detail.html', f"issue:{year}:{volume}:{number}", render,
+                       depends=["issues"])
 
 @public_bp.route('/article/<int:submission_id>')
 def article(submission_id):
-    art = Submission.query.get_or_404(submission_id)
-    if art.status != SubmissionStatus.ACCEPTED:
-        abort(404)
-    return render_template('public_article.html', art=art)
+    def render():
+        art = Submission.query.get_or_404(submission_id)
+        if art.status != SubmissionStatus.ACCEPTED:
+            abort(404)
+        return render_template('_article_body.html', art=art)
+    return cached_page('public_article.html', f"article:{submission_id}", render,
+                       depends=[f"article:{submission_id}"])
 
 
 # --- public PDF for ACCEPTED only ---
@@ -93,57 +109,45 @@ def public_pdf(submission_id):
     art = Submission.query.get_or_404(submission_id)
     if art.status != SubmissionStatus.ACCEPTED:
         abort(403)
-    filename = _pdf_filename(art.id)
-    path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-    if not os.path.exists(path):
+    path, etag = manuscript_location(art.id)
+    resp = send_pdf(path, pdf_filename(art.id), as_attachment=False, public=True, etag=etag)
+    if resp is None:
         abort(404)
-    return send_from_directory(current_app.config['UPLOAD_FOLDER'], filename, as_attachment=False)
+    return resp
 
 
 # --- search ---
 @public_bp.route('/search')
+@query_budget(5)
 def search():
     q = (request.args.get('q') or "").strip()
-    results = []
-    if q:
-        results = (Submission.query
-                   .filter(Submission.status == SubmissionStatus.ACCEPTED)
-                   .filter(or_(
-                       Submission.title.ilike(f"%{q}%"),
-                       Submission.abstract.ilike(f"%{q}%"),
-                       Submission.keywords.ilike(f"%{q}%")
-                   ))
-                   .order_by(Submission.created_at.desc())
-                   .all())
+    page = request.args.get('page', 1, type=int)
+    per_page = current_app.config.get('SEARCH_PER_PAGE', 20)
+    results = search_submissions(q, page=page, per_page=per_page)
     return render_template('public_search.html', q=q, results=results)
 
 
 # --- sitemap & robots ---
+# generated files, cached on disk and invalidated on commit (journal/sitemap.py)
 @public_bp.route('/sitemap.xml')
 def sitemap():
-    urls = [
-        url_for('public.landing', _external=True),
-        url_for('public.aims', _external=True),
-        url_for('public.guidelines', _external=True),
-        url_for('public.board', _external=True),
-        url_for('public.policies', _external=True),
-        url_for('public.contact', _external=True),
-        url_for('public.issues', _external=True),
-    ]
-    # add issue/article urls
-    for i in Issue.query.all():
-        urls.append(url_for('public.issue_detail', year=i.year, volume=i.volume, number=i.number, _external=True))
-    for a in Submission.query.filter_by(status=SubmissionStatus.ACCEPTED).all():
-        urls.append(url_for('public.article', submission_id=a.id, _external=True))
-
-    xml = ['<?xml version="1.0" encoding="UTF-8"?>',
-           '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
-    now = datetime.utcnow().strftime("%Y-%m-%d")
-    for u in urls:
-        xml.append(f"<url><loc>{u}</loc><lastmod>{now}</lastmod><changefreq>weekly</changefreq></url>")
-    xml.append('</urlset>')
-    return Response("\n".join(xml), mimetype="application/xml")
+    resp = sitemaps.serve("sitemap.xml")
+    if resp is None:
+        abort(404)
+    return resp
+
+@public_bp.route('/sitemap-<int:part>.xml')
+def sitemap_part(part):
+    resp = sitemaps.serve(f"sitemap-{part}.xml")
+    if resp is None:
+        abort(404)
+    return resp
 
 @public_bp.route('/robots.txt')
 def robots():
-    return Response("User-agent: *\nAllow: /\nSitemap: /sitemap.xml\n", mimetype="text/plain")
+    body = "User-agent: *\nAllow: /\n"
+    if sitemaps.base_url():
+        # same configured host as the sitemap itself, not the request's Host header
+        with sitemaps.site_context():
+            body += f"Sitemap: {url_for('public.sitemap', _external=True)}\n"
+    return Response(body, mimetype="text/plain")
@@ -0,0 +1,66 @@
+# journal/querybudget.py
+"""
+Per-request SQL query counting with per-view budgets.
+
+    @journal_bp.route("/dashboard")
+    @login_required
+    @query_budget(3)
+    def dashboard(): ...
+
+QUERY_BUDGET_MODE decides what happens when a view goes over budget:
+  "raise" - QueryBudgetExceeded fails the request (default when TESTING)
+  "log"   - a warning in the app log (default in debug)
+  ""      - counting disabled, no engine hook installed (production default)
+"""
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+def query_budget(max_queries: int):
+    """Declare how many SQL statements a view may run, Flask-Login's user load included."""
+    def decorator(fn):
+        fn.query_budget = max_queries
+        return fn
+    return decorator
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context() and "query_count" in g:
+        g.query_count += 1
+
+
+def _start_counting():
+    g.query_count = 0
+
+
+def _check_budget(response):
+    view = current_app.view_functions.get(request.endpoint)
+    budget = getattr(view, "query_budget", None)
+    used = g.get("query_count", 0)
+    if budget is None or used <= budget:
+        return response
+
+    msg = f"{request.endpoint} ran {used} queries (budget {budget}) for {request.full_path}"
+    if current_app.config["QUERY_BUDGET_MODE"] == "raise":
+        raise QueryBudgetExceeded(msg)
+    current_app.logger.warning("QUERY BUDGET EXCEEDED: %s", msg)
+    return response
+
+
+def init_app(app, db):
+    mode = app.config.get("QUERY_BUDGET_MODE")
+    if mode is None:
+        mode = "raise" if app.testing else ("log" if app.debug else "")
+    app.config["QUERY_BUDGET_MODE"] = mode
+    if not mode:
+        return
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, "before_cursor_execute", _count_query)
+    app.before_request(_start_counting)
+    app.after_request(_check_budget)
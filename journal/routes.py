@@ -1,14 +1,27 @@
 import os
-from functools import wraps
+import hmac
 from datetime import datetime
 from flask import (
     Blueprint, render_template, redirect, url_for, flash, request, abort,
-    current_app, send_from_directory
+    current_app, jsonify, Response, stream_with_context
 )
 from werkzeug.utils import secure_filename
 from flask_login import login_user, logout_user, login_required, current_user
-from . import db, bcrypt
-from .models import User, Submission, Review, Role, SubmissionStatus, ReviewDecision
+from flask_limiter.util import get_remote_address
+from . import db, limiter
+from .models import User, Submission, Review, Role, SubmissionStatus, ReviewDecision, submission_reviewer
+from .assignment import AssignmentConflict, Pick, apply_assignments, panel_outcome, panel_reviews, plan_round
+from .permissions import DECIDED, authorize, has_role, permission_required, role_required
+from .stats import landing_snapshot, cache_info as stats_cache_info
+from .pagination import keyset_paginate
+from .querybudget import query_budget
+from .notifications import notify
+from .delivery import send_pdf
+from .passwords import PasswordBusy, check_password, hash_password
+from .storage import manuscript_location, pdf_filename, save_upload
+from . import analytics, loading, metrics
+from . import export as exports
+from .routing import use_replica
 from flask_wtf.csrf import generate_csrf
 
 
@@ -27,57 +40,19 @@ journal_bp = Blueprint(
 def inject_now():
     return {"year": datetime.utcnow().year}
 
-# -----------------------------
-# Helpers
-# -----------------------------
-def _pdf_filename(submission_id: int) -> str:
-    return f"submission_{submission_id}.pdf"
-
-def _current_role_name(user) -> str:
-    raw = getattr(user, "role", None)
-    return getattr(raw, "value", raw) if raw is not None else ""
-
-
-def role_required(*roles):
-    def decorator(fn):
-        @wraps(fn)
-        def wrapper(*args, **kwargs):
-            if not current_user.is_authenticated:
-                return redirect(url_for("journal.login", next=request.url))
-
-            # Normalize the user’s role to uppercase string
-            user_role = getattr(current_user, "role", "")
-            if hasattr(user_role, "value"):  # Enum
-                user_role = user_role.value
-            user_role = str(user_role).upper()
-
-            # Normalize allowed roles too
-            allowed = [
-                r.value.upper() if hasattr(r, "value") else str(r).upper()
-                for r in roles
-            ]
-
-            if user_role not in allowed:
-                abort(403)
-
-            return fn(*args, **kwargs)
-        return wrapper
-    return decorator
-
-
 # -----------------------------
 # Public / Auth
 # -----------------------------
 @journal_bp.route("/")
 def home():
-    recent = Submission.query.order_by(Submission.created_at.desc()).limit(5).all()
+    snap = landing_snapshot()
     stats = {
-        "total_submissions": Submission.query.count(),
-        "accepted": Submission.query.filter_by(status=SubmissionStatus.ACCEPTED).count(),
-        "under_review": Submission.query.filter_by(status=SubmissionStatus.UNDER_REVIEW).count(),
-        "reviewers": User.query.filter_by(role="REVIEWER").count()
+        "total_submissions": snap["total_submissions"],
+        "accepted": snap["accepted"],
+        "under_review": snap["under_review"],
+        "reviewers": snap["reviewers"],
     }
-    return render_template("landing.html", recent=recent, stats=stats)
+    return render_template("landing.html", recent=snap["recent"], stats=stats)
 
 @journal_bp.route("/register", methods=["GET", "POST"])
 def register():
@@ -95,7 +70,10 @@ def register():
             flash("Username or Email already exists.", "danger")
             return render_template("register.html", form=form)
 
-        hashed = bcrypt.generate_password_hash(form.password.data).decode("utf-8")
+        try:
+            hashed = hash_password(form.password.data)
+        except PasswordBusy:
+            abort(503)
         user = User(
             username=form.username.data,
             email=form.email.data,
@@ -109,7 +87,14 @@ def register():
         return redirect(url_for("journal.login"))
 
     return render_template("register.html", form=form)
+def _login_account_key():
+    return (request.form.get("email") or "").strip().lower() or get_remote_address()
+
+
 @journal_bp.route("/login", methods=["GET", "POST"])
+@limiter.limit(lambda: current_app.config["LOGIN_RATE_LIMIT"], methods=["POST"])
+@limiter.limit(lambda: current_app.config["LOGIN_ACCOUNT_RATE_LIMIT"], methods=["POST"],
+               key_func=_login_account_key)
 def login():
     if current_user.is_authenticated:
         return redirect(url_for("journal.dashboard"))
@@ -119,7 +104,13 @@ def login():
 
     if form.validate_on_submit():
         user = User.query.filter_by(email=form.email.data).first()
-        if user and bcrypt.check_password_hash(user.password, form.password.data):
+        try:
+            ok = user is not None and check_password(user, form.password.data)
+        except PasswordBusy:
+            abort(503)
+        if ok:
+            # keeps a hash upgraded to the current BCRYPT_LOG_ROUNDS
+            db.session.commit()
             login_user(user, remember=form.remember.data)
             flash("Logged in successfully!", "success")
             return redirect(request.args.get("next") or url_for("journal.dashboard"))
@@ -138,11 +129,11 @@ def logout():
 # -----------------------------
 @journal_bp.route("/dashboard")
 @login_required
+@query_budget(3)
 def dashboard():
-    my_subs = (
-        Submission.query.filter_by(author_id=current_user.id)
-        .order_by(Submission.created_at.desc())
-        .all()
+    my_subs = keyset_paginate(
+        Submission.query.filter_by(author_id=current_user.id),
+        [Submission.created_at, Submission.id],
     )
     return render_template("dashboard.html", submissions=my_subs)
 
@@ -150,10 +141,9 @@ def dashboard():
 @login_required
 def submit():
     from .forms import SubmissionForm
-    from .models import Role  # make sure Role is imported at the top of routes.py
 
     # ✅ Only allow authors
-    if _current_role_name(current_user).upper() != "AUTHOR":
+    if not has_role("submit"):
         flash("Only authors can submit manuscripts.", "danger")
         return redirect(url_for("journal.dashboard"))
 
@@ -176,16 +166,16 @@ def submit():
             status=SubmissionStatus.PENDING,
         )
         db.session.add(s)
-        db.session.commit()
 
-        # ✅ Save PDF file using submission ID
-        pdf_name = _pdf_filename(s.id)
-        file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], pdf_name)
+        # ✅ Store the PDF (content-addressed, versioned) and commit it with the submission
         try:
-            file.save(file_path)
-            flash("Submission created and PDF uploaded successfully!", "success")
-        except Exception as e:
+            save_upload(s, file, current_user.id)
+        except OSError as e:
+            db.session.rollback()
             flash(f"Error saving file: {e}", "danger")
+            return render_template("submit.html", form=form)
+        db.session.commit()
+        flash("Submission created and PDF uploaded successfully!", "success")
 
         return redirect(url_for("journal.dashboard"))
 
@@ -197,25 +187,24 @@ def submit():
 
 @journal_bp.route("/submission/<int:submission_id>")
 @login_required
+@query_budget(4)
 def submission_detail(submission_id):
     sub = Submission.query.get_or_404(submission_id)
-    reviews = Review.query.filter_by(submission_id=sub.id).all()
+    reviews = (Review.query.filter_by(submission_id=sub.id)
+               .options(*loading.SUBMISSION_REVIEWS)
+               .all())
 
     # Only author, assigned reviewer, or admin can view
-    is_admin = _current_role_name(current_user).upper() == "ADMIN"
-    is_reviewer = sub.assigned_reviewer_id == current_user.id
-    is_author = sub.author_id == current_user.id
-    if not (is_admin or is_reviewer or is_author):
-        abort(403)
+    authorize("view", sub)
 
     return render_template("submission_detail.html", submission=sub, reviews=reviews)
 @journal_bp.route("/submissions")
 @login_required
+@query_budget(3)
 def submissions():
-    my_subs = (
-        Submission.query.filter_by(author_id=current_user.id)
-        .order_by(Submission.created_at.desc())
-        .all()
+    my_subs = keyset_paginate(
+        Submission.query.filter_by(author_id=current_user.id),
+        [Submission.created_at, Submission.id],
     )
     return render_template("submissions.html", submissions=my_subs)
 # -----------------------------
@@ -224,9 +213,13 @@ def submissions():
 @journal_bp.route("/admin/submissions")
 @login_required
 @role_required("admin")
+@query_budget(4)
 def admin_submissions():
-    all_subs = Submission.query.order_by(Submission.created_at.desc()).all()
-    reviewers = [u for u in User.query.all() if _current_role_name(u) == "reviewer"]
+    all_subs = keyset_paginate(
+        Submission.query.options(*loading.SUBMISSION_LISTING),
+        [Submission.created_at, Submission.id],
+    )
+    reviewers = User.query.filter_by(role=Role.REVIEWER).order_by(User.username.asc()).all()
     csrf_token = generate_csrf()
     return render_template("admin_submissions.html",
                            submissions=all_subs,
@@ -234,7 +227,7 @@ def admin_submissions():
                            csrf_token=csrf_token)
 @journal_bp.route("/admin/assign", methods=["POST"])
 @login_required
-@role_required("ADMIN")
+@permission_required("assign")
 def assign_reviewer():
     sub_id = request.form.get("submission_id")
     reviewer_id = request.form.get("reviewer_id")
@@ -242,29 +235,182 @@ def assign_reviewer():
     sub = Submission.query.get_or_404(sub_id)
     reviewer = User.query.get_or_404(reviewer_id)
 
+    # replaces the first reviewer; the panel (submission_reviewer) follows, unless
+    # the previous reviewer already handed in a review
+    previous = sub.assigned_reviewer
+    if previous is not None and previous.id != reviewer.id and previous in sub.reviewers \
+            and not Review.query.filter_by(submission_id=sub.id, reviewer_id=previous.id).first():
+        sub.reviewers.remove(previous)
+    if reviewer not in sub.reviewers:
+        sub.reviewers.append(reviewer)
     sub.assigned_reviewer_id = reviewer.id
     sub.status = SubmissionStatus.UNDER_REVIEW
+    if reviewer.email:
+        notify(reviewer.email, reviewer.username, "assignment",
+               reviewer_name=reviewer.username,
+               title=sub.title,
+               author_name=sub.author.username if sub.author else sub.authors_text,
+               download_url=url_for("journal.download_submission", submission_id=sub.id, _external=True),
+               queue_url=url_for("journal.reviewer_queue", _external=True))
     db.session.commit()
 
     flash(f"Reviewer {reviewer.username} assigned.", "success")
     return redirect(url_for("journal.admin_submissions"))
 
-@journal_bp.route("/admin/users")
+# Assignment rounds (journal/assignment.py)
+@journal_bp.route("/admin/assign/bulk", methods=["POST"])
+@login_required
+@permission_required("assign")
+def assign_reviewers_bulk():
+    # {"assignments": [{"submission_id": 1, "reviewer_ids": [4, 7]}, ...]}
+    payload = request.get_json(silent=True) or {}
+    picks = {}
+    try:
+        for item in payload.get("assignments") or []:
+            reviewers = picks.setdefault(int(item["submission_id"]), [])
+            for rid in map(int, item["reviewer_ids"]):
+                if rid not in reviewers:
+                    reviewers.append(rid)
+        done = apply_assignments([Pick(sid, rids) for sid, rids in picks.items()], only_pending=False)
+    except (KeyError, TypeError, ValueError) as e:
+        status = 409 if isinstance(e, AssignmentConflict) else 400
+        return jsonify(error=str(e)), status
+    return jsonify(assigned=done)
+
+@journal_bp.route("/admin/assign/auto", methods=["POST"])
+@login_required
+@permission_required("assign")
+def assign_reviewers_auto():
+    data = request.get_json(silent=True) if request.is_json else request.form
+    data = data or {}
+    cfg = current_app.config
+    try:
+        per_submission = int(data.get("per_submission") or cfg["ASSIGN_REVIEWERS_PER_SUBMISSION"])
+        cap = int(data.get("cap") or cfg["ASSIGN_REVIEWER_CAP"])
+        dry_run = str(data.get("dry_run", "")).lower() in ("1", "true", "yes", "on")
+        picks, unassigned = plan_round(per_submission, cap)
+        done = 0 if dry_run else apply_assignments(picks)
+    except (TypeError, ValueError) as e:
+        if request.is_json:
+            return jsonify(error=str(e)), 409 if isinstance(e, AssignmentConflict) else 400
+        flash(f"Assignment round failed: {e}", "danger")
+        return redirect(url_for("journal.admin_submissions"))
+
+    if request.is_json:
+        return jsonify(assigned=done, dry_run=dry_run, unassigned=unassigned,
+                       plan=[{"submission_id": p.submission_id, "reviewer_ids": p.reviewer_ids,
+                              "scores": p.scores} for p in picks])
+    msg = f"Assigned {done} submission(s)." if not dry_run else f"{len(picks)} submission(s) can be assigned."
+    if unassigned:
+        msg += f" {len(unassigned)} left pending: every eligible reviewer is at the cap of {cap}."
+    flash(msg, "success" if done or dry_run else "info")
+    return redirect(url_for("journal.admin_submissions"))
+
+@journal_bp.route("/admin/stats-cache")
 @login_required
 @role_required("ADMIN")
+def admin_stats_cache():
+    # per-process numbers: hit this a few times to sample each gunicorn worker
+    return jsonify(stats_cache_info())
+
+@journal_bp.route("/admin/metrics")
+@login_required
+@role_required("ADMIN")
+def admin_metrics():
+    return render_template(
+        "admin_metrics.html",
+        enabled=current_app.config.get("INSTRUMENTATION"),
+        rows=metrics.registry.snapshot(),
+        quantiles=metrics.QUANTILES,
+        since=datetime.utcfromtimestamp(metrics.registry.started_at),
+        pid=os.getpid(),
+        stats_cache=stats_cache_info(),
+    )
+
+@journal_bp.route("/admin/metrics.prom")
+def admin_metrics_prometheus():
+    # scrapers authenticate with the bearer token, humans with an admin session
+    token = current_app.config.get("METRICS_TOKEN")
+    auth = request.headers.get("Authorization", "")
+    if token and hmac.compare_digest(auth, f"Bearer {token}"):
+        return _prometheus_response()
+    return _admin_metrics_prometheus()
+
+@login_required
+@role_required("ADMIN")
+def _admin_metrics_prometheus():
+    return _prometheus_response()
+
+def _prometheus_response():
+    return Response(metrics.prometheus_text(), mimetype="text/plain; version=0.0.4")
+
+@journal_bp.route("/admin/metrics/reset", methods=["POST"])
+@login_required
+@role_required("ADMIN")
+def admin_metrics_reset():
+    metrics.registry.reset()
+    flash("Metrics reset for this worker.", "info")
+    return redirect(url_for("journal.admin_metrics"))
+
+@journal_bp.route("/admin/analytics")
+@login_required
+@role_required("ADMIN")
+def admin_analytics():
+    return render_template("admin_analytics.html", report=analytics.report(),
+                           quantiles=analytics.QUANTILES, pid=os.getpid())
+
+@journal_bp.route("/admin/analytics/refresh", methods=["POST"])
+@login_required
+@role_required("ADMIN")
+def admin_analytics_refresh():
+    analytics.refresh(full=request.form.get("full") == "1")
+    flash("Analytics refreshed for this worker.", "info")
+    return redirect(url_for("journal.admin_analytics"))
+
+@journal_bp.route("/admin/users")
+@login_required
+@permission_required("manage_users")
+@query_budget(3)
 def admin_users():
-    all_users = User.query.order_by(User.username.asc()).all()
+    all_users = keyset_paginate(User.query, [User.username, User.id], descending=False)
     return render_template("admin_users.html", users=all_users)
 
+# Streaming exports (journal/export.py), e.g. /admin/export/reviews.csv?since=2025-01-01
+@journal_bp.route("/admin/export/<dataset>.<fmt>")
+@login_required
+@permission_required("export")
+def admin_export(dataset, fmt):
+    use_replica()
+    filters = {k: request.args.get(k) for k in ("status", "decision", "role", "since", "until",
+                                                "department", "issue")}
+    try:
+        chunks = exports.export(dataset, fmt, filters, current_app.config["EXPORT_BATCH_SIZE"])
+    except exports.ExportError as e:
+        abort(400, description=str(e))
+
+    mimetype, ext = exports.FORMATS[fmt]
+    headers = {
+        "Content-Disposition": f'attachment; filename="{dataset}-{datetime.utcnow():%Y%m%d}.{ext}"',
+        "Vary": "Accept-Encoding",
+    }
+    if "gzip" in request.accept_encodings:
+        chunks = exports.gzip(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
+
 @journal_bp.route("/admin/users/update_role", methods=["POST"])
 @login_required
-@role_required("ADMIN")
+@permission_required("manage_users")
 def update_user_role():
     user_id = request.form.get("user_id")
     new_role = request.form.get("role")
 
     user = User.query.get_or_404(user_id)
-    user.role = new_role.upper()
+    try:
+        user.role = Role[(new_role or "").upper()]
+    except KeyError:
+        abort(400)
+    # committing a User change invalidates its cached identity (journal.identity)
     db.session.commit()
 
     flash(f"Role for {user.username} updated to {new_role}.", "success")
@@ -276,11 +422,16 @@ def update_user_role():
 @journal_bp.route("/reviewer/queue")
 @login_required
 @role_required("REVIEWER")
+@query_budget(3)
 def reviewer_queue():
-    queue = (
-        Submission.query.filter_by(assigned_reviewer_id=current_user.id)
-        .order_by(Submission.created_at.desc())
-        .all()
+    queue = keyset_paginate(
+        Submission.query
+        .join(submission_reviewer, submission_reviewer.c.submission_id == Submission.id)
+        .filter(submission_reviewer.c.reviewer_id == current_user.id)
+        .options(*loading.SUBMISSION_LISTING),
+        # newest first by id, read straight off ix_submission_reviewer_reviewer
+        # (no sort); labelled "id" so the cursor comes from Submission.id
+        [submission_reviewer.c.submission_id.label("id")],
     )
     return render_template("review_queue.html", submissions=queue)
 
@@ -289,8 +440,7 @@ def reviewer_queue():
 @role_required("REVIEWER")
 def review_submission(submission_id):
     sub = Submission.query.get_or_404(submission_id)
-    if sub.assigned_reviewer_id != current_user.id:
-        abort(403)
+    authorize("review", sub)
 
     from .forms import ReviewForm
     form = ReviewForm()
@@ -304,20 +454,48 @@ def review_submission(submission_id):
             decision=ReviewDecision[form.decision.data]  # ✅ safe enum lookup
         )
 
-        if review.decision == ReviewDecision.ACCEPT:
-            sub.status = SubmissionStatus.ACCEPTED
-        elif review.decision == ReviewDecision.REJECT:
-            sub.status = SubmissionStatus.REJECTED
+        # a review is the reviewer's recommendation; the submission is decided
+        # once the whole panel agrees, otherwise by an editor (decide_submission)
+        db.session.add(review)
+        db.session.flush()
+        outcome = panel_outcome(panel_reviews(sub))
+        if outcome is not None:
+            _decide(sub, outcome)
         else:
             sub.status = SubmissionStatus.UNDER_REVIEW
-
-        db.session.add(review)
         db.session.commit()
         flash("Review submitted.", "success")
         return redirect(url_for("journal.reviewer_queue"))
 
     return render_template("review_form.html", form=form, submission=sub)
 
+def _decide(sub, status):
+    """Record the decision and tell the author, with the panel's latest comments."""
+    sub.status = status
+    if sub.author and sub.author.email:
+        notify(sub.author.email, sub.author.username, "decision",
+               author_name=sub.author.username,
+               title=sub.title,
+               decision=status.value,
+               comments=[r.comment for r in panel_reviews(sub).values() if r is not None and r.comment])
+
+@journal_bp.route("/admin/submissions/<int:submission_id>/decide", methods=["POST"])
+@login_required
+@permission_required("publish")
+def decide_submission(submission_id):
+    sub = db.session.get(Submission, submission_id) or abort(404)
+    status = {"accept": SubmissionStatus.ACCEPTED,
+              "reject": SubmissionStatus.REJECTED}.get(request.form.get("decision"))
+    if status is None:
+        abort(400)
+    if sub.status in DECIDED:
+        flash(f"Submission {sub.id} is already {sub.status.value}.", "info")
+        return redirect(url_for("journal.admin_submissions"))
+    _decide(sub, status)
+    db.session.commit()
+    flash(f"Submission {sub.id} {status.value}.", "success")
+    return redirect(url_for("journal.admin_submissions"))
+
 # -----------------------------
 # Download Submission PDF
 # -----------------------------
@@ -326,24 +504,18 @@ def review_submission(submission_id):
 def download_submission(submission_id):
     s = Submission.query.get_or_404(submission_id)
 
-    is_admin = str(current_user.role).upper() == "ADMIN"
-    is_reviewer = s.assigned_reviewer_id and s.assigned_reviewer_id == current_user.id
-    is_author = s.author_id == current_user.id
-    if not (is_admin or is_reviewer or is_author):
-        abort(403)
-
-    filename = _pdf_filename(s.id)
-    file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+    authorize("download", s)
 
-    if not os.path.exists(file_path):
+    file_path, etag = manuscript_location(s.id)
+    resp = send_pdf(file_path, pdf_filename(s.id), as_attachment=True, etag=etag)
+    if resp is None:
         flash('No manuscript uploaded for this submission.', 'warning')
-        if is_admin:
+        if has_role("ADMIN"):
             return redirect(url_for('journal.admin_submissions'))
-        if str(current_user.role).upper() == "REVIEWER":
+        if has_role("REVIEWER"):
             return redirect(url_for('journal.reviewer_queue'))
         return redirect(url_for('journal.dashboard'))
-
-    return send_from_directory(current_app.config['UPLOAD_FOLDER'], filename, as_attachment=True)
+    return resp
 @journal_bp.route("/test-css")
 def test_css():
     return """
@@ -0,0 +1,63 @@
+# journal/routing.py
+"""
+Read-replica routing for db.session.
+
+Views opt in with use_replica() (public_bp does it in before_request for
+GET/HEAD). While that flag is set, SELECTs go to the "replica" bind
+(DATABASE_REPLICA_URL); INSERT/UPDATE/DELETE and flushes always use the
+primary, and without a configured replica everything stays on the primary.
+
+Read-your-writes: a request whose session flushed changes stamps the user's
+Flask session, and for REPLICA_STICKY_SECONDS afterwards that browser reads
+from the primary too, so an editor never sees a lagging copy of their own
+change. The stamp lives in the signed session cookie, so it holds across
+gunicorn workers.
+"""
+import time
+
+from flask import current_app, g, has_request_context, session
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from .database import REPLICA_BIND
+
+_STICKY_KEY = "_rw_until"
+
+
+class RoutingSession(FlaskSession):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and not isinstance(clause, UpdateBase)
+                and has_request_context() and g.get("db_route") == REPLICA_BIND):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def is_sticky() -> bool:
+    return session.get(_STICKY_KEY, 0) > time.time()
+
+
+def use_replica():
+    """Route this request's reads to the replica, unless the user just wrote."""
+    if REPLICA_BIND in current_app.config.get("SQLALCHEMY_BINDS", {}) and not is_sticky():
+        g.db_route = REPLICA_BIND
+
+
+@event.listens_for(Session, "after_flush")
+def _note_write(sess, flush_context):
+    if has_request_context() and (sess.new or sess.dirty or sess.deleted):
+        g._db_wrote = True
+
+
+def _stamp_writer(response):
+    if g.pop("_db_wrote", False):
+        session[_STICKY_KEY] = time.time() + current_app.config.get("REPLICA_STICKY_SECONDS", 15)
+    return response
+
+
+def init_app(app):
+    if REPLICA_BIND in app.config.get("SQLALCHEMY_BINDS", {}):
+        app.after_request(_stamp_writer)
@@ -0,0 +1,253 @@
+# journal/search.py
+"""
+Full-text search over accepted submissions.
+
+On SQLite the index is an FTS5 virtual table (`submission_fts`) that holds one
+row per ACCEPTED submission, keyed by the submission id. Triggers on the
+`submission` table keep it in sync on insert, update (including status
+changes) and delete, so raw-SQL maintenance scripts cannot drift it either.
+
+Other databases, or a SQLite build without FTS5, fall back to the original
+`ilike` scan so `/search` keeps working everywhere.
+"""
+import math
+import re
+
+from markupsafe import Markup, escape
+from sqlalchemy import event, or_, text
+
+from . import db
+from .loading import PUBLIC_CARDS
+from .models import Submission, SubmissionStatus
+
+FTS_TABLE = "submission_fts"
+
+# bm25() column weights: title, abstract, keywords
+_BM25_WEIGHTS = (10.0, 1.0, 5.0)
+
+# snippet() is asked to wrap hits in these control chars; they are swapped for
+# <mark> only after the surrounding text has been HTML-escaped.
+_HL_OPEN, _HL_CLOSE = "\x02", "\x03"
+
+_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, abstract, keywords,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS submission_fts_ai AFTER INSERT ON submission
+    WHEN new.status = 'ACCEPTED' BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, abstract, keywords)
+        VALUES (new.id, new.title, new.abstract, new.keywords);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS submission_fts_ad AFTER DELETE ON submission BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS submission_fts_au
+    AFTER UPDATE OF title, abstract, keywords, status ON submission BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        INSERT INTO {FTS_TABLE}(rowid, title, abstract, keywords)
+        SELECT new.id, new.title, new.abstract, new.keywords
+        WHERE new.status = 'ACCEPTED';
+    END
+    """,
+]
+
+# engine -> bool, so the sqlite_master probe runs once per process
+_fts_ready = {}
+
+
+class SearchPage:
+    """One page of search results; quacks like Flask-SQLAlchemy's Pagination."""
+
+    def __init__(self, items, page, per_page, total, snippets=None):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.snippets = snippets or {}
+
+    @property
+    def pages(self):
+        return max(1, math.ceil(self.total / self.per_page)) if self.total else 0
+
+    @property
+    def has_prev(self):
+        return self.page > 1
+
+    @property
+    def prev_num(self):
+        return self.page - 1 if self.has_prev else None
+
+    @property
+    def has_next(self):
+        return self.page < self.pages
+
+    @property
+    def next_num(self):
+        return self.page + 1 if self.has_next else None
+
+
+# -----------------------------
+# Index management
+# -----------------------------
+def create_index(conn):
+    """Create the FTS5 table and its sync triggers (idempotent)."""
+    for stmt in _DDL:
+        conn.exec_driver_sql(stmt)
+
+
+def rebuild_index(conn) -> int:
+    """Repopulate the index from `submission`; returns the indexed row count."""
+    create_index(conn)
+    conn.exec_driver_sql(f"DELETE FROM {FTS_TABLE}")
+    conn.exec_driver_sql(
+        f"INSERT INTO {FTS_TABLE}(rowid, title, abstract, keywords) "
+        "SELECT id, title, abstract, keywords FROM submission WHERE status = 'ACCEPTED'"
+    )
+    conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+    return conn.exec_driver_sql(f"SELECT count(*) FROM {FTS_TABLE}").scalar()
+
+
+@event.listens_for(db.metadata, "after_create")
+def _create_index_with_tables(target, connection, **kw):
+    # piggy-back on db.create_all() so init_db.py sets the index up too
+    if connection.dialect.name != "sqlite":
+        return
+    try:
+        create_index(connection)
+    except Exception as e:  # SQLite built without FTS5
+        print(f"[search] FTS5 index not created: {e}")
+
+
+def fts_available() -> bool:
+    engine = db.engine
+    if engine.dialect.name != "sqlite":
+        return False
+    if engine not in _fts_ready:
+        with engine.connect() as conn:
+            found = conn.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                (FTS_TABLE,),
+            ).first()
+        _fts_ready[engine] = found is not None
+    return _fts_ready[engine]
+
+
+# -----------------------------
+# Query parsing
+# -----------------------------
+_TOKEN_RE = re.compile(r'"([^"]*)"|(\S+)')
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def to_match_expression(q: str) -> str:
+    """
+    Translate user input into a safe FTS5 MATCH expression.
+
+      "graph theory"  -> phrase
+      optim*          -> prefix
+      anything else   -> implicit AND of bare terms
+
+    FTS5 operators typed by the user are treated as plain words, so no input
+    can produce a syntax error.
+    """
+    parts = []
+    for phrase, word in _TOKEN_RE.findall(q):
+        if phrase:
+            words = _WORD_RE.findall(phrase)
+            if words:
+                parts.append('"' + " ".join(words) + '"')
+            continue
+        prefix = word.endswith("*")
+        for w in _WORD_RE.findall(word):
+            parts.append(f'"{w}"')
+        if prefix and parts and _WORD_RE.search(word):
+            parts[-1] += "*"
+    return " ".join(parts)
+
+
+def _highlight(raw: str) -> Markup:
+    html = str(escape(raw))
+    return Markup(html.replace(_HL_OPEN, "<mark>").replace(_HL_CLOSE, "</mark>"))
+
+
+# -----------------------------
+# Search
+# -----------------------------
+def _search_fts(match, page, per_page):
+    total = db.session.execute(
+        text(f"SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :q"),
+        {"q": match},
+    ).scalar()
+    if not total:
+        return SearchPage([], page, per_page, 0)
+
+    w_title, w_abstract, w_keywords = _BM25_WEIGHTS
+    rows = db.session.execute(
+        text(
+            f"SELECT rowid, "
+            # column -1: FTS5 takes the fragment from whichever column matched
+            f"snippet({FTS_TABLE}, -1, :hl_open, :hl_close, '…', 32) AS snip "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :q "
+            f"ORDER BY bm25({FTS_TABLE}, {w_title}, {w_abstract}, {w_keywords}) "
+            f"LIMIT :limit OFFSET :offset"
+        ),
+        {
+            "q": match,
+            "hl_open": _HL_OPEN,
+            "hl_close": _HL_CLOSE,
+            "limit": per_page,
+            "offset": (page - 1) * per_page,
+        },
+    ).all()
+
+    ids = [r.rowid for r in rows]
+    by_id = {s.id: s for s in (Submission.query
+                               .options(*PUBLIC_CARDS)
+                               .filter(Submission.id.in_(ids)))}
+    items = [by_id[i] for i in ids if i in by_id]
+    snippets = {r.rowid: _highlight(r.snip) for r in rows}
+    return SearchPage(items, page, per_page, total, snippets)
+
+
+def _search_ilike(q, page, per_page):
+    p = (Submission.query
+         .options(*PUBLIC_CARDS)
+         .filter(Submission.status == SubmissionStatus.ACCEPTED)
+         .filter(or_(
+             Submission.title.ilike(f"%{q}%"),
+             Submission.abstract.ilike(f"%{q}%"),
+             Submission.keywords.ilike(f"%{q}%")
+         ))
+         .order_by(Submission.created_at.desc())
+         .paginate(page=page, per_page=per_page, error_out=False))
+    return SearchPage(p.items, page, per_page, p.total)
+
+
+def search_submissions(q: str, page: int = 1, per_page: int = 20,
+                       use_fts: bool | None = None) -> SearchPage:
+    """
+    Search accepted submissions. Results are BM25-ranked (title weighted
+    highest) when the FTS index is available, newest-first otherwise.
+    """
+    page = max(1, page)
+    q = (q or "").strip()
+    if not q:
+        return SearchPage([], page, per_page, 0)
+
+    if use_fts is None:
+        use_fts = fts_available()
+    if use_fts:
+        match = to_match_expression(q)
+        if not match:
+            return SearchPage([], page, per_page, 0)
+        return _search_fts(match, page, per_page)
+    return _search_ilike(q, page, per_page)
@@ -0,0 +1,276 @@
+# journal/sitemap.py
+"""
+sitemap.xml, generated to disk and served gzip-compressed.
+
+Generation streams (id, dates) rows with yield_per, formats URLs from a
+template built with one url_for call per endpoint, and writes gzip files of
+at most SITEMAP_MAX_URLS URLs (the protocol's limit is 50,000). With more
+than one file, sitemap.xml is a sitemap index pointing at
+/sitemap-<n>.xml. lastmod comes from the data: an issue's published_at, and
+for an article the newest of its creation, latest uploaded version and
+issue publication dates. Static pages carry no lastmod.
+
+URLs are absolute, built against SITEMAP_BASE_URL (or SERVER_NAME), never
+against the request that happens to trigger a regeneration: the files are
+served to every crawler for a day, and the Host header is client-controlled.
+With neither configured there is no sitemap (404).
+
+Files live under SITEMAP_DIR/gen-<stamp>/, with manifest.json naming the
+current generation. Commits that accept or un-accept an article, or that
+touch an Issue, delete the manifest, as does age past SITEMAP_MAX_AGE. The
+next request then regenerates. The directory is shared, so one invalidation
+reaches every worker.
+"""
+import gzip
+import json
+import os
+import shutil
+import threading
+import time
+from xml.sax.saxutils import escape
+
+from flask import Response, current_app, has_app_context, request, url_for
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from . import db
+from .models import Issue, Submission, SubmissionFile, SubmissionStatus
+
+_DIRTY_KEY = "journal_sitemap_dirty"
+_MANIFEST = "manifest.json"
+_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+_YIELD_PER = 2000
+
+STATIC_PAGES = ("public.landing", "public.aims", "public.guidelines", "public.board",
+                "public.policies", "public.contact")
+
+_lock = threading.Lock()
+
+
+def _root() -> str:
+    return current_app.config["SITEMAP_DIR"]
+
+
+def base_url():
+    """The site's configured root URL, or None."""
+    cfg = current_app.config
+    if cfg.get("SITEMAP_BASE_URL"):
+        return cfg["SITEMAP_BASE_URL"].rstrip("/")
+    if cfg.get("SERVER_NAME"):
+        root = (cfg.get("APPLICATION_ROOT") or "/").rstrip("/")
+        return f"{cfg.get('PREFERRED_URL_SCHEME') or 'http'}://{cfg['SERVER_NAME']}{root}"
+    return None
+
+
+def site_context():
+    """A request context on base_url(), so url_for(_external=True) ignores the real request."""
+    return current_app.test_request_context("/", base_url=base_url())
+
+
+def _url_template(endpoint, **fields) -> str:
+    """url_for once with sentinel values, turned into a str.format template."""
+    sentinels = {name: 987650000 + i for i, name in enumerate(fields)}
+    url = url_for(endpoint, _external=True, **sentinels)
+    for name, value in sentinels.items():
+        url = url.replace(str(value), "{" + name + "}")
+    return escape(url)
+
+
+def _day(dt):
+    return dt.strftime("%Y-%m-%d") if dt else None
+
+
+def iter_entries():
+    """(loc, lastmod) for every public URL, streamed from the database."""
+    for endpoint in STATIC_PAGES:
+        yield escape(url_for(endpoint, _external=True)), None
+
+    latest_issue = db.session.execute(select(func.max(Issue.published_at))).scalar()
+    yield escape(url_for("public.issues", _external=True)), _day(latest_issue)
+
+    issue_url = _url_template("public.issue_detail", year=0, volume=0, number=0)
+    rows = db.session.execute(
+        select(Issue.year, Issue.volume, Issue.number, Issue.published_at)
+        .order_by(Issue.year, Issue.volume, Issue.number)
+        .execution_options(yield_per=_YIELD_PER)
+    )
+    for year, volume, number, published_at in rows:
+        yield issue_url.format(year=year, volume=volume, number=number), _day(published_at)
+
+    article_url = _url_template("public.article", submission_id=0)
+    latest_file = (select(func.max(SubmissionFile.uploaded_at))
+                   .where(SubmissionFile.submission_id == Submission.id)
+                   .correlate(Submission)
+                   .scalar_subquery())
+    rows = db.session.execute(
+        select(Submission.id, Submission.created_at, latest_file, Issue.published_at)
+        .outerjoin(Issue, Submission.issue_id == Issue.id)
+        .where(Submission.status == SubmissionStatus.ACCEPTED)
+        # (created_at, id) walks ix_submission_status_created_at in order; no sort
+        .order_by(Submission.created_at, Submission.id)
+        .execution_options(yield_per=_YIELD_PER)
+    )
+    for sid, created_at, uploaded_at, published_at in rows:
+        dates = [d for d in (created_at, uploaded_at, published_at) if d]
+        yield article_url.format(submission_id=sid), _day(max(dates) if dates else None)
+
+
+def _open(path):
+    f = gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+    f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{_NS}">\n')
+    return f
+
+
+def generate() -> dict:
+    """Write a new generation of sitemap files and make it current."""
+    root = _root()
+    gen = f"gen-{time.time_ns()}"
+    gen_dir = os.path.join(root, gen)
+    os.makedirs(gen_dir)
+    limit = current_app.config["SITEMAP_MAX_URLS"]
+
+    with site_context():
+        manifest = _write(root, gen, gen_dir, limit)
+    _prune(root, keep={gen})
+    return manifest
+
+
+def _write(root, gen, gen_dir, limit) -> dict:
+    parts = []          # [urls, newest lastmod] per child file
+    out = None
+    for loc, lastmod in iter_entries():
+        if out is None or parts[-1][0] >= limit:
+            if out is not None:
+                out.write("</urlset>\n")
+                out.close()
+            parts.append([0, None])
+            out = _open(os.path.join(gen_dir, f"sitemap-{len(parts)}.xml.gz"))
+        out.write(f"<url><loc>{loc}</loc>" + (f"<lastmod>{lastmod}</lastmod>" if lastmod else "") + "</url>\n")
+        parts[-1][0] += 1
+        if lastmod and (parts[-1][1] is None or lastmod > parts[-1][1]):
+            parts[-1][1] = lastmod
+    out.write("</urlset>\n")
+    out.close()
+
+    if len(parts) == 1:
+        os.replace(os.path.join(gen_dir, "sitemap-1.xml.gz"), os.path.join(gen_dir, "sitemap.xml.gz"))
+    else:
+        with gzip.open(os.path.join(gen_dir, "sitemap.xml.gz"), "wt", encoding="utf-8") as f:
+            f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{_NS}">\n')
+            for n, (_, lastmod) in enumerate(parts, start=1):
+                loc = escape(url_for("public.sitemap_part", part=n, _external=True))
+                f.write(f"<sitemap><loc>{loc}</loc>"
+                        + (f"<lastmod>{lastmod}</lastmod>" if lastmod else "") + "</sitemap>\n")
+            f.write("</sitemapindex>\n")
+
+    manifest = {"generation": gen, "created": time.time(),
+                "urls": sum(p[0] for p in parts), "files": len(parts)}
+    tmp = os.path.join(root, f"{_MANIFEST}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, os.path.join(root, _MANIFEST))
+    return manifest
+
+
+def _prune(root, keep):
+    # the previous generation may still be mid-download in another worker
+    gens = sorted(d for d in os.listdir(root) if d.startswith("gen-"))
+    for d in gens[:-2]:
+        if d not in keep:
+            shutil.rmtree(os.path.join(root, d), ignore_errors=True)
+
+
+def _read_manifest(root):
+    try:
+        with open(os.path.join(root, _MANIFEST)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def current() -> dict:
+    """The current manifest, regenerating when it is missing or too old."""
+    root = _root()
+    max_age = current_app.config["SITEMAP_MAX_AGE"]
+    manifest = _read_manifest(root)
+    if manifest is None or time.time() - manifest["created"] > max_age:
+        with _lock:
+            # another thread may have finished while we waited
+            manifest = _read_manifest(root)
+            if manifest is None or time.time() - manifest["created"] > max_age:
+                os.makedirs(root, exist_ok=True)
+                manifest = generate()
+    return manifest
+
+
+def invalidate():
+    try:
+        os.remove(os.path.join(_root(), _MANIFEST))
+    except FileNotFoundError:
+        pass
+
+
+def serve(name: str):
+    """Response for sitemap.xml / sitemap-<n>.xml, or None if there is no such file."""
+    if base_url() is None:
+        current_app.logger.warning("sitemap: set SITEMAP_BASE_URL (or SERVER_NAME) to serve sitemap.xml")
+        return None
+    manifest = current()
+    path = os.path.join(_root(), manifest["generation"], f"{name}.gz")
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+
+    headers = {"Vary": "Accept-Encoding",
+               "Cache-Control": f"public, max-age={current_app.config['SITEMAP_HTTP_MAX_AGE']}"}
+    etag = f"{manifest['generation']}-{name}"
+    if "gzip" in request.accept_encodings:
+        headers["Content-Encoding"] = "gzip"
+        etag += "-gz"       # a different body from the identity one, so a different strong ETag
+    else:
+        data = gzip.decompress(data)
+    resp = Response(data, mimetype="application/xml", headers=headers)
+    resp.set_etag(etag)
+    return resp.make_conditional(request)
+
+
+# -----------------------------
+# Invalidation hooks
+# -----------------------------
+def _affects_sitemap(obj, added_or_deleted=False) -> bool:
+    if isinstance(obj, Issue):
+        return True
+    if not isinstance(obj, Submission):
+        return False
+    if added_or_deleted:
+        return obj.status == SubmissionStatus.ACCEPTED
+    state = inspect(obj)
+    history = state.attrs.status.history
+    if history.has_changes():
+        return SubmissionStatus.ACCEPTED in (*history.added, *history.deleted)
+    return obj.status == SubmissionStatus.ACCEPTED and state.attrs.issue_id.history.has_changes()
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_dirty(session, flush_context):
+    for obj in (*session.new, *session.deleted):
+        if _affects_sitemap(obj, added_or_deleted=True):
+            session.info[_DIRTY_KEY] = True
+            return
+    for obj in session.dirty:
+        if _affects_sitemap(obj):
+            session.info[_DIRTY_KEY] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop(_DIRTY_KEY, False) and has_app_context():
+        invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop(_DIRTY_KEY, None)
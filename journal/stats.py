@@ -0,0 +1,148 @@
+# journal/stats.py
+"""
+Landing-page statistics with a process-level TTL cache.
+
+A miss runs one aggregate query for the counters plus two small column-only
+queries for the "recent" lists; a hit runs none. Flushes that touch a
+Submission or User mark the session, and the cache is dropped when that
+session commits, so the next page view recomputes from committed data.
+
+Each gunicorn worker holds its own copy: a write handled by one worker only
+invalidates that worker, the others catch up within STATS_CACHE_TTL seconds.
+"""
+import os
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import case, event, func, select
+from sqlalchemy.orm import Session
+
+from . import db
+from .models import Role, Submission, SubmissionStatus, User
+
+_DIRTY_KEY = "journal_stats_dirty"
+
+
+class TTLCache:
+    """Single-value cache with a TTL, explicit invalidation and hit/miss counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = None
+        self._expires_at = 0.0
+        self._loaded_at = 0.0
+        self._generation = 0        # bumped by invalidate(); a load that spans one is discarded
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, loader, ttl: float):
+        now = time.monotonic()
+        with self._lock:
+            if self._value is not None and now < self._expires_at:
+                self.hits += 1
+                return self._value
+            self.misses += 1
+            generation = self._generation
+        # load outside the lock so a slow query doesn't stall readers of a warm cache
+        value = loader()
+        with self._lock:
+            # invalidated mid-load: the value may predate that commit, so serve it once, don't keep it
+            if generation == self._generation:
+                self._value = value
+                self._loaded_at = time.monotonic()
+                self._expires_at = self._loaded_at + ttl
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._value = None
+            self._expires_at = 0.0
+
+    def info(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "pid": os.getpid(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else None,
+                "cached": self._value is not None,
+                "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._value is not None else None,
+            }
+
+
+_cache = TTLCache()
+
+
+def _load_snapshot() -> dict:
+    reviewers = (select(func.count(User.id))
+                 .where(User.role == Role.REVIEWER)
+                 .scalar_subquery())
+    row = db.session.execute(select(
+        func.count(Submission.id),
+        func.count(case((Submission.status == SubmissionStatus.ACCEPTED, 1))),
+        func.count(case((Submission.status == SubmissionStatus.UNDER_REVIEW, 1))),
+        func.count(func.distinct(Submission.assigned_reviewer_id)),
+        reviewers,
+    )).one()
+
+    # plain rows, not ORM instances: they outlive the session that loaded them
+    card_cols = (Submission.id, Submission.title, Submission.authors_text,
+                 Submission.department, Submission.created_at)
+    recent = db.session.execute(
+        select(*card_cols).order_by(Submission.created_at.desc()).limit(5)
+    ).all()
+    latest = db.session.execute(
+        select(*card_cols)
+        .where(Submission.status == SubmissionStatus.ACCEPTED)
+        .order_by(Submission.created_at.desc(), Submission.id.desc())
+        .limit(6)
+    ).all()
+
+    return {
+        "total_submissions": row[0],
+        "accepted": row[1],
+        "under_review": row[2],
+        "assigned_reviewers": row[3],
+        "reviewers": row[4],
+        "recent": recent,
+        "latest": latest,
+    }
+
+
+def landing_snapshot() -> dict:
+    """Counters and recent-submission rows for the landing pages."""
+    ttl = current_app.config.get("STATS_CACHE_TTL", 60)
+    return _cache.get(_load_snapshot, ttl)
+
+
+def invalidate():
+    _cache.invalidate()
+
+
+def cache_info() -> dict:
+    return _cache.info()
+
+
+# -----------------------------
+# Invalidation hooks
+# -----------------------------
+@event.listens_for(Session, "after_flush")
+def _mark_dirty(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (Submission, User)):
+            session.info[_DIRTY_KEY] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop(_DIRTY_KEY, False):
+        _cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop(_DIRTY_KEY, None)
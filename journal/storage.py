@@ -0,0 +1,177 @@
+# journal/storage.py
+"""
+Content-addressed manuscript storage.
+
+Uploads are streamed to a temp file in 1 MiB chunks and hashed in the same
+pass, then renamed to objects/<ab>/<cd>/<sha256>.pdf under UPLOAD_FOLDER.
+Identical uploads share one object. Every upload adds a SubmissionFile row
+(version 1, 2, ...), so re-uploads no longer overwrite earlier versions.
+
+UPLOAD_BACKEND picks the backend class from BACKENDS ("local" by default);
+register_backend() adds others. Files saved before this store existed
+(flat submission_<id>.pdf) are still served until they are migrated with
+`python upgrade_submission_files.py`.
+"""
+import hashlib
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+from flask import current_app
+from sqlalchemy import func
+
+from . import db
+from .models import SubmissionFile
+
+CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class StoredBlob:
+    sha256: str
+    size: int
+    created: bool   # False when an identical object was already stored
+
+
+def pdf_filename(submission_id: int) -> str:
+    """Download name, and the legacy flat file name under UPLOAD_FOLDER."""
+    return f"submission_{submission_id}.pdf"
+
+
+class FileStore(ABC):
+    """Backend interface."""
+
+    @abstractmethod
+    def put(self, stream) -> StoredBlob: ...
+
+    @abstractmethod
+    def exists(self, sha256: str) -> bool: ...
+
+    def local_path(self, sha256: str) -> str | None:
+        """Filesystem path for send_pdf/X-Sendfile, or None for remote backends."""
+        return None
+
+    @abstractmethod
+    def delete(self, sha256: str): ...
+
+
+class LocalFileStore(FileStore):
+    def __init__(self, root: str, depth: int = 2, width: int = 2, suffix: str = ".pdf"):
+        self.root = root
+        self.depth = depth
+        self.width = width
+        self.suffix = suffix
+        self._tmp = os.path.join(root, "tmp")
+        os.makedirs(self._tmp, exist_ok=True)
+
+    def _path(self, sha256: str) -> str:
+        shards = [sha256[i * self.width:(i + 1) * self.width] for i in range(self.depth)]
+        return os.path.join(self.root, *shards, sha256 + self.suffix)
+
+    def put(self, stream) -> StoredBlob:
+        h = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+                    h.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+                out.flush()
+                os.fsync(out.fileno())
+
+            sha = h.hexdigest()
+            target = self._path(sha)
+            if os.path.exists(target):
+                os.remove(tmp_path)
+                return StoredBlob(sha, size, created=False)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(tmp_path, target)
+            return StoredBlob(sha, size, created=True)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def exists(self, sha256: str) -> bool:
+        return os.path.exists(self._path(sha256))
+
+    def local_path(self, sha256: str) -> str | None:
+        return self._path(sha256)
+
+    def delete(self, sha256: str):
+        try:
+            os.remove(self._path(sha256))
+        except FileNotFoundError:
+            pass
+
+
+BACKENDS = {"local": LocalFileStore}
+
+
+def register_backend(name: str, cls):
+    BACKENDS[name] = cls
+
+
+def get_store(app=None) -> FileStore:
+    app = app or current_app._get_current_object()
+    store = app.extensions.get("upload_store")
+    if store is None:
+        backend = app.config.get("UPLOAD_BACKEND", "local")
+        if backend not in BACKENDS:
+            raise RuntimeError(f"unknown UPLOAD_BACKEND: {backend}")
+        root = app.config.get("UPLOAD_STORE_ROOT") or os.path.join(app.config["UPLOAD_FOLDER"], "objects")
+        store = app.extensions["upload_store"] = BACKENDS[backend](root)
+    return store
+
+
+# -----------------------------
+# Submission files
+# -----------------------------
+def add_version(submission, blob: StoredBlob, filename: str, user_id: int, note=None) -> SubmissionFile:
+    """Record `blob` as the next version of `submission` (caller commits)."""
+    latest = 0
+    if submission.id is not None:
+        latest = (db.session.query(func.max(SubmissionFile.version))
+                  .filter(SubmissionFile.submission_id == submission.id)
+                  .scalar()) or 0
+    row = SubmissionFile(
+        submission=submission,
+        version=latest + 1,
+        filename=(filename or pdf_filename(submission.id or 0))[:255],
+        note=note,
+        sha256=blob.sha256,
+        size=blob.size,
+        uploaded_by_user_id=user_id,
+    )
+    db.session.add(row)
+    return row
+
+
+def save_upload(submission, file_storage, user_id: int, note=None) -> SubmissionFile:
+    blob = get_store().put(file_storage.stream)
+    return add_version(submission, blob, file_storage.filename, user_id, note)
+
+
+def latest_file(submission_id: int) -> SubmissionFile | None:
+    return (SubmissionFile.query
+            .filter_by(submission_id=submission_id)
+            .order_by(SubmissionFile.version.desc())
+            .first())
+
+
+def manuscript_location(submission_id: int):
+    """
+    (path, etag) of the current manuscript for send_pdf(). The stored sha256
+    doubles as the ETag, so delivery never has to hash the file; legacy flat
+    files come back with etag None (send_pdf hashes them once per process).
+    """
+    f = latest_file(submission_id)
+    if f is not None and f.sha256:
+        path = get_store().local_path(f.sha256)
+        if path:
+            return path, f.sha256
+    legacy = os.path.join(current_app.config["UPLOAD_FOLDER"], pdf_filename(submission_id))
+    return legacy, None
@@ -1,19 +1,21 @@
 # list_users.py
-from journal import create_app, db
-from journal.models import User
+# (for a file, use `python export_data.py users -o users.csv`)
+from journal import create_app
+from journal.export import build_query, stream_rows
 
 def main():
     app = create_app()
     with app.app_context():
-        users = User.query.order_by(User.id.asc()).all()
-        if not users:
+        _, rows = stream_rows(build_query("users", {}), app.config["EXPORT_BATCH_SIZE"])
+        header = False
+        for uid, username, email, role, _ in rows:
+            if not header:
+                print(f"{'ID':<4} {'Username':<20} {'Email':<32} {'Role'}")
+                print("-" * 70)
+                header = True
+            print(f"{uid:<4} {username:<20} {email:<32} {role.value}")
+        if not header:
             print("No users found.")
-            return
-
-        print(f"{'ID':<4} {'Username':<20} {'Email':<32} {'Role'}")
-        print("-" * 70)
-        for u in users:
-            print(f"{u.id:<4} {u.username:<20} {u.email:<32} {u.role}")
 
 if __name__ == "__main__":
     main()
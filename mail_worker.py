@@ -0,0 +1,51 @@
+# mail_worker.py
+"""
+Deliver queued emails from the outbox (journal.mailqueue) as a standalone
+process, e.g. a second Procfile entry:
+
+  worker: python mail_worker.py
+
+  python mail_worker.py          # run until interrupted
+  python mail_worker.py --once   # send everything due now, then exit
+"""
+import argparse
+import time
+
+from journal import create_app
+from journal import db
+from journal.mailqueue import MailWorker, drain
+from journal.notifications import build_digests
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Send queued outbox emails.")
+    p.add_argument("--once", action="store_true", help="Drain due messages and exit")
+    p.add_argument("--flush-digests", action="store_true",
+                   help="With --once: send pending digests even if their window is still open")
+    return p.parse_args()
+
+def main():
+    args = parse_args()
+    app = create_app()
+
+    if args.once:
+        if app.config.get("MAIL_DIGEST_WINDOW"):
+            with app.app_context():
+                d = build_digests(app, force=args.flush_digests)
+                db.session.remove()
+            print(f"📨 Queued {d} digest(s).")
+        n = drain(app)
+        print(f"✅ Processed {n} queued email(s).")
+        return
+
+    worker = MailWorker(app)
+    worker.start()
+    print(f"📬 Mail worker {worker.sender_id} running (Ctrl+C to stop).")
+    try:
+        while worker.is_alive():
+            time.sleep(1)
+    except KeyboardInterrupt:
+        worker.stop(timeout=30)
+        print("Stopped.")
+
+if __name__ == "__main__":
+    main()
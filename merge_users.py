@@ -1,50 +1,93 @@
 # merge_users.py
+"""
+Merge user B into user A (move all content, delete B), or a whole batch of
+duplicates at once (see journal/accounts.py):
+
+  python merge_users.py --into-id 3 --from-id 12
+  python merge_users.py --batch duplicates.csv --dry-run     # from_id,into_id per line
+  python merge_users.py --batch duplicates.json --yes --chunk-size 1000
+"""
 import sys
 import argparse
 from journal import create_app, db
-from journal.models import User, Submission, Review
+from journal.accounts import (CHUNK, AccountError, check_merges, load_mapping, merge_users,
+                              reference_counts, totals)
+from journal.models import User
 
 def parse_args():
     p = argparse.ArgumentParser(
         description="Merge user B into user A (move all content, delete B)."
     )
-    p.add_argument("--into-id", type=int, required=True, help="Target user A id (kept)")
-    p.add_argument("--from-id", type=int, required=True, help="Source user B id (deleted)")
+    p.add_argument("--into-id", type=int, help="Target user A id (kept)")
+    p.add_argument("--from-id", type=int, help="Source user B id (deleted)")
+    p.add_argument("--batch", metavar="FILE",
+                   help="CSV or JSON mapping of from_id -> into_id (instead of --into-id/--from-id)")
+    p.add_argument("--chunk-size", type=int, default=CHUNK,
+                   help=f"Users per transaction in batch mode (default {CHUNK})")
+    p.add_argument("--dry-run", action="store_true", help="Report what would move, change nothing")
 
     # optional updates to A
     p.add_argument("--set-username", help="Optional: set a new username on A")
     p.add_argument("--set-email", help="Optional: set a new email on A")
 
-    p.add_argument("--force", action="true" in [], help=argparse.SUPPRESS)  # keep interface stable
+    p.add_argument("--force", action="store_true", help=argparse.SUPPRESS)  # keep interface stable
     p.add_argument("--yes", action="store_true", help="Skip confirmation")
-    return p.parse_args()
+    args = p.parse_args()
+    if args.batch:
+        if args.into_id or args.from_id or args.set_username or args.set_email:
+            p.error("--batch cannot be combined with --into-id/--from-id/--set-*")
+    elif not (args.into_id and args.from_id):
+        p.error("give --into-id and --from-id, or --batch FILE")
+    return args
+
+def _describe(u):
+    return f"ID={u.id} username={u.username} email={u.email} role={u.role.value}"
 
 def main():
     args = parse_args()
     app = create_app()
     with app.app_context():
-        a = User.query.get(args.into_id)
-        b = User.query.get(args.from_id)
-        if not a or not b:
-            print("❌ into-id or from-id not found.")
-            sys.exit(1)
-        if a.id == b.id:
-            print("❌ into-id and from-id must be different.")
+        try:
+            mapping = load_mapping(args.batch) if args.batch else {args.from_id: args.into_id}
+            resolved, users = check_merges(mapping)
+        except (AccountError, OSError, ValueError) as e:
+            print(f"❌ {e}")
             sys.exit(1)
 
-        # show summary
-        authored_b = Submission.query.filter_by(author_id=b.id).count()
-        reviews_b  = Review.query.filter_by(reviewer_id=b.id).count()
-        assigned_b = Submission.query.filter_by(assigned_reviewer_id=b.id).count()
+        # show summary: a handful of GROUP BY queries whatever the batch size
+        counts = reference_counts(resolved)
+        if args.batch:
+            print(f"Merging {len(resolved)} user(s) into {len(set(resolved.values()))}:")
+            for src in list(resolved)[:20]:
+                c = counts[src]
+                print(f"  {users[src].username} ({src}) → {users[resolved[src]].username} ({resolved[src]}): "
+                      + ", ".join(f"{k}={v}" for k, v in c.items()))
+            if len(resolved) > 20:
+                print(f"  ... and {len(resolved) - 20} more")
+        else:
+            a, b = users[args.into_id], users[args.from_id]
+            print("Merging users:")
+            print(f"  A (kept):   {_describe(a)}")
+            print(f"  B (delete): {_describe(b)}")
+            if args.set_username:
+                print(f"  A.username -> {args.set_username}")
+            if args.set_email:
+                print(f"  A.email    -> {args.set_email}")
+        print("  Content → targets: " + ", ".join(f"{k}={v}" for k, v in totals(counts).items()))
 
-        print("Merging users:")
-        print(f"  A (kept):   ID={a.id} username={a.username} email={a.email} role={a.role}")
-        print(f"  B (delete): ID={b.id} username={b.username} email={b.email} role={b.role}")
-        print(f"  B content → A: authored={authored_b}, reviews={reviews_b}, assigned={assigned_b}")
-        if args.set_username:
-            print(f"  A.username -> {args.set_username}")
-        if args.set_email:
-            print(f"  A.email    -> {args.set_email}")
+        if args.dry_run:
+            print("Dry run: nothing changed.")
+            sys.exit(0)
+
+        # optional identity changes for A
+        if args.set_username and User.query.filter(User.username == args.set_username,
+                                                   User.id != args.into_id).first():
+            print("❌ Username already taken.")
+            sys.exit(1)
+        if args.set_email and User.query.filter(User.email == args.set_email,
+                                                User.id != args.into_id).first():
+            print("❌ Email already taken.")
+            sys.exit(1)
 
         if not args.yes:
             ok = input("Proceed? Type 'merge' to confirm: ").strip().lower() == "merge"
@@ -52,42 +95,16 @@ def main():
                 print("Aborted.")
                 sys.exit(0)
 
-        # reassign authored submissions
-        if authored_b:
-            Submission.query.filter_by(author_id=b.id).update(
-                {Submission.author_id: a.id}, synchronize_session=False
-            )
-        # reassign reviews
-        if reviews_b:
-            Review.query.filter_by(reviewer_id=b.id).update(
-                {Review.reviewer_id: a.id}, synchronize_session=False
-            )
-        # reassign reviewer assignments
-        if assigned_b:
-            Submission.query.filter_by(assigned_reviewer_id=b.id).update(
-                {Submission.assigned_reviewer_id: a.id}, synchronize_session=False
-            )
-
-        # optional identity changes for A
-        if args.set_username:
-            # ensure unique
-            if User.query.filter(User.username == args.set_username, User.id != a.id).first():
-                print("❌ Username already taken.")
-                db.session.rollback()
-                sys.exit(1)
-            a.username = args.set_username
-
-        if args.set_email:
-            if User.query.filter(User.email == args.set_email, User.id != a.id).first():
-                print("❌ Email already taken.")
-                db.session.rollback()
-                sys.exit(1)
-            a.email = args.set_email
+        merged = merge_users(resolved, chunk_size=args.chunk_size)
 
-        # remove B
-        db.session.delete(b)
-        db.session.commit()
-        print("✅ Merge complete.")
+        if args.set_username or args.set_email:
+            a = db.session.get(User, args.into_id)
+            if args.set_username:
+                a.username = args.set_username
+            if args.set_email:
+                a.email = args.set_email
+            db.session.commit()
+        print(f"✅ Merge complete ({merged} user(s)).")
 
 if __name__ == "__main__":
     main()
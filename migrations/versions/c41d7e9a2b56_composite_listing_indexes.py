@@ -0,0 +1,39 @@
+"""composite indexes for listing, queue and review lookups
+
+Revision ID: c41d7e9a2b56
+Revises: abc23ef82dc7
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41d7e9a2b56'
+down_revision = 'abc23ef82dc7'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ("ix_user_role_username", "user", ["role", "username"]),
+    ("ix_submission_created_at", "submission", ["created_at"]),
+    ("ix_submission_status_created_at", "submission", ["status", "created_at"]),
+    ("ix_submission_author_created_at", "submission", ["author_id", "created_at"]),
+    ("ix_submission_reviewer_created_at", "submission", ["assigned_reviewer_id", "created_at"]),
+    ("ix_submission_issue_status_created_at", "submission", ["issue_id", "status", "created_at"]),
+    ("ix_review_submission_created_at", "review", ["submission_id", "created_at"]),
+    ("ix_review_reviewer_created_at", "review", ["reviewer_id", "created_at"]),
+    ("ix_issue_year_volume_number", "issue", ["year", "volume", "number"]),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True)
+    op.execute("ANALYZE")
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,42 @@
+"""submission_reviewer many-to-many table, backfilled from assigned_reviewer_id
+
+Revision ID: e5a8f3c1d742
+Revises: c41d7e9a2b56
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a8f3c1d742'
+down_revision = 'c41d7e9a2b56'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # upgrade_many_to_many_reviewers.py may already have created it
+    if not sa.inspect(op.get_bind()).has_table("submission_reviewer"):
+        op.create_table(
+            "submission_reviewer",
+            sa.Column("submission_id", sa.Integer(), nullable=False),
+            sa.Column("reviewer_id", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["submission_id"], ["submission.id"], ondelete="CASCADE"),
+            sa.ForeignKeyConstraint(["reviewer_id"], ["user.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("submission_id", "reviewer_id"),
+        )
+    op.create_index("ix_submission_reviewer_reviewer", "submission_reviewer",
+                    ["reviewer_id", "submission_id"], unique=False, if_not_exists=True)
+    op.execute(
+        "INSERT INTO submission_reviewer (submission_id, reviewer_id) "
+        "SELECT s.id, s.assigned_reviewer_id FROM submission s "
+        "WHERE s.assigned_reviewer_id IS NOT NULL AND NOT EXISTS ("
+        "  SELECT 1 FROM submission_reviewer sr "
+        "  WHERE sr.submission_id = s.id AND sr.reviewer_id = s.assigned_reviewer_id)"
+    )
+
+
+def downgrade():
+    op.drop_index("ix_submission_reviewer_reviewer", table_name="submission_reviewer", if_exists=True)
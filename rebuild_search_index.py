@@ -0,0 +1,25 @@
+# rebuild_search_index.py
+"""
+Create (if missing) and repopulate the FTS5 search index from the submission
+table. Safe to re-run; use after restoring a backup or bulk-editing rows with
+the triggers absent.
+
+  python rebuild_search_index.py
+"""
+from journal import create_app, db
+from journal.search import FTS_TABLE, rebuild_index
+
+def main():
+    app = create_app()
+    with app.app_context():
+        engine = db.engine
+        if engine.dialect.name != "sqlite":
+            raise SystemExit(f"❌ FTS5 index is SQLite-only (dialect: {engine.dialect.name}).")
+
+        with engine.begin() as conn:
+            count = rebuild_index(conn)
+
+        print(f"✅ Rebuilt {FTS_TABLE}: {count} accepted submission(s) indexed.")
+
+if __name__ == "__main__":
+    main()
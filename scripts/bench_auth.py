@@ -0,0 +1,108 @@
+# scripts/bench_auth.py
+"""
+Login cost at each bcrypt work factor: raw verifies per second on one core,
+the same across all cores (bcrypt releases the GIL), and full POST /login
+round trips through the hashing pool. Also checks that a hash stored at
+another cost is upgraded on the first successful login.
+
+  python -m scripts.bench_auth --costs 10 11 12 13 --seconds 3
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import bcrypt as pybcrypt
+
+from journal import create_app, db
+from journal.models import Role, User
+from journal.passwords import hash_cost
+
+PASSWORD = "correct horse battery staple"
+
+
+def verifies_per_second(hashed: bytes, seconds: float, threads: int) -> float:
+    deadline = time.perf_counter() + seconds
+    counts = [0] * threads
+
+    def work(i):
+        while time.perf_counter() < deadline:
+            pybcrypt.checkpw(PASSWORD.encode(), hashed)
+            counts[i] += 1
+
+    ts = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+    t0 = time.perf_counter()
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    return sum(counts) / (time.perf_counter() - t0)
+
+
+def logins_per_second(tmp, cost: int, seconds: float, threads: int):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, f'auth{cost}.db')}",
+                      "WTF_CSRF_ENABLED": False, "RATELIMIT_ENABLED": False,
+                      "BCRYPT_LOG_ROUNDS": cost})
+    with app.app_context():
+        db.create_all()
+        # stored one step cheaper, so the first login has to upgrade it
+        old = pybcrypt.hashpw(PASSWORD.encode(), pybcrypt.gensalt(max(4, cost - 1))).decode()
+        db.session.add(User(username="bench", email="bench@example.com", password=old, role=Role.AUTHOR))
+        db.session.commit()
+
+    def login(client):
+        r = client.post("/login", data={"email": "bench@example.com", "password": PASSWORD})
+        client.get("/logout")
+        return r.status_code == 302
+
+    if not login(app.test_client()):
+        raise SystemExit(f"❌ login failed at cost {cost}")
+    with app.app_context():
+        upgraded = hash_cost(User.query.filter_by(email="bench@example.com").one().password)
+
+    deadline = time.perf_counter() + seconds
+    counts, failures = [0] * threads, [0] * threads
+
+    def work(i):
+        client = app.test_client()
+        while time.perf_counter() < deadline:
+            if login(client):
+                counts[i] += 1
+            else:
+                failures[i] += 1
+
+    ts = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+    t0 = time.perf_counter()
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    return sum(counts) / (time.perf_counter() - t0), sum(failures), upgraded
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark login throughput per bcrypt cost.")
+    p.add_argument("--costs", type=int, nargs="+", default=[10, 11, 12, 13])
+    p.add_argument("--seconds", type=float, default=3.0, help="Per measurement")
+    p.add_argument("--threads", type=int, default=None, help="Default: one per core")
+    args = p.parse_args()
+    cores = os.cpu_count() or 1
+    threads = args.threads or cores
+
+    print(f"{cores} core(s), {threads} thread(s)\n")
+    print(f"{'cost':>4}  {'ms/verify':>9}  {'verify/s/core':>13}  {'verify/s all':>12}  "
+          f"{'logins/s':>8}  {'logins/s/core':>13}  upgraded")
+    with tempfile.TemporaryDirectory() as tmp:
+        for cost in args.costs:
+            hashed = pybcrypt.hashpw(PASSWORD.encode(), pybcrypt.gensalt(cost))
+            single = verifies_per_second(hashed, args.seconds, 1)
+            parallel = verifies_per_second(hashed, args.seconds, threads)
+            logins, failures, upgraded = logins_per_second(tmp, cost, args.seconds, threads)
+            note = f"{cost - 1}->{upgraded}" + (f"  ({failures} failed)" if failures else "")
+            print(f"{cost:>4}  {1000 / single:>9.1f}  {single:>13.1f}  {parallel:>12.1f}  "
+                  f"{logins:>8.1f}  {logins / cores:>13.1f}  {note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# scripts/bench_db.py
+"""
+Concurrent read/write load against one SQLite file, shaped like the Procfile
+(gunicorn -w 2 -k gthread): PROCS processes x THREADS threads, each looping
+over a landing-page read or, with --write-ratio, a review write.
+
+Runs twice: default settings (SQLITE_TUNING=0, rollback journal) and the
+tuned profile from journal/database.py (WAL, synchronous=NORMAL, busy_timeout).
+
+  python -m scripts.bench_db --procs 2 --threads 4 --seconds 10
+"""
+import argparse
+import multiprocessing as mp
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+
+from journal import create_app, db
+from journal.models import Review, ReviewDecision, Role, Submission, SubmissionStatus, User
+
+
+def populate(uri, rows):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": uri})
+    with app.app_context():
+        db.create_all()
+        author = User(username="bench", email="bench@example.com", password="x", role=Role.AUTHOR)
+        reviewer = User(username="rev", email="rev@example.com", password="x", role=Role.REVIEWER)
+        db.session.add_all([author, reviewer])
+        db.session.flush()
+        db.session.bulk_insert_mappings(Submission, [
+            {"title": f"Submission {i}", "abstract": "lorem ipsum " * 40, "author_id": author.id,
+             "status": SubmissionStatus.UNDER_REVIEW, "assigned_reviewer_id": reviewer.id}
+            for i in range(rows)
+        ])
+        db.session.commit()
+
+
+def worker(uri, tuning, threads, seconds, write_ratio, rows, out):
+    os.environ["SQLITE_TUNING"] = "1" if tuning else "0"
+    app = create_app({"SQLALCHEMY_DATABASE_URI": uri, "SQLITE_TUNING": tuning})
+    stats = {"read": [], "write": [], "locked": 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def loop():
+        rnd = random.Random()
+        local = {"read": [], "write": [], "locked": 0}
+        with app.app_context():
+            while time.monotonic() < deadline:
+                kind = "write" if rnd.random() < write_ratio else "read"
+                t0 = time.perf_counter()
+                try:
+                    if kind == "read":
+                        db.session.get(Submission, rnd.randint(1, rows))
+                        Submission.query.order_by(Submission.id.desc()).limit(25).all()
+                    else:
+                        sid = rnd.randint(1, rows)
+                        db.session.add(Review(submission_id=sid, reviewer_id=2, comment="bench review",
+                                              score=5, decision=ReviewDecision.ACCEPT))
+                        db.session.get(Submission, sid).status = SubmissionStatus.ACCEPTED
+                    db.session.commit()
+                    local[kind].append(time.perf_counter() - t0)
+                except (OperationalError, sqlite3.OperationalError):
+                    db.session.rollback()
+                    local["locked"] += 1
+                finally:
+                    db.session.remove()
+        with lock:
+            stats["read"] += local["read"]
+            stats["write"] += local["write"]
+            stats["locked"] += local["locked"]
+
+    ts = [threading.Thread(target=loop) for _ in range(threads)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    out.put(stats)
+
+
+def pct(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] * 1000
+
+
+def run(label, tuning, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        uri = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        populate(uri, args.rows)
+        out = mp.Queue()
+        procs = [mp.Process(target=worker, args=(uri, tuning, args.threads, args.seconds,
+                                                 args.write_ratio, args.rows, out))
+                 for _ in range(args.procs)]
+        for p in procs:
+            p.start()
+        results = [out.get() for _ in procs]
+        for p in procs:
+            p.join()
+
+    reads = [x for r in results for x in r["read"]]
+    writes = [x for r in results for x in r["write"]]
+    locked = sum(r["locked"] for r in results)
+    print(f"{label:8s} {len(reads) / args.seconds:8.0f} reads/s  p50 {pct(reads, .5):6.1f}  p95 {pct(reads, .95):7.1f}  "
+          f"p99 {pct(reads, .99):7.1f} ms | {len(writes) / args.seconds:6.0f} writes/s  p95 {pct(writes, .95):7.1f} ms"
+          f" | {locked} locked")
+
+
+def main():
+    p = argparse.ArgumentParser(description="SQLite concurrency benchmark: default vs. tuned profile.")
+    p.add_argument("--procs", type=int, default=2)
+    p.add_argument("--threads", type=int, default=4)
+    p.add_argument("--seconds", type=float, default=10)
+    p.add_argument("--rows", type=int, default=5000)
+    p.add_argument("--write-ratio", type=float, default=0.2)
+    args = p.parse_args()
+
+    print(f"{args.procs} procs x {args.threads} threads, {args.write_ratio:.0%} writes, {args.seconds:.0f}s each")
+    run("default", False, args)
+    run("tuned", True, args)
+
+
+if __name__ == "__main__":
+    main()
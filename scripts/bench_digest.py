@@ -0,0 +1,67 @@
+# scripts/bench_digest.py
+"""
+Bulk assignment round: one email per notification vs. per-recipient digests
+(MAIL_DIGEST_WINDOW). Both paths are rendered, queued and drained to the
+local aiosmtpd sink over one pooled SMTP connection.
+
+  python -m scripts.bench_digest --events 1000 --reviewers 40
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from journal import create_app, db
+from journal.mailqueue import SMTPPool, drain
+from journal.notifications import build_digests, notify
+from scripts.smtp_sink import SMTPSink
+
+
+def run(tmp, name, window, events, reviewers):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, name + '.db')}",
+                      "MAIL_DIGEST_WINDOW": window})
+    with app.app_context():
+        db.create_all()
+        t0 = time.perf_counter()
+        for i in range(events):
+            r = i % reviewers
+            notify(f"reviewer{r}@example.com", f"reviewer{r}", "assignment",
+                   reviewer_name=f"reviewer{r}", title=f"Manuscript {i}", author_name=f"author{i}",
+                   download_url=f"https://journal.example/submission/{i}/download",
+                   queue_url="https://journal.example/reviewer/queue")
+        db.session.commit()
+        if window:
+            build_digests(app, force=True)
+        render = time.perf_counter() - t0
+
+    pool = SMTPPool()
+    t0 = time.perf_counter()
+    sent = drain(app, pool=pool)
+    send = time.perf_counter() - t0
+    pool.close()
+    return sent, render, send, pool.connects
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark per-event mail vs. digests.")
+    p.add_argument("--events", type=int, default=1000)
+    p.add_argument("--reviewers", type=int, default=40)
+    args = p.parse_args()
+
+    with SMTPSink() as sink, tempfile.TemporaryDirectory() as tmp:
+        os.environ.update({"SMTP_HOST": sink.host, "SMTP_PORT": str(sink.port), "SMTP_USE_TLS": "0",
+                           "SMTP_USER": "", "SMTP_PASS": ""})
+        results = {
+            "per event": run(tmp, "single", 0, args.events, args.reviewers),
+            "digest": run(tmp, "digest", 60, args.events, args.reviewers),
+        }
+
+    print(f"{args.events} assignment notifications for {args.reviewers} reviewers "
+          f"(sink received {len(sink.messages)} messages)")
+    for label, (sent, render, send, connects) in results.items():
+        print(f"{label:10s}: {sent:6d} emails  render+queue {render * 1000:8.1f} ms  "
+              f"send {send * 1000:8.1f} ms  ({connects} SMTP connection(s))")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# scripts/bench_mail.py
+"""
+Outbound mail throughput: one SMTP connection per message (the old inline
+send_email) vs. the outbox drained over a pooled connection. Runs against the
+local aiosmtpd sink, so it measures our side of the conversation.
+
+  python -m scripts.bench_mail --messages 500
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from journal import create_app, db
+from journal.mailer import send_email, send_email_now
+from journal.mailqueue import SMTPPool, drain
+from journal.models import EmailStatus, OutboundEmail
+from scripts.smtp_sink import SMTPSink
+
+BODY = "<p>Dear reviewer,</p><p>A manuscript has been assigned to you.</p>" * 5
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark outbound mail paths.")
+    p.add_argument("--messages", type=int, default=300)
+    args = p.parse_args()
+    n = args.messages
+
+    with SMTPSink() as sink, tempfile.TemporaryDirectory() as tmp:
+        os.environ.update({"SMTP_HOST": sink.host, "SMTP_PORT": str(sink.port), "SMTP_USE_TLS": "0",
+                           "SMTP_USER": "", "SMTP_PASS": ""})
+
+        t0 = time.perf_counter()
+        for i in range(n):
+            send_email_now(f"r{i}@example.com", f"Assignment {i}", BODY)
+        direct = time.perf_counter() - t0
+
+        app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'bench.db')}"})
+        with app.app_context():
+            db.create_all()
+            t0 = time.perf_counter()
+            for i in range(n):
+                send_email(f"r{i}@example.com", f"Assignment {i}", BODY)
+            enqueue = time.perf_counter() - t0
+
+        pool = SMTPPool()
+        t0 = time.perf_counter()
+        drained = drain(app, pool=pool)
+        queued = time.perf_counter() - t0
+        pool.close()
+
+        with app.app_context():
+            sent = OutboundEmail.query.filter_by(status=EmailStatus.SENT).count()
+
+    print(f"sink received {len(sink.messages)} messages ({n} direct + {sent} queued)")
+    print(f"direct send, new connection each : {n / direct:8.0f} msg/s  ({direct * 1000 / n:.2f} ms per request)")
+    print(f"enqueue on request path          : {n / enqueue:8.0f} msg/s  ({enqueue * 1000 / n:.2f} ms per request)")
+    print(f"outbox drain, pooled connection  : {drained / queued:8.0f} msg/s  ({pool.connects} SMTP connection(s))")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# scripts/bench_permissions.py
+"""
+Per-call overhead of the authorisation layer, inside a request context with a
+logged-in user: the bare view, the old string-normalising role_required, the
+precompiled one, and object checks (first call vs memoised repeat).
+
+  python -m scripts.bench_permissions --number 200000
+"""
+import argparse
+import os
+import tempfile
+import timeit
+from functools import wraps
+
+from flask import abort, g, redirect, request, url_for
+from flask_login import current_user, login_user
+
+from journal import create_app, db
+from journal.identity import Principal
+from journal.models import Role, Submission, SubmissionStatus, User, submission_reviewer
+from journal.permissions import authorize, role_required
+
+
+def legacy_role_required(*roles):
+    # the decorator as it was: normalises both sides to upper-case strings per call
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not current_user.is_authenticated:
+                return redirect(url_for("journal.login", next=request.url))
+            user_role = getattr(current_user, "role", "")
+            if hasattr(user_role, "value"):
+                user_role = user_role.value
+            user_role = str(user_role).upper()
+            allowed = [r.value.upper() if hasattr(r, "value") else str(r).upper() for r in roles]
+            if user_role not in allowed:
+                abort(403)
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def view():
+    return "ok"
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark authorisation overhead per call.")
+    p.add_argument("--number", type=int, default=200000, help="Calls per measurement")
+    args = p.parse_args()
+    n = args.number
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'perm.db')}",
+                          "TESTING": True})
+        with app.app_context():
+            db.create_all()
+            author = User(username="a", email="a@example.com", password="x", role=Role.AUTHOR)
+            reviewer = User(username="r", email="r@example.com", password="x", role=Role.REVIEWER)
+            db.session.add_all([author, reviewer])
+            db.session.flush()
+            sub = Submission(title="t", abstract="a", author_id=author.id, status=SubmissionStatus.UNDER_REVIEW)
+            db.session.add(sub)
+            db.session.flush()
+            db.session.execute(submission_reviewer.insert().values(submission_id=sub.id, reviewer_id=reviewer.id))
+            db.session.commit()
+            ids = (author.id, reviewer.id, sub.id)
+
+        legacy = legacy_role_required("ADMIN", "REVIEWER")(view)
+        compiled = role_required("ADMIN", "REVIEWER")(view)
+
+        def run(label, stmt, number):
+            t = timeit.timeit(stmt, number=number)
+            print(f"{label:<44} {t / number * 1e9:>9.0f} ns/call")
+            return t / number
+
+        with app.test_request_context("/"):
+            login_user(Principal(ids[1], "r", "r@example.com", Role.REVIEWER))
+            s = db.session.get(Submission, ids[2])
+
+            bare = run("bare view", view, n)
+            old = run("legacy role_required (string normalising)", legacy, n)
+            new = run("role_required (precompiled frozenset)", compiled, n)
+            print(f"{'':<44} decorator overhead {(old - bare) * 1e9:.0f} -> {(new - bare) * 1e9:.0f} ns "
+                  f"({(old - bare) / max(new - bare, 1e-12):.1f}x less)")
+
+            def first_check():
+                g.pop("_auth", None)
+                authorize("review", s)
+            run("authorize('review') uncached (panel query)", first_check, max(n // 100, 100))
+            run("authorize('review') memoised in request", lambda: authorize("review", s), n)
+
+
+if __name__ == "__main__":
+    main()
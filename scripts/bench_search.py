@@ -0,0 +1,89 @@
+# scripts/bench_search.py
+"""
+Compare the FTS5 search path with the legacy ilike scan on a throwaway
+SQLite database.
+
+  python -m scripts.bench_search --rows 20000 --runs 50
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from journal import create_app, db
+from journal.models import User, Submission, SubmissionStatus, Role
+from journal.search import rebuild_index, search_submissions
+
+WORDS = (
+    "graph theory optimisation learning neural network matrix algebra "
+    "probability statistics regression cluster topology algorithm complexity "
+    "cryptography lattice compiler database index query distributed cache "
+    "numerical solver stochastic markov bayesian inference kernel tensor"
+).split()
+
+QUERIES = ["graph", "neural network", '"markov chain"', "optim*", "lattice cryptography", "tensor"]
+
+
+def _sentence(n):
+    return " ".join(random.choice(WORDS) for _ in range(n))
+
+
+def populate(rows):
+    author = User(username="bench", email="bench@example.com", password="x", role=Role.AUTHOR)
+    db.session.add(author)
+    db.session.flush()
+    statuses = list(SubmissionStatus)
+    db.session.bulk_insert_mappings(Submission, [
+        {
+            "title": _sentence(8).capitalize(),
+            "abstract": _sentence(150) + (" markov chain" if i % 7 == 0 else ""),
+            "keywords": ", ".join(random.sample(WORDS, 4)),
+            "author_id": author.id,
+            "status": random.choice(statuses),
+        }
+        for i in range(rows)
+    ])
+    db.session.commit()
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark FTS5 vs ilike search.")
+    p.add_argument("--rows", type=int, default=20000)
+    p.add_argument("--runs", type=int, default=30)
+    args = p.parse_args()
+
+    random.seed(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'bench.db')}"})
+        with app.app_context():
+            db.create_all()
+            t0 = time.perf_counter()
+            populate(args.rows)
+            print(f"populated {args.rows} submissions in {time.perf_counter() - t0:.1f}s")
+            with db.engine.begin() as conn:
+                print(f"indexed {rebuild_index(conn)} accepted rows")
+
+            print(f"{'query':<24} {'ilike p50':>10} {'ilike p95':>10} {'fts p50':>10} {'fts p95':>10}  hits")
+            for q in QUERIES:
+                # the ilike path has no phrase/prefix syntax; give it the bare words
+                bare = q.strip('"*')
+                il50, il95 = timed(lambda: search_submissions(bare, use_fts=False), args.runs)
+                ft50, ft95 = timed(lambda: search_submissions(q, use_fts=True), args.runs)
+                hits = search_submissions(q, use_fts=True).total
+                print(f"{q:<24} {il50:>8.2f}ms {il95:>8.2f}ms {ft50:>8.2f}ms {ft95:>8.2f}ms  {hits}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+# scripts/datagen.py
+"""
+Synthetic data for benchmarks, load tests and the index advisor.
+
+Rows go in with chunked executemany INSERTs (no per-row commit, no ORM unit
+of work). On SQLite the FTS insert trigger and the listing indexes are
+dropped for the load and rebuilt once at the end, which is what makes a
+million submissions a matter of minutes.
+
+  python -m scripts.datagen --authors 20000 --reviewers 500 --submissions 1000000 --reviews 1500000 \\
+      --issues 60 --pdfs 200
+
+Every generated account's password is "password"; the admin is
+admin@example.com, reviewers reviewer<N>@, authors author<N>@example.com.
+"""
+import argparse
+import io
+import math
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select, text
+
+from journal import bcrypt, create_app, db
+from journal.models import (
+    Issue, Review, ReviewDecision, Role, Submission, SubmissionFile, SubmissionStatus, User,
+    submission_reviewer,
+)
+from journal.search import FTS_TABLE, rebuild_index
+from journal.storage import get_store
+
+PASSWORD = "password"
+CHUNK = 10000
+
+WORDS = (
+    "graph theory optimisation learning neural network matrix algebra "
+    "probability statistics regression cluster topology algorithm complexity "
+    "cryptography lattice compiler database index query distributed cache "
+    "numerical solver stochastic markov bayesian inference kernel tensor"
+).split()
+DEPARTMENTS = ("Computing", "Mathematics", "Physics", "Statistics", "Engineering")
+
+# status mix of a journal a few years in
+STATUS_WEIGHTS = {
+    SubmissionStatus.PENDING: 10,
+    SubmissionStatus.UNDER_REVIEW: 20,
+    SubmissionStatus.ACCEPTED: 45,
+    SubmissionStatus.REJECTED: 25,
+}
+
+# days from submission to a review: lognormal, median ~2 weeks with a long tail
+REVIEW_DELAY_MEDIAN_DAYS = 14
+REVIEW_DELAY_SIGMA = 0.9
+
+
+def _sentence(rnd, n):
+    return " ".join(rnd.choice(WORDS) for _ in range(n))
+
+
+def _insert(model, rows):
+    """executemany in CHUNK-sized batches; `rows` may be a generator."""
+    table = model.__table__
+    batch = []
+    n = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= CHUNK:
+            db.session.execute(insert(table), batch)
+            n += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(table), batch)
+        n += len(batch)
+    return n
+
+
+def _next_id(model):
+    return (db.session.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def _listing_indexes():
+    return [ix for name in ("submission", "review", "submission_reviewer") for ix in db.metadata.tables[name].indexes]
+
+
+def _make_pdfs(rnd, count, size_kb):
+    """Store `count` distinct PDFs; returns [(sha256, size)]."""
+    store = get_store()
+    blobs = []
+    for i in range(count):
+        body = b"%PDF-1.4\n%generated " + str(i).encode() + b"\n" + rnd.randbytes(size_kb * 1024) + b"\n%%EOF\n"
+        blob = store.put(io.BytesIO(body))
+        blobs.append((blob.sha256, blob.size))
+    return blobs
+
+
+def populate(authors=200, reviewers=20, submissions=5000, reviews=3000, issues=0, pdfs=0,
+             pdf_kb=64, seed=1, log=None):
+    """
+    Insert a synthetic journal into the current app's database and return
+    {role: [user ids]}. Safe to call on a database that already has rows
+    (ids continue from the current maximum).
+    """
+    log = log or (lambda msg: None)
+    rnd = random.Random(seed)
+    sqlite = db.engine.dialect.name == "sqlite"
+    t0 = time.perf_counter()
+
+    if sqlite:
+        db.session.execute(text("PRAGMA synchronous=OFF"))
+        db.session.execute(text("DROP TRIGGER IF EXISTS submission_fts_ai"))
+        for ix in _listing_indexes():
+            db.session.execute(text(f'DROP INDEX IF EXISTS "{ix.name}"'))
+
+    # -- users: one bcrypt hash shared by everyone
+    pw = bcrypt.generate_password_hash(PASSWORD).decode("utf-8")
+    first_user = _next_id(User)
+    tag = "" if first_user == 1 else f"_{first_user}"
+    users = [{"username": f"admin{tag}", "email": f"admin{tag}@example.com", "password": pw,
+              "role": Role.ADMIN, "department": "Editorial"}]
+    users += [{"username": f"reviewer{i}{tag}", "email": f"reviewer{i}{tag}@example.com", "password": pw,
+               "role": Role.REVIEWER, "department": rnd.choice(DEPARTMENTS)} for i in range(reviewers)]
+    users += [{"username": f"author{i}{tag}", "email": f"author{i}{tag}@example.com", "password": pw,
+               "role": Role.AUTHOR, "department": rnd.choice(DEPARTMENTS)} for i in range(authors)]
+    _insert(User, users)
+    ids = {role: [uid for (uid,) in db.session.query(User.id).filter(User.id >= first_user, User.role == role)]
+           for role in Role}
+    author_ids, reviewer_ids = ids[Role.AUTHOR], ids[Role.REVIEWER]
+    log(f"users        {len(users):>9}  ({time.perf_counter() - t0:.1f}s)")
+
+    # -- issues
+    issue_ids = []
+    if issues:
+        first_issue = _next_id(Issue)
+        year0 = datetime.utcnow().year - issues // 4
+        _insert(Issue, ({"id": first_issue + i, "volume": 1 + i // 4, "number": 1 + i % 4,
+                         "year": year0 + i // 4 + first_issue - 1,
+                         "published_at": datetime(year0 + i // 4, 1 + 3 * (i % 4), 15)}
+                        for i in range(issues)))
+        issue_ids = list(range(first_issue, first_issue + issues))
+
+    # -- submissions: text from small pools, so generation stays cheap at 1M rows
+    titles = [_sentence(rnd, 8).capitalize() for _ in range(2000)]
+    abstracts = [_sentence(rnd, 120) for _ in range(500)]
+    keywords = [", ".join(rnd.sample(WORDS, 4)) for _ in range(500)]
+    statuses = rnd.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()), k=submissions)
+    first_sub = _next_id(Submission)
+    start = datetime.utcnow() - timedelta(days=5 * 365)
+    step = (5 * 365 * 24 * 3600) / max(1, submissions)
+
+    def submission_rows():
+        for i, status in enumerate(statuses):
+            assigned = status is not SubmissionStatus.PENDING
+            yield {
+                "id": first_sub + i,
+                "title": f"{rnd.choice(titles)} {i}",
+                "abstract": rnd.choice(abstracts),
+                "keywords": rnd.choice(keywords),
+                "authors_text": f"Author {i}",
+                "department": rnd.choice(DEPARTMENTS),
+                "author_id": rnd.choice(author_ids),
+                "assigned_reviewer_id": rnd.choice(reviewer_ids) if assigned and reviewer_ids else None,
+                "issue_id": (rnd.choice(issue_ids) if issue_ids and status is SubmissionStatus.ACCEPTED
+                             and rnd.random() < 0.8 else None),
+                "status": status,
+                "created_at": start + timedelta(seconds=i * step),
+            }
+
+    _insert(Submission, submission_rows())
+    # each assigned reviewer is also on the submission's panel
+    db.session.execute(insert(submission_reviewer).from_select(
+        ["submission_id", "reviewer_id"],
+        select(Submission.id, Submission.assigned_reviewer_id)
+        .where(Submission.id >= first_sub, Submission.assigned_reviewer_id.is_not(None))))
+    log(f"submissions  {submissions:>9}  ({time.perf_counter() - t0:.1f}s)")
+
+    # -- reviews on submissions that have left PENDING
+    decisions = list(ReviewDecision)
+    reviewed = [first_sub + i for i, s in enumerate(statuses) if s is not SubmissionStatus.PENDING]
+
+    mu = math.log(REVIEW_DELAY_MEDIAN_DAYS * 86400)
+    now = datetime.utcnow()
+
+    def review_rows():
+        for i in range(reviews if reviewed else 0):
+            sid = rnd.choice(reviewed)
+            submitted = start + timedelta(seconds=(sid - first_sub) * step)
+            yield {
+                "submission_id": sid,
+                "reviewer_id": rnd.choice(reviewer_ids),
+                "comment": rnd.choice(abstracts)[:300],
+                "score": rnd.randint(1, 10),
+                "decision": rnd.choice(decisions),
+                "created_at": min(now, submitted + timedelta(seconds=rnd.lognormvariate(mu, REVIEW_DELAY_SIGMA))),
+            }
+
+    _insert(Review, review_rows())
+    log(f"reviews      {reviews:>9}  ({time.perf_counter() - t0:.1f}s)")
+
+    # -- PDFs: a pool of distinct blobs, one version-1 file row per accepted submission
+    if pdfs:
+        blobs = _make_pdfs(rnd, pdfs, pdf_kb)
+        accepted = [first_sub + i for i, s in enumerate(statuses) if s is SubmissionStatus.ACCEPTED]
+        n = _insert(SubmissionFile, (
+            {"submission_id": sid, "version": 1, "filename": f"manuscript_{sid}.pdf",
+             "sha256": blobs[k % len(blobs)][0], "size": blobs[k % len(blobs)][1],
+             "uploaded_by_user_id": author_ids[0], "uploaded_at": now}
+            for k, sid in enumerate(accepted)))
+        log(f"pdf files    {n:>9}  ({pdfs} distinct blobs, {time.perf_counter() - t0:.1f}s)")
+
+    db.session.commit()
+
+    if sqlite:
+        for ix in _listing_indexes():
+            ix.create(db.engine, checkfirst=True)
+        with db.engine.begin() as conn:
+            indexed = rebuild_index(conn)      # also recreates the insert trigger
+            conn.exec_driver_sql("ANALYZE")
+        log(f"indexes + {FTS_TABLE} ({indexed} rows)  ({time.perf_counter() - t0:.1f}s)")
+    return ids
+
+
+def main():
+    p = argparse.ArgumentParser(description="Generate a large synthetic journal database.")
+    p.add_argument("--database", default=None,
+                   help="SQLAlchemy URI (default: sqlite:///instance/loadtest.db)")
+    p.add_argument("--uploads", default=None,
+                   help="Upload folder for generated PDFs (default: instance/loadtest_uploads)")
+    p.add_argument("--authors", type=int, default=2000)
+    p.add_argument("--reviewers", type=int, default=100)
+    p.add_argument("--submissions", type=int, default=100000)
+    p.add_argument("--reviews", type=int, default=150000)
+    p.add_argument("--issues", type=int, default=40)
+    p.add_argument("--pdfs", type=int, default=50, help="Distinct PDF blobs shared by accepted articles")
+    p.add_argument("--pdf-kb", type=int, default=256)
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--append", action="store_true", help="Allow adding to a database that has data")
+    args = p.parse_args()
+
+    instance = create_app().instance_path
+    uri = args.database or f"sqlite:///{os.path.join(instance, 'loadtest.db')}"
+    uploads = args.uploads or os.path.join(instance, "loadtest_uploads")
+    os.makedirs(uploads, exist_ok=True)
+    app = create_app({"SQLALCHEMY_DATABASE_URI": uri, "UPLOAD_FOLDER": uploads, "STATS_CACHE_TTL": 0})
+
+    with app.app_context():
+        db.create_all()
+        if not args.append and db.session.query(Submission.id).first() is not None:
+            raise SystemExit(f"❌ {uri} already has submissions; pass --append to add more.")
+        t0 = time.perf_counter()
+        populate(args.authors, args.reviewers, args.submissions, args.reviews, args.issues,
+                 args.pdfs, args.pdf_kb, args.seed, log=lambda m: print("  " + m))
+        elapsed = time.perf_counter() - t0
+        total = args.authors + args.reviewers + 1 + args.submissions + args.reviews + args.issues
+        print(f"✅ {total} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s) -> {uri}")
+        print(f"   PDFs in {uploads} (serve with UPLOAD_FOLDER={uploads})")
+
+
+if __name__ == "__main__":
+    main()
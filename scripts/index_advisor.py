@@ -0,0 +1,188 @@
+# scripts/index_advisor.py
+"""
+Replay the app's real queries and check their plans.
+
+Drives the main pages through the Flask test client (anonymous, author,
+reviewer and admin), records every SELECT the views issue, then runs
+EXPLAIN QUERY PLAN on each distinct statement with its captured parameters
+and flags full table scans and temp B-tree sorts.
+
+  python -m scripts.index_advisor                         # generated dataset
+  python -m scripts.index_advisor --submissions 50000
+  python -m scripts.index_advisor --without-model-indexes # the "before" picture
+  python -m scripts.index_advisor --strict                # exit 1 on findings (CI)
+  python -m scripts.index_advisor --self-test             # classifier regression cases
+
+SQLite only. Aggregates over a whole table (landing counters) and unfiltered
+reads (sitemap) always scan; they are listed but not counted as findings.
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+from collections import OrderedDict
+
+from sqlalchemy import event, text
+
+from journal import create_app, db
+from scripts.datagen import PASSWORD, populate
+
+# "SCAN t" without an index; FTS5 lookups show up as "SCAN ... VIRTUAL TABLE INDEX"
+FULL_SCAN = re.compile(r"^SCAN (?!sqlite_)(\w+)(?!.*USING (COVERING )?INDEX)(?!.*INTEGER PRIMARY KEY)(?!.*VIRTUAL TABLE)")
+AGGREGATE = re.compile(r"^\s*SELECT\s+(count|sum|min|max|avg)\(", re.I)
+# SQLAlchemy puts clauses on their own line ("...\nWHERE ..."), so no spaces to rely on
+WHERE = re.compile(r"\bWHERE\b", re.I)
+MATCH = re.compile(r"\bMATCH\b", re.I)
+
+PAGES = {
+    None: ["/", "/issues", "/search?q=graph", "/search?q=markov+chain", "/article/{accepted}",
+           "/sitemap.xml", "/api/v1/submissions", "/api/v1/issues"],
+    "author0@example.com": ["/dashboard", "/submissions", "/api/v1/submissions?scope=authored"],
+    "reviewer0@example.com": ["/reviewer/queue", "/api/v1/submissions?scope=reviewing", "/api/v1/reviews"],
+    "admin@example.com": ["/admin/submissions", "/admin/users", "/submission/{any}",
+                          "/api/v1/submissions?scope=all&status=pending", "/api/v1/users?role=reviewer",
+                          "/api/v1/reviews?submission_id={accepted}"],
+}
+
+
+LISTING_TABLES = ("user", "submission", "review", "issue")
+
+
+def model_indexes():
+    return [ix for name in LISTING_TABLES for ix in db.metadata.tables[name].indexes]
+
+
+def capture(app, urls_by_user):
+    seen = OrderedDict()
+    current = {"url": None}
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and current["url"]:
+            key = (statement, tuple(parameters) if isinstance(parameters, (list, tuple)) else ())
+            seen.setdefault(statement, {"params": key[1], "urls": set()})["urls"].add(current["url"])
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, "before_cursor_execute", _record)
+
+    for email, urls in urls_by_user.items():
+        client = app.test_client()
+        if email:
+            client.post("/login", data={"email": email, "password": PASSWORD})
+        for url in urls:
+            current["url"] = url
+            resp = client.get(url)
+            if resp.status_code >= 400:
+                print(f"⚠️  {url} as {email or 'anonymous'}: HTTP {resp.status_code}")
+            current["url"] = None
+    return seen
+
+
+def is_expected(statement, sorts) -> bool:
+    """Whole-table reads on purpose: counters, and unfiltered dumps (sitemap)."""
+    return not sorts and (bool(AGGREGATE.match(statement)) or not WHERE.search(statement))
+
+
+def self_test():
+    # regression: a compiled filter starts its line with WHERE, and a scan for it must be flagged
+    from sqlalchemy import func, select
+    from sqlalchemy.dialects import sqlite
+    from journal.models import Review
+    compile_ = lambda stmt: str(stmt.compile(dialect=sqlite.dialect()))
+    cases = [
+        (compile_(select(Review.id).where(Review.submission_id == 1)), False),
+        ("SELECT review.id FROM review WHERE review.submission_id = ?", False),
+        (compile_(select(Review.id, Review.created_at)), True),
+        (compile_(select(func.count(Review.id))), True),
+    ]
+    for statement, expected in cases:
+        got = is_expected(statement, [])
+        assert got is expected, f"is_expected({statement!r}) = {got}, want {expected}"
+    assert not is_expected(cases[2][0], ["USE TEMP B-TREE FOR ORDER BY"])
+    print(f"✅ {len(cases) + 1} classifier case(s) pass.")
+
+
+def explain(statement, params):
+    with db.engine.connect() as conn:
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, params).all()
+    return [r[-1] for r in rows]
+
+
+def main():
+    p = argparse.ArgumentParser(description="EXPLAIN QUERY PLAN over the app's real queries.")
+    p.add_argument("--database", help="SQLAlchemy URI of an existing SQLite DB (default: generate one)")
+    p.add_argument("--authors", type=int, default=500)
+    p.add_argument("--reviewers", type=int, default=50)
+    p.add_argument("--submissions", type=int, default=20000)
+    p.add_argument("--reviews", type=int, default=20000)
+    p.add_argument("--without-model-indexes", action="store_true",
+                   help="Drop the composite indexes declared on the models first")
+    p.add_argument("--strict", action="store_true", help="Exit 1 if anything is flagged")
+    p.add_argument("--self-test", action="store_true",
+                   help="Check the scan/expected classification on known statements and exit")
+    args = p.parse_args()
+    if args.self_test:
+        self_test()
+        return
+
+    tmp = None
+    uri = args.database
+    if not uri:
+        tmp = tempfile.TemporaryDirectory()
+        uri = f"sqlite:///{os.path.join(tmp.name, 'advisor.db')}"
+
+    app = create_app({"SQLALCHEMY_DATABASE_URI": uri, "TESTING": True, "WTF_CSRF_ENABLED": False,
+                      "SITEMAP_BASE_URL": "http://localhost",
+                      "QUERY_BUDGET_MODE": "", "STATS_CACHE_TTL": 0, "PAGE_CACHE": "off"})
+    with app.app_context():
+        if db.engine.dialect.name != "sqlite":
+            raise SystemExit("❌ The advisor uses SQLite's EXPLAIN QUERY PLAN.")
+        if not args.database:
+            db.create_all()
+            print(f"⏳ Generating {args.submissions} submissions, {args.reviews} reviews ...")
+            populate(args.authors, args.reviewers, args.submissions, args.reviews)
+        if args.without_model_indexes:
+            for ix in model_indexes():
+                db.session.execute(text(f'DROP INDEX IF EXISTS "{ix.name}"'))
+        db.session.execute(text("ANALYZE"))
+        db.session.commit()
+
+        accepted = db.session.execute(text(
+            "SELECT id FROM submission WHERE status = 'ACCEPTED' ORDER BY id LIMIT 1")).scalar() or 1
+    urls = {who: [u.format(accepted=accepted, any=1) for u in pages] for who, pages in PAGES.items()}
+
+    statements = capture(app, urls)
+
+    findings = 0
+    with app.app_context():
+        for statement, info in statements.items():
+            try:
+                plan = explain(statement, info["params"])
+            except Exception as e:
+                print(f"⚠️  could not explain: {e}")
+                continue
+            scans = [line for line in plan if FULL_SCAN.match(line)]
+            # FTS results are ranked after matching; that sort is inherent
+            sorts = [line for line in plan if "TEMP B-TREE FOR ORDER BY" in line and not MATCH.search(statement)]
+            if not (scans or sorts):
+                continue
+            expected = is_expected(statement, sorts)
+            if not expected:
+                findings += 1
+            marker = "ℹ️ " if expected else "🔎"
+            print(f"\n{marker} {', '.join(sorted(info['urls']))}")
+            print("   " + " ".join(statement.split())[:300])
+            for line in plan:
+                flag = "  <-- full scan" if line in scans else ("  <-- sort" if line in sorts else "")
+                print(f"     {line}{flag}")
+
+    print(f"\n✅ {len(statements)} distinct SELECTs replayed, {findings} flagged.")
+    if tmp:
+        tmp.cleanup()
+    if args.strict and findings:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+# scripts/loadtest.py
+"""
+Repeatable load test for the key pages, against a database built by
+scripts.datagen.
+
+  python -m scripts.loadtest                                # in-process test client
+  python -m scripts.loadtest --gunicorn                     # local gunicorn, Procfile shape
+  python -m scripts.loadtest --url http://127.0.0.1:8000    # a server you started
+
+  python -m scripts.loadtest --json results/2026-10.json --baseline results/2026-09.json
+
+Each scenario runs --requests requests over --concurrency threads (each
+thread logs in with its own session) after --warmup unmeasured ones, and
+reports p50/p95/p99 latency and requests/s. With --baseline, p95 or RPS
+worse than --threshold is reported as a regression (exit 1 with --strict).
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from datetime import datetime
+
+from sqlalchemy import text
+
+from journal import create_app, db
+from scripts.datagen import PASSWORD
+
+SEARCH_TERMS = ("graph", "neural network", "markov", "optim*", "lattice cryptography", "tensor")
+
+# name, login (None = anonymous), path
+SCENARIOS = [
+    ("landing", None, "/"),
+    ("search", None, "/search?q={term}"),
+    ("issues", None, "/issues"),
+    ("article_pdf", None, "/article/{pdf_id}/pdf"),
+    ("admin_submissions", "admin@example.com", "/admin/submissions"),
+    ("reviewer_queue", "reviewer0@example.com", "/reviewer/queue"),
+]
+
+
+# -----------------------------
+# Clients
+# -----------------------------
+class InProcessClient:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def login(self, email):
+        resp = self.client.post("/login", data={"email": email, "password": PASSWORD})
+        if resp.status_code != 302:
+            raise SystemExit(f"❌ login as {email} failed")
+
+    def get(self, path):
+        resp = self.client.get(path)
+        resp.get_data()
+        resp.close()
+        return resp.status_code
+
+
+class HTTPClient:
+    _CSRF = re.compile(r'name="csrf_token"[^>]*value="([^"]+)"')
+
+    def __init__(self, base_url):
+        self.base = base_url.rstrip("/")
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def login(self, email):
+        page = self.opener.open(self.base + "/login", timeout=30).read().decode()
+        token = self._CSRF.search(page)
+        form = {"email": email, "password": PASSWORD}
+        if token:
+            form["csrf_token"] = token.group(1)
+        with self.opener.open(self.base + "/login", urllib.parse.urlencode(form).encode(), timeout=30) as resp:
+            resp.read()
+            if urllib.parse.urlparse(resp.geturl()).path == "/login":
+                raise SystemExit(f"❌ login as {email} failed")
+
+    def get(self, path):
+        try:
+            with self.opener.open(self.base + path, timeout=60) as resp:
+                while resp.read(65536):
+                    pass
+                return resp.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+
+# -----------------------------
+# Running
+# -----------------------------
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run_scenario(make_client, login, paths, requests, concurrency, warmup):
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    counter = iter(range(requests))
+    clients = []
+    for _ in range(concurrency):
+        c = make_client()
+        if login:
+            c.login(login)
+        for i in range(warmup):
+            c.get(paths[i % len(paths)])
+        clients.append(c)
+
+    def work(c):
+        nonlocal errors
+        local, bad = [], 0
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            t0 = time.perf_counter()
+            status = c.get(paths[i % len(paths)])
+            local.append((time.perf_counter() - t0) * 1000)
+            if status >= 400:
+                bad += 1
+        with lock:
+            latencies.extend(local)
+            errors += bad
+
+    threads = [threading.Thread(target=work, args=(c,)) for c in clients]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / wall, 1) if wall else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+    }
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_gunicorn(uri, uploads, workers, threads):
+    port = _free_port()
+    env = dict(os.environ, DATABASE_URL=uri, UPLOAD_FOLDER=uploads, RATELIMIT_ENABLED="0")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-w", str(workers), "-k", "gthread", "--threads", str(threads),
+         "-b", f"127.0.0.1:{port}", "--log-level", "warning", "app:app"],
+        env=env,
+    )
+    base = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(base + "/robots.txt", timeout=1).read()
+            return proc, base
+        except OSError:
+            if proc.poll() is not None:
+                raise SystemExit("❌ gunicorn exited during startup")
+            time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit("❌ gunicorn did not come up")
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f"\nvs baseline ({baseline['meta'].get('timestamp', '?')}, {baseline['meta'].get('commit', '?')})")
+    for name, cur in results.items():
+        old = baseline["results"].get(name)
+        if not old:
+            continue
+        dp95 = (cur["p95_ms"] - old["p95_ms"]) / old["p95_ms"] if old["p95_ms"] else 0.0
+        drps = (cur["rps"] - old["rps"]) / old["rps"] if old["rps"] else 0.0
+        bad = dp95 > threshold or drps < -threshold
+        if bad:
+            regressions.append(name)
+        print(f"  {name:20s} p95 {dp95:+7.1%}   rps {drps:+7.1%}{'   <-- REGRESSION' if bad else ''}")
+    return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    p = argparse.ArgumentParser(description="Load-test the key endpoints.")
+    p.add_argument("--database", default=None, help="SQLAlchemy URI (default: instance/loadtest.db)")
+    p.add_argument("--uploads", default=None, help="Upload folder (default: instance/loadtest_uploads)")
+    target = p.add_mutually_exclusive_group()
+    target.add_argument("--url", help="Test a running server instead of the in-process client")
+    target.add_argument("--gunicorn", action="store_true", help="Start gunicorn on the database")
+    p.add_argument("--workers", type=int, default=2)
+    p.add_argument("--threads", type=int, default=4)
+    p.add_argument("--requests", type=int, default=200, help="Measured requests per scenario")
+    p.add_argument("--concurrency", type=int, default=4)
+    p.add_argument("--warmup", type=int, default=3, help="Unmeasured requests per client")
+    p.add_argument("--only", action="append", help="Run just this scenario (repeatable)")
+    p.add_argument("--json", help="Write results to this file")
+    p.add_argument("--baseline", help="Compare with an earlier --json file")
+    p.add_argument("--threshold", type=float, default=0.15)
+    p.add_argument("--strict", action="store_true", help="Exit 1 on regressions or errors")
+    args = p.parse_args()
+
+    instance = create_app().instance_path
+    uri = args.database or f"sqlite:///{os.path.join(instance, 'loadtest.db')}"
+    uploads = args.uploads or os.path.join(instance, "loadtest_uploads")
+    app = create_app({"SQLALCHEMY_DATABASE_URI": uri, "UPLOAD_FOLDER": uploads,
+                      "WTF_CSRF_ENABLED": False, "RATELIMIT_ENABLED": False})
+
+    with app.app_context():
+        pdf_id = db.session.execute(text(
+            "SELECT submission_id FROM submission_file ORDER BY submission_id DESC LIMIT 1")).scalar()
+        rows = db.session.execute(text("SELECT count(*) FROM submission")).scalar()
+    if not rows:
+        raise SystemExit(f"❌ {uri} is empty; build it with `python -m scripts.datagen` first.")
+
+    server = None
+    if args.gunicorn:
+        server, base = start_gunicorn(uri, uploads, args.workers, args.threads)
+        mode = f"gunicorn -w {args.workers} --threads {args.threads}"
+        make_client = lambda: HTTPClient(base)
+    elif args.url:
+        mode = args.url
+        make_client = lambda: HTTPClient(args.url)
+    else:
+        mode = "in-process"
+        make_client = lambda: InProcessClient(app)
+
+    print(f"{mode}: {rows} submissions, {args.requests} requests x {args.concurrency} threads per scenario\n")
+    print(f"  {'scenario':20s} {'rps':>8s} {'p50':>8s} {'p95':>8s} {'p99':>8s}  errors")
+    results = {}
+    try:
+        for name, login, path in SCENARIOS:
+            if args.only and name not in args.only:
+                continue
+            if "{pdf_id}" in path and pdf_id is None:
+                print(f"  {name:20s} skipped (no PDFs generated)")
+                continue
+            paths = [path.format(term=urllib.parse.quote_plus(t), pdf_id=pdf_id) for t in SEARCH_TERMS]
+            r = results[name] = run_scenario(make_client, login, paths, args.requests,
+                                             args.concurrency, args.warmup)
+            print(f"  {name:20s} {r['rps']:8.1f} {r['p50_ms']:7.1f}ms {r['p95_ms']:7.1f}ms "
+                  f"{r['p99_ms']:7.1f}ms  {r['errors']}")
+    finally:
+        if server:
+            server.terminate()
+            server.wait(10)
+
+    report = {
+        "meta": {"timestamp": datetime.utcnow().isoformat(timespec="seconds"), "commit": _git_commit(),
+                 "mode": mode, "submissions": rows, "requests": args.requests,
+                 "concurrency": args.concurrency},
+        "results": results,
+    }
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 {args.json}")
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+    if args.strict and (regressions or any(r["errors"] for r in results.values())):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
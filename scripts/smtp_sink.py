@@ -0,0 +1,80 @@
+# scripts/smtp_sink.py
+"""
+Local SMTP sink (aiosmtpd) that accepts every message and keeps it in memory.
+Stand-in for the real relay in development and benchmarks:
+
+  python -m scripts.smtp_sink --port 8025
+  SMTP_HOST=127.0.0.1 SMTP_PORT=8025 SMTP_USE_TLS=0 python mail_worker.py
+
+or programmatically:
+
+  with SMTPSink() as sink:
+      ...  # point SMTP_HOST/SMTP_PORT at sink.port
+      assert len(sink.messages) == 3
+"""
+import argparse
+import socket
+import threading
+import time
+
+from aiosmtpd.controller import Controller
+
+
+class _Collector:
+    def __init__(self, sink):
+        self.sink = sink
+
+    async def handle_DATA(self, server, session, envelope):
+        with self.sink.lock:
+            self.sink.messages.append((envelope.mail_from, list(envelope.rcpt_tos), envelope.content))
+        if self.sink.echo:
+            print(f"[sink] {envelope.mail_from} -> {', '.join(envelope.rcpt_tos)} ({len(envelope.content)} bytes)")
+        return "250 Message accepted for delivery"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class SMTPSink:
+    def __init__(self, host="127.0.0.1", port=None, echo=False):
+        self.host = host
+        self.port = port or _free_port()
+        self.echo = echo
+        self.messages = []
+        self.lock = threading.Lock()
+        self._controller = Controller(_Collector(self), hostname=host, port=self.port)
+
+    def start(self):
+        self._controller.start()
+        return self
+
+    def stop(self):
+        self._controller.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    p = argparse.ArgumentParser(description="Run a local SMTP sink.")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8025)
+    args = p.parse_args()
+
+    with SMTPSink(args.host, args.port, echo=True) as sink:
+        print(f"📭 SMTP sink listening on {sink.host}:{sink.port} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print(f"Received {len(sink.messages)} message(s).")
+
+
+if __name__ == "__main__":
+    main()
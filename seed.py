@@ -49,6 +49,8 @@ with app.app_context():
             status=SubmissionStatus.UNDER_REVIEW,
             assigned_reviewer_id=reviewer.id
         )
+        # the reviewer queue lists the panel (submission_reviewer), as assign_reviewer fills it
+        sub2.reviewers.append(reviewer)
         db.session.add(sub2)
         db.session.commit()
 
@@ -8,18 +8,29 @@ Usage examples:
   python set_roles.py --id 12 --role author
   python set_roles.py --list
   python set_roles.py --create --email dean@uni.edu --username dean --role admin --password secret123
+  python set_roles.py --import cohort.csv --default-role reviewer [--dry-run] [--errors rejected.csv]
+
+--import reads a CSV with a header naming any of: email, username, role,
+password, department. Existing accounts (matched by email, else username)
+get the role/department in their row; new ones are created and need all of
+email, username, password and role. Passwords are hashed on a process pool
+and rows are written in batches (see journal/accounts.py).
 """
 
+import csv
 import sys
 import argparse
-from journal import create_app, db, bcrypt
-from journal.models import User
+from journal import create_app, db
+from journal.accounts import CHUNK, AccountError, import_users, parse_role, read_import
+from journal.models import Role, User
+from journal.passwords import hash_password
 
-VALID_ROLES = {"author", "reviewer", "admin"}
+VALID_ROLES = {r.value for r in Role}
 
 def parse_args():
     p = argparse.ArgumentParser(description="Set or inspect user roles.")
-    ident = p.add_mutually_exclusive_group(required=False)
+    # not mutually exclusive: --create needs both --email and --username
+    ident = p.add_argument_group("user")
     ident.add_argument("--email", help="User email")
     ident.add_argument("--username", help="User username")
     ident.add_argument("--id", type=int, help="User id")
@@ -30,12 +41,21 @@ def parse_args():
                    help="Create the user if not found (requires --email, --username, --password, --role)")
     p.add_argument("--password", help="Password when creating a new user")
     p.add_argument("--department", help="Optional department for new user")
+
+    p.add_argument("--import", dest="import_file", metavar="CSV", help="Bulk create/update users from CSV")
+    p.add_argument("--default-role", help="Role for --import rows whose role column is empty")
+    p.add_argument("--update-passwords", action="store_true",
+                   help="--import: also reset passwords of existing users that have one in the file")
+    p.add_argument("--workers", type=int, default=None, help="--import: hashing processes (default: cores)")
+    p.add_argument("--chunk-size", type=int, default=CHUNK, help=f"--import: rows per batch (default {CHUNK})")
+    p.add_argument("--dry-run", action="store_true", help="--import: validate and report only")
+    p.add_argument("--errors", metavar="CSV", help="--import: write rejected rows here")
     return p.parse_args()
 
 def find_user(email=None, username=None, id_=None):
     q = User.query
     if id_ is not None:
-        return q.get(id_)
+        return db.session.get(User, id_)
     if email:
         return q.filter_by(email=email).first()
     if username:
@@ -50,7 +70,35 @@ def list_users():
     print(f"{'ID':>4}  {'Username':<20}  {'Email':<30}  {'Role':<9}  {'Dept'}")
     print("-" * 80)
     for u in users:
-        print(f"{u.id:>4}  {u.username:<20}  {u.email:<30}  {u.role:<9}  {u.department or ''}")
+        print(f"{u.id:>4}  {u.username:<20}  {u.email:<30}  {u.role.value:<9}  {u.department or ''}")
+
+def run_import(args):
+    try:
+        default_role = parse_role(args.default_role) if args.default_role else None
+        rows = list(read_import(args.import_file))
+    except (AccountError, OSError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    report = import_users(rows, default_role, update_passwords=args.update_passwords,
+                          chunk_size=args.chunk_size, workers=args.workers, dry_run=args.dry_run)
+
+    verb = "Would create" if args.dry_run else "Created"
+    print(f"{'ℹ' if args.dry_run else '✅'} {verb} {report.created}, "
+          f"{'would update' if args.dry_run else 'updated'} {report.updated}, "
+          f"unchanged {report.unchanged}, rejected {len(report.errors)} of {len(rows)} row(s).")
+    for line, who, message in report.errors[:50]:
+        print(f"  line {line}: {who}: {message}")
+    if len(report.errors) > 50:
+        print(f"  ... and {len(report.errors) - 50} more")
+    if args.errors and report.errors:
+        with open(args.errors, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["line", "user", "error"])
+            w.writerows(report.errors)
+        print(f"  Rejected rows written to {args.errors}")
+    if report.errors:
+        sys.exit(2)
 
 def main():
     args = parse_args()
@@ -60,11 +108,15 @@ def main():
         if args.list:
             list_users()
             return
+        if args.import_file:
+            run_import(args)
+            return
 
         # need a target role if modifying
         if args.role:
-            role = args.role.strip().lower()
-            if role not in VALID_ROLES:
+            try:
+                role = parse_role(args.role)
+            except AccountError:
                 print(f"❌ Invalid role '{args.role}'. Valid: {', '.join(sorted(VALID_ROLES))}")
                 sys.exit(1)
         else:
@@ -100,7 +152,7 @@ def main():
                 print("❌ Email already exists.")
                 sys.exit(1)
 
-            hashed = bcrypt.generate_password_hash(args.password).decode("utf-8")
+            hashed = hash_password(args.password)
             user = User(
                 username=args.username,
                 email=args.email,
@@ -110,7 +162,7 @@ def main():
             )
             db.session.add(user)
             db.session.commit()
-            print(f"✅ Created user ID={user.id} username={user.username} email={user.email} role={user.role}")
+            print(f"✅ Created user ID={user.id} username={user.username} email={user.email} role={user.role.value}")
             return
 
         # update role if requested
@@ -118,9 +170,9 @@ def main():
             old = user.role
             user.role = role
             db.session.commit()
-            print(f"✅ Updated role for ID={user.id} ({user.username}): {old} → {user.role}")
+            print(f"✅ Updated role for ID={user.id} ({user.username}): {old.value} → {user.role.value}")
         else:
-            print(f"ℹ User found: ID={user.id} username={user.username} email={user.email} role={user.role}")
+            print(f"ℹ User found: ID={user.id} username={user.username} email={user.email} role={user.role.value}")
 
 if __name__ == "__main__":
     main()
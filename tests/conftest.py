@@ -0,0 +1,77 @@
+# tests/conftest.py
+"""
+Shared fixtures: a fresh app per test on its own SQLite file (TESTING=True, so
+query budgets raise), CSRF and rate limits off, and cheap bcrypt hashes.
+
+    python -m pytest -q
+"""
+import pytest
+
+from journal import bcrypt, create_app, db
+from journal.models import Role, Submission, SubmissionStatus, User
+
+PASSWORD = "password"
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # read before test_config is applied
+    monkeypatch.setenv("UPLOAD_FOLDER", str(tmp_path / "uploads"))
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'test.db'}",
+        "WTF_CSRF_ENABLED": False,
+        "RATELIMIT_ENABLED": False,
+        "BCRYPT_LOG_ROUNDS": 4,
+        "IDENTITY_EPOCH_FILE": str(tmp_path / "identity.epoch"),
+        "SITEMAP_DIR": str(tmp_path / "sitemaps"),
+        "PAGE_CACHE_DIR": str(tmp_path / "pagecache"),
+        "SERVER_NAME": "journal.test",
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    def make(username, role=Role.AUTHOR, **fields):
+        user = User(username=username, email=f"{username}@example.com", role=role,
+                    password=bcrypt.generate_password_hash(PASSWORD).decode("utf-8"), **fields)
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return make
+
+
+@pytest.fixture
+def make_submission(app):
+    def make(author, status=SubmissionStatus.PENDING, reviewers=(), **fields):
+        fields.setdefault("title", f"Submission by {author.username}")
+        fields.setdefault("abstract", "An abstract long enough to be a real one.")
+        sub = Submission(author_id=author.id, status=status, **fields)
+        if reviewers:
+            # as assign_reviewer does: the first reviewer plus the panel
+            sub.assigned_reviewer_id = reviewers[0].id
+            sub.reviewers.extend(reviewers)
+        db.session.add(sub)
+        db.session.commit()
+        return sub
+    return make
+
+
+@pytest.fixture
+def login(client):
+    def login(user):
+        resp = client.post("/login", data={"email": user.email, "password": PASSWORD})
+        assert resp.status_code == 302, "login failed"
+        return client
+    return login
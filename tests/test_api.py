@@ -0,0 +1,69 @@
+# tests/test_api.py
+from types import SimpleNamespace
+
+import pytest
+
+from journal.models import Role, SubmissionStatus
+
+PRIVATE = {"author_id", "assigned_reviewer_id"}
+
+
+@pytest.fixture
+def data(make_user, make_submission):
+    author = make_user("author")
+    reviewer = make_user("reviewer", Role.REVIEWER)
+    published = make_submission(author, SubmissionStatus.ACCEPTED, reviewers=[reviewer], title="Published")
+    draft = make_submission(author, SubmissionStatus.UNDER_REVIEW, reviewers=[reviewer], title="Draft")
+    return SimpleNamespace(author=author, reviewer=reviewer, outsider=make_user("outsider"),
+                           admin=make_user("admin", Role.ADMIN), published=published, draft=draft)
+
+
+def test_accepted_listing_hides_private_fields(client, data):
+    resp = client.get("/api/v1/submissions")
+    assert resp.status_code == 200
+    items = resp.get_json()["data"]
+    assert [s["title"] for s in items] == ["Published"]
+    assert not PRIVATE & items[0].keys()
+
+
+@pytest.mark.parametrize("field", sorted(PRIVATE))
+def test_private_fields_cannot_be_requested_anonymously(client, data, field):
+    assert client.get(f"/api/v1/submissions?fields=id,{field}").status_code == 400
+    assert client.get(f"/api/v1/submissions/{data.published.id}?fields={field}").status_code == 400
+
+
+def test_admin_sees_private_fields_in_accepted_scope(client, data, login):
+    login(data.admin)
+    item = client.get("/api/v1/submissions").get_json()["data"][0]
+    assert item["author_id"] == data.author.id
+    assert item["assigned_reviewer_id"] == data.reviewer.id
+
+
+@pytest.mark.parametrize("who, private", [
+    (None, False), ("outsider", False), ("author", True), ("reviewer", True), ("admin", True),
+])
+def test_published_detail_private_fields_by_viewer(client, data, login, who, private):
+    if who:
+        login(getattr(data, who))
+    item = client.get(f"/api/v1/submissions/{data.published.id}").get_json()["data"]
+    assert item["title"] == "Published"
+    assert (PRIVATE & item.keys()) == (PRIVATE if private else set())
+
+
+def test_unpublished_detail_needs_permission(client, data, login):
+    assert client.get(f"/api/v1/submissions/{data.draft.id}").status_code == 401
+    login(data.outsider)
+    assert client.get(f"/api/v1/submissions/{data.draft.id}").status_code == 403
+
+
+def test_own_scopes_include_private_fields(client, data, login):
+    login(data.author)
+    items = client.get("/api/v1/submissions?scope=authored").get_json()["data"]
+    assert {s["title"] for s in items} == {"Published", "Draft"}
+    assert all(s["author_id"] == data.author.id for s in items)
+
+    client.get("/logout")
+    login(data.reviewer)
+    items = client.get("/api/v1/submissions?scope=reviewing").get_json()["data"]
+    assert {s["assigned_reviewer_id"] for s in items} == {data.reviewer.id}
+    assert client.get("/api/v1/submissions?scope=all").status_code == 403
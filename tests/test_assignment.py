@@ -0,0 +1,130 @@
+# tests/test_assignment.py
+from types import SimpleNamespace
+
+import pytest
+
+from journal import db
+from journal.assignment import (AssignmentConflict, AssignmentError, Pick, apply_assignments,
+                                panel_outcome, panel_reviews)
+from journal.models import OutboundEmail, ReviewDecision, Role, Submission, SubmissionStatus, submission_reviewer
+
+ACCEPT = SimpleNamespace(decision=ReviewDecision.ACCEPT)
+REJECT = SimpleNamespace(decision=ReviewDecision.REJECT)
+MINOR = SimpleNamespace(decision=ReviewDecision.MINOR_REVISION)
+
+
+@pytest.mark.parametrize("reviews, outcome", [
+    ({}, None),
+    ({1: ACCEPT, 2: None}, None),                          # still outstanding
+    ({1: ACCEPT, 2: ACCEPT}, SubmissionStatus.ACCEPTED),
+    ({1: REJECT, 2: REJECT}, SubmissionStatus.REJECTED),
+    ({1: ACCEPT, 2: REJECT}, None),                        # split: the editor decides
+    ({1: ACCEPT, 2: MINOR}, None),
+])
+def test_panel_outcome(reviews, outcome):
+    assert panel_outcome(reviews) == outcome
+
+
+@pytest.fixture
+def people(make_user):
+    return SimpleNamespace(author=make_user("author"),
+                           r1=make_user("r1", Role.REVIEWER),
+                           r2=make_user("r2", Role.REVIEWER),
+                           admin=make_user("admin", Role.ADMIN))
+
+
+def _seats(sub_id):
+    return set(db.session.execute(
+        db.select(submission_reviewer.c.reviewer_id).where(submission_reviewer.c.submission_id == sub_id)
+    ).scalars())
+
+
+def test_apply_assigns_panel_and_notifies(app, people, make_submission):
+    sub = make_submission(people.author)
+    with app.test_request_context():
+        assert apply_assignments([Pick(sub.id, [people.r1.id, people.r2.id])]) == 1
+    db.session.refresh(sub)
+    assert sub.status == SubmissionStatus.UNDER_REVIEW
+    assert sub.assigned_reviewer_id == people.r1.id
+    assert _seats(sub.id) == {people.r1.id, people.r2.id}
+    assert sorted(m.to_addr for m in OutboundEmail.query) == ["r1@example.com", "r2@example.com"]
+
+
+def test_reapplying_takes_and_notifies_only_new_seats(app, people, make_submission):
+    sub = make_submission(people.author, SubmissionStatus.UNDER_REVIEW, reviewers=[people.r1])
+    with app.test_request_context():
+        apply_assignments([Pick(sub.id, [people.r1.id, people.r2.id])], only_pending=False)
+        apply_assignments([Pick(sub.id, [people.r1.id, people.r2.id])], only_pending=False)
+    db.session.refresh(sub)
+    assert sub.assigned_reviewer_id == people.r1.id
+    assert _seats(sub.id) == {people.r1.id, people.r2.id}
+    assert [m.to_addr for m in OutboundEmail.query] == ["r2@example.com"]
+
+
+def test_author_cannot_review_own_submission(app, people, make_submission):
+    author_reviewer = people.r2
+    sub = make_submission(author_reviewer)
+    with app.test_request_context(), pytest.raises(AssignmentError, match="own submission"):
+        apply_assignments([Pick(sub.id, [people.r1.id, author_reviewer.id])])
+    assert _seats(sub.id) == set()
+
+
+def test_only_reviewers_can_be_assigned(app, people, make_submission):
+    sub = make_submission(people.author)
+    with app.test_request_context(), pytest.raises(AssignmentError, match="not reviewers"):
+        apply_assignments([Pick(sub.id, [people.admin.id])])
+
+
+def test_decided_submission_conflicts_and_rolls_back(app, people, make_submission):
+    open_sub = make_submission(people.author)
+    decided = make_submission(people.author, SubmissionStatus.ACCEPTED)
+    with app.test_request_context(), pytest.raises(AssignmentConflict):
+        apply_assignments([Pick(open_sub.id, [people.r1.id]), Pick(decided.id, [people.r1.id])],
+                          only_pending=False)
+    # the whole round is undone, including the submission that could be assigned
+    assert db.session.get(Submission, open_sub.id).status == SubmissionStatus.PENDING
+    assert _seats(open_sub.id) == set()
+    assert OutboundEmail.query.count() == 0
+
+
+def _review(client, sub, decision):
+    return client.post(f"/reviewer/review/{sub.id}", data={
+        "score": "7", "decision": decision, "comment": f"{decision.title()} - detailed comments."})
+
+
+def test_split_panel_waits_for_editor(app, client, people, make_submission, login):
+    sub = make_submission(people.author, SubmissionStatus.UNDER_REVIEW, reviewers=[people.r1, people.r2])
+
+    login(people.r1)
+    assert _review(client, sub, "ACCEPT").status_code == 302
+    client.get("/logout")
+    login(people.r2)
+    assert _review(client, sub, "REJECT").status_code == 302
+    db.session.refresh(sub)
+    assert sub.status == SubmissionStatus.UNDER_REVIEW
+    assert set(panel_reviews(sub)) == {people.r1.id, people.r2.id}
+    assert OutboundEmail.query.filter_by(to_addr="author@example.com").count() == 0
+
+    client.get("/logout")
+    login(people.admin)
+    assert client.post(f"/admin/submissions/{sub.id}/decide", data={"decision": "accept"}).status_code == 302
+    db.session.refresh(sub)
+    assert sub.status == SubmissionStatus.ACCEPTED
+    mail = OutboundEmail.query.filter_by(to_addr="author@example.com").one()
+    assert "Accept - detailed comments." in mail.html_body
+    assert "Reject - detailed comments." in mail.html_body
+
+
+def test_unanimous_panel_decides(app, client, people, make_submission, login):
+    sub = make_submission(people.author, SubmissionStatus.UNDER_REVIEW, reviewers=[people.r1, people.r2])
+    for reviewer in (people.r1, people.r2):
+        login(reviewer)
+        assert _review(client, sub, "REJECT").status_code == 302
+        client.get("/logout")
+    db.session.refresh(sub)
+    assert sub.status == SubmissionStatus.REJECTED
+    assert OutboundEmail.query.filter_by(to_addr="author@example.com").count() == 1
+
+    # a decided submission takes no further reviews
+    login(people.r1)
+    assert _review(client, sub, "ACCEPT").status_code == 403
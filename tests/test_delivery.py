@@ -0,0 +1,57 @@
+# tests/test_delivery.py
+import io
+
+import pytest
+
+from journal import db
+from journal.models import SubmissionStatus, User
+from journal.storage import add_version, get_store
+
+
+@pytest.fixture
+def upload(app):
+    def upload(sub, data: bytes):
+        add_version(sub, get_store().put(io.BytesIO(data)), "paper.pdf", sub.author_id)
+        db.session.commit()
+    return upload
+
+
+@pytest.fixture
+def article(make_user, make_submission, upload):
+    sub = make_submission(make_user("author"), SubmissionStatus.ACCEPTED)
+    upload(sub, b"%PDF-1.4 version one")
+    return sub
+
+
+def test_public_pdf_is_shared_but_revalidated(client, article):
+    resp = client.get(f"/article/{article.id}/pdf")
+    assert resp.status_code == 200 and resp.data == b"%PDF-1.4 version one"
+    cc = resp.cache_control
+    assert cc.public and cc.max_age == 300
+    assert not cc.immutable
+
+    again = client.get(f"/article/{article.id}/pdf", headers={"If-None-Match": resp.headers["ETag"]})
+    assert again.status_code == 304
+
+
+def test_new_version_replaces_cached_copy(client, article, upload):
+    old = client.get(f"/article/{article.id}/pdf")
+    upload(article, b"%PDF-1.4 version two")
+
+    resp = client.get(f"/article/{article.id}/pdf", headers={"If-None-Match": old.headers["ETag"]})
+    assert resp.status_code == 200 and resp.data == b"%PDF-1.4 version two"
+    assert resp.headers["ETag"] != old.headers["ETag"]
+
+
+def test_retracted_pdf_is_gone(client, article):
+    assert client.get(f"/article/{article.id}/pdf").status_code == 200
+    article.status = SubmissionStatus.REJECTED
+    db.session.commit()
+    assert client.get(f"/article/{article.id}/pdf").status_code == 403
+
+
+def test_private_download_is_not_shared(client, article, login):
+    login(db.session.get(User, article.author_id))
+    resp = client.get(f"/submission/{article.id}/download")
+    assert resp.status_code == 200
+    assert resp.cache_control.private and resp.cache_control.no_cache
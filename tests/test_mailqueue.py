@@ -0,0 +1,59 @@
+# tests/test_mailqueue.py
+import pytest
+
+from journal import db
+from journal.mailer import _smtp_config, send_email
+from journal.mailqueue import SMTPPool, drain
+from journal.models import EmailStatus, OutboundEmail
+from scripts.smtp_sink import SMTPSink, _free_port
+
+
+@pytest.fixture
+def sink():
+    with SMTPSink() as sink:
+        yield sink
+
+
+@pytest.fixture
+def pool(sink):
+    cfg = dict(_smtp_config(), host=sink.host, port=sink.port, user="", password="", use_tls=False)
+    pool = SMTPPool(cfg)
+    yield pool
+    pool.close()
+
+
+def test_outbox_drains_into_sink(app, sink, pool):
+    for i in range(3):
+        send_email(f"user{i}@example.com", f"Subject {i}", f"<p>Body {i}</p>", commit=False)
+    db.session.commit()
+
+    assert drain(app, pool) == 3
+    assert sorted(rcpts[0] for _, rcpts, _ in sink.messages) == \
+        ["user0@example.com", "user1@example.com", "user2@example.com"]
+    # one pooled session for the whole batch
+    assert pool.connects == 1
+    assert {row.status for row in OutboundEmail.query} == {EmailStatus.SENT}
+    # nothing left to send
+    assert drain(app, pool) == 0
+    assert len(sink.messages) == 3
+
+
+def test_uncommitted_mail_is_not_sent(app, sink, pool):
+    send_email("gone@example.com", "Subject", "<p>Body</p>", commit=False)
+    db.session.rollback()
+
+    assert drain(app, pool) == 0
+    assert sink.messages == []
+
+
+def test_failed_send_is_retried_later(app):
+    # nothing listens on a free port
+    cfg = dict(_smtp_config(), host="127.0.0.1", port=_free_port(), user="", password="", use_tls=False)
+    send_email("later@example.com", "Subject", "<p>Body</p>")
+
+    assert drain(app, SMTPPool(cfg)) == 1
+    row = OutboundEmail.query.one()
+    db.session.refresh(row)
+    assert row.status == EmailStatus.PENDING
+    assert row.attempts == 1
+    assert row.last_error
@@ -0,0 +1,23 @@
+# tests/test_notifications.py
+from journal import db
+from journal.models import MailEvent, OutboundEmail
+from journal.notifications import build_digests, notify
+
+
+def test_digest_renders_decision_comments(app):
+    app.config["MAIL_DIGEST_WINDOW"] = 900
+    with app.test_request_context():
+        notify("author@example.com", "author", "decision", author_name="author", title="First paper",
+               decision="accepted", comments=["Clear and well argued.", "Fix the typos in section 2."])
+        notify("author@example.com", "author", "decision", author_name="author", title="Second paper",
+               decision="rejected", comments=[])
+        db.session.commit()
+
+    assert build_digests(app) == 0          # still inside the window
+    assert build_digests(app, force=True) == 1
+    mail = OutboundEmail.query.one()
+    assert mail.subject == "FACOMS Journal — 2 updates for you"
+    for text in ("First paper", "Second paper", "Clear and well argued.", "Fix the typos in section 2."):
+        assert text in mail.html_body
+    assert mail.html_body.count("<blockquote") == 2
+    assert MailEvent.query.filter(MailEvent.digested_at.is_(None)).count() == 0
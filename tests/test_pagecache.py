@@ -0,0 +1,132 @@
+# tests/test_pagecache.py
+import fnmatch
+
+import pytest
+
+from journal import db
+from journal.models import SubmissionStatus
+from journal.pagecache import PageCache, RedisPageCache
+
+
+class FakeRedis:
+    """The slice of redis-py that RedisPageCache uses; values come back as bytes."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.gets = 0
+
+    def get(self, key):
+        self.gets += 1
+        value = self.data.get(key)
+        return value.encode("utf-8") if value is not None else None
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.ttls[key] = ex
+
+    def scan_iter(self, match="*"):
+        return [k for k in list(self.data) if fnmatch.fnmatchcase(k, match)]
+
+    def delete(self, key):
+        self.data.pop(key, None)
+        self.ttls.pop(key, None)
+
+
+@pytest.fixture
+def redis(app):
+    client = FakeRedis()
+    app.config["PAGE_CACHE"] = "redis"
+    app.extensions["page_cache"] = RedisPageCache(client)
+    return client
+
+
+@pytest.fixture
+def article(make_user, make_submission):
+    return make_submission(make_user("author"), SubmissionStatus.ACCEPTED, title="Original title")
+
+
+def _fragments(client):
+    return [k for k in client.data if k.startswith("journal:page:frag:")]
+
+
+def test_backend_round_trip(redis):
+    cache = RedisPageCache(redis)
+    cache.set("a", "ä", ttl=30)
+    assert cache.get("a") == "ä"
+    assert redis.ttls["journal:page:a"] == 30
+    cache.set("b", "x")
+    assert redis.ttls["journal:page:b"] is None
+    cache.clear()
+    assert cache.get("a") is None and redis.data == {}
+
+
+def test_article_is_served_from_cache(app, client, redis, article):
+    first = client.get(f"/article/{article.id}")
+    assert first.status_code == 200 and b"Original title" in first.data
+    assert len(_fragments(redis)) == 1
+
+    # a miss stores the fragment; a hit serves whatever is stored
+    redis.data[_fragments(redis)[0]] = "<p>from cache</p>"
+    assert b"from cache" in client.get(f"/article/{article.id}").data
+
+    # same fragment and viewer: 304 without a body
+    again = client.get(f"/article/{article.id}", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+
+
+def test_commit_invalidates_article_and_issues(app, client, redis, article):
+    client.get(f"/article/{article.id}")
+    client.get("/issues")
+    before = len(_fragments(redis))
+
+    article.title = "Revised title"
+    db.session.commit()
+
+    resp = client.get(f"/article/{article.id}")
+    assert b"Revised title" in resp.data
+    assert b"Revised title" in client.get("/issues").data
+    assert len(_fragments(redis)) == before + 2
+
+
+def test_unrelated_commit_keeps_fragments(app, client, redis, article, make_user, make_submission):
+    client.get(f"/article/{article.id}")
+    versions = {k: v for k, v in redis.data.items() if k.startswith("journal:page:ver:")}
+
+    # pending submissions are not shown publicly
+    make_submission(make_user("other"), title="Draft")
+    assert {k: v for k, v in redis.data.items() if k.startswith("journal:page:ver:")} == versions
+
+
+def test_backend_outage_renders_uncached(app, client, redis, article):
+    def down(*args, **kwargs):
+        raise ConnectionError("redis is down")
+    redis.get = down
+
+    resp = client.get(f"/article/{article.id}")
+    assert resp.status_code == 200 and b"Original title" in resp.data
+
+
+def test_issues_key_ignores_unrelated_args(client, redis, article):
+    client.get("/issues")
+    for junk in ("?x=1", "?x=2", "?utm_source=feed", "?after="):
+        assert client.get("/issues" + junk).status_code == 200
+    assert len(_fragments(redis)) == 1
+
+    # a different page size is a different page
+    client.get("/issues?per_page=5")
+    client.get("/issues?per_page=5&x=1")
+    assert len(_fragments(redis)) == 2
+    assert client.get("/issues?after=not-a-cursor").status_code == 400
+
+
+def test_incomplete_backend_fails_at_construction():
+    class NoClear(PageCache):
+        def get(self, key):
+            return None
+
+        def set(self, key, value, ttl=0):
+            pass
+
+    with pytest.raises(TypeError, match="clear"):
+        NoClear()
@@ -0,0 +1,54 @@
+# tests/test_querybudget.py
+import pytest
+from flask import g
+
+from journal.models import Role, SubmissionStatus
+from journal.querybudget import QueryBudgetExceeded, query_budget
+
+
+@pytest.fixture
+def listing_data(make_user, make_submission):
+    author = make_user("author")
+    reviewer = make_user("reviewer", Role.REVIEWER)
+    admin = make_user("admin", Role.ADMIN)
+    for i in range(30):
+        make_submission(author, SubmissionStatus.ACCEPTED if i % 2 else SubmissionStatus.UNDER_REVIEW,
+                        reviewers=[reviewer], title=f"Paper {i}")
+    return author, reviewer, admin
+
+
+
+@pytest.mark.parametrize("who, url", [
+    ("author", "/dashboard"),
+    ("author", "/submissions"),
+    ("reviewer", "/reviewer/queue"),
+    ("admin", "/admin/submissions"),
+    ("admin", "/admin/users"),
+    ("author", "/api/v1/submissions?scope=authored"),
+    ("reviewer", "/api/v1/submissions?scope=reviewing"),
+])
+def test_listing_stays_within_budget(listing_data, login, who, url):
+    author, reviewer, admin = listing_data
+    client = login({"author": author, "reviewer": reviewer, "admin": admin}[who])
+    # QUERY_BUDGET_MODE is "raise" under TESTING: an overrun fails the request
+    assert client.get(url).status_code == 200
+    assert client.get(url + ("&" if "?" in url else "?") + "per_page=5").status_code == 200
+
+
+def test_public_listings_within_budget(listing_data, client):
+    assert client.get("/issues").status_code == 200
+    assert client.get("/api/v1/submissions").status_code == 200
+
+
+def test_overrun_raises(app, client, make_user):
+    make_user("someone")
+
+    @query_budget(0)
+    def chatty():
+        from journal.models import User
+        User.query.all()
+        return str(g.query_count)
+
+    app.add_url_rule("/_chatty", "chatty", chatty)
+    with pytest.raises(QueryBudgetExceeded):
+        client.get("/_chatty")
@@ -0,0 +1,42 @@
+# tests/test_search.py
+import pytest
+
+from journal.models import SubmissionStatus
+from journal.search import fts_available, search_submissions
+
+@pytest.fixture(autouse=True)
+def needs_fts(app):
+    if not fts_available():
+        pytest.skip("SQLite built without FTS5")
+
+
+@pytest.fixture
+def articles(make_user, make_submission):
+    author = make_user("author")
+    return {
+        "title": make_submission(author, SubmissionStatus.ACCEPTED, title="Quantum annealing for scheduling",
+                                 abstract="We study timetables.", keywords="optimisation"),
+        "abstract": make_submission(author, SubmissionStatus.ACCEPTED, title="Timetables",
+                                    abstract="A classical baseline against quantum hardware.",
+                                    keywords="baselines"),
+        "keywords": make_submission(author, SubmissionStatus.ACCEPTED, title="Lattice models",
+                                    abstract="Exact results for small lattices.", keywords="spin, quantum"),
+        "hidden": make_submission(author, SubmissionStatus.UNDER_REVIEW, title="Quantum draft"),
+    }
+
+
+def test_snippet_comes_from_the_matching_column(app, articles):
+    page = search_submissions("quantum")
+    assert {s.id for s in page.items} == {articles[k].id for k in ("title", "abstract", "keywords")}
+    # bm25 weights: title > keywords > abstract
+    assert page.items[0].id == articles["title"].id
+    for sub in page.items:
+        assert "<mark>" in str(page.snippets[sub.id]).lower()
+    assert "annealing" in str(page.snippets[articles["title"].id])
+    assert "spin" in str(page.snippets[articles["keywords"].id])
+
+
+def test_snippet_is_escaped(app, make_user, make_submission):
+    make_submission(make_user("author"), SubmissionStatus.ACCEPTED, title="<script>quantum</script>")
+    snippet = str(search_submissions("quantum").snippets.popitem()[1])
+    assert "<script>" not in snippet and "&lt;script&gt;" in snippet
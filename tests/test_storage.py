@@ -0,0 +1,31 @@
+# tests/test_storage.py
+import io
+
+import pytest
+
+from journal.storage import FileStore, LocalFileStore
+
+
+def test_identical_uploads_share_one_object(tmp_path):
+    store = LocalFileStore(str(tmp_path))
+    first = store.put(io.BytesIO(b"%PDF-1.4 same bytes"))
+    second = store.put(io.BytesIO(b"%PDF-1.4 same bytes"))
+    assert first.sha256 == second.sha256
+    assert (first.created, second.created) == (True, False)
+    assert store.exists(first.sha256)
+    assert open(store.local_path(first.sha256), "rb").read() == b"%PDF-1.4 same bytes"
+    # nothing left behind in tmp/
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+    store.delete(first.sha256)
+    assert not store.exists(first.sha256)
+    store.delete(first.sha256)      # already gone: no error
+
+
+def test_incomplete_backend_fails_at_construction():
+    class PutOnly(FileStore):
+        def put(self, stream):
+            raise OSError("read-only")
+
+    with pytest.raises(TypeError, match="delete|exists"):
+        PutOnly()
@@ -0,0 +1,64 @@
+# upgrade_listing_indexes.py
+"""
+Add the composite listing/queue/review indexes (see journal/models.py) to an
+existing database; db.create_all() only creates them for new tables.
+
+Safe to re-run: every index is CREATE INDEX IF NOT EXISTS, followed by
+ANALYZE so the planner picks them up.
+
+  python upgrade_listing_indexes.py            # create missing indexes
+  python upgrade_listing_indexes.py --dry-run  # list what is missing
+"""
+import argparse
+
+from sqlalchemy import inspect, text
+from journal import create_app, db
+
+INDEXES = [
+    ("ix_user_role_username", "user", ["role", "username"]),
+    ("ix_submission_created_at", "submission", ["created_at"]),
+    ("ix_submission_status_created_at", "submission", ["status", "created_at"]),
+    ("ix_submission_author_created_at", "submission", ["author_id", "created_at"]),
+    ("ix_submission_reviewer_created_at", "submission", ["assigned_reviewer_id", "created_at"]),
+    ("ix_submission_issue_status_created_at", "submission", ["issue_id", "status", "created_at"]),
+    ("ix_review_submission_created_at", "review", ["submission_id", "created_at"]),
+    ("ix_review_reviewer_created_at", "review", ["reviewer_id", "created_at"]),
+    ("ix_issue_year_volume_number", "issue", ["year", "volume", "number"]),
+]
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Create the composite listing indexes on an existing database.")
+    p.add_argument("--dry-run", action="store_true", help="Only list missing indexes")
+    return p.parse_args()
+
+def main():
+    args = parse_args()
+    app = create_app()
+    with app.app_context():
+        insp = inspect(db.engine)
+        tables = set(insp.get_table_names())
+        existing = {t: {ix["name"] for ix in insp.get_indexes(t)} for t in tables}
+
+        created = 0
+        for name, table, columns in INDEXES:
+            if table not in tables:
+                print(f"⚠️  {name}: table {table} does not exist, skipped.")
+                continue
+            if name in existing[table]:
+                continue
+            print(f"➕ {name} ON {table} ({', '.join(columns)})")
+            if not args.dry_run:
+                db.session.execute(text(
+                    f'CREATE INDEX IF NOT EXISTS {name} ON "{table}" ({", ".join(columns)})'))
+            created += 1
+
+        if args.dry_run:
+            print(f"Dry run: {created} index(es) missing.")
+            return
+        if created:
+            db.session.execute(text("ANALYZE"))
+        db.session.commit()
+        print(f"✅ Created {created} index(es).")
+
+if __name__ == "__main__":
+    main()
@@ -17,4 +17,17 @@ with app.app_context():
         """))
         db.session.commit()
         print("✔ Created table submission_reviewer")
+    db.session.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_submission_reviewer_reviewer "
+        "ON submission_reviewer (reviewer_id, submission_id)"))
+    # every current assignment also goes on the panel (journal/assignment.py)
+    n = db.session.execute(text("""
+        INSERT INTO submission_reviewer (submission_id, reviewer_id)
+        SELECT s.id, s.assigned_reviewer_id FROM submission s
+        WHERE s.assigned_reviewer_id IS NOT NULL AND NOT EXISTS (
+            SELECT 1 FROM submission_reviewer sr
+            WHERE sr.submission_id = s.id AND sr.reviewer_id = s.assigned_reviewer_id)
+    """)).rowcount
+    db.session.commit()
+    print(f"✔ Backfilled {n} assignment(s)")
     print("✅ Done.")
@@ -0,0 +1,90 @@
+# upgrade_submission_files.py
+"""
+Move manuscripts into the content-addressed store (journal.storage).
+
+- creates submission_file if missing, adds sha256/size columns to an older one
+- for every instance/uploads/submission_<id>.pdf without a version record:
+  stores the bytes, records it as version 1 and removes the flat file
+
+Safe to re-run.
+
+  python upgrade_submission_files.py            # migrate
+  python upgrade_submission_files.py --dry-run  # report only
+  python upgrade_submission_files.py --keep     # leave the flat files in place
+"""
+import argparse
+import os
+import re
+
+from sqlalchemy import inspect, text
+from journal import create_app, db
+from journal.models import Submission, SubmissionFile
+from journal.storage import add_version, get_store
+
+LEGACY = re.compile(r"^submission_(\d+)\.pdf$")
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Migrate flat uploads into the content-addressed store.")
+    p.add_argument("--dry-run", action="store_true")
+    p.add_argument("--keep", action="store_true", help="Don't delete migrated flat files")
+    return p.parse_args()
+
+def ensure_schema():
+    insp = inspect(db.engine)
+    if 'submission_file' not in insp.get_table_names():
+        print("➕ Creating table submission_file ...")
+        SubmissionFile.__table__.create(db.engine)
+        return
+    cols = {c['name'] for c in insp.get_columns('submission_file')}
+    if 'sha256' not in cols:
+        print("➕ Adding submission_file.sha256 ...")
+        db.session.execute(text("ALTER TABLE submission_file ADD COLUMN sha256 VARCHAR(64)"))
+        db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_submission_file_sha256 ON submission_file (sha256)"))
+    if 'size' not in cols:
+        print("➕ Adding submission_file.size ...")
+        db.session.execute(text("ALTER TABLE submission_file ADD COLUMN size INTEGER"))
+    db.session.commit()
+
+def main():
+    args = parse_args()
+    app = create_app()
+    with app.app_context():
+        if not args.dry_run:
+            ensure_schema()
+
+        upload_dir = app.config['UPLOAD_FOLDER']
+        store = get_store(app)
+        versioned = {sid for (sid,) in db.session.query(SubmissionFile.submission_id).distinct()}
+
+        migrated = skipped = orphans = 0
+        with os.scandir(upload_dir) as it:
+            for entry in it:
+                m = LEGACY.match(entry.name)
+                if not m or not entry.is_file():
+                    continue
+                sid = int(m.group(1))
+                if sid in versioned:
+                    skipped += 1
+                    continue
+                sub = db.session.get(Submission, sid)
+                if sub is None:
+                    orphans += 1
+                    print(f"⚠️  {entry.name}: no submission {sid}, left in place.")
+                    continue
+                if args.dry_run:
+                    migrated += 1
+                    continue
+
+                with open(entry.path, "rb") as f:
+                    blob = store.put(f)
+                add_version(sub, blob, entry.name, sub.author_id, note="migrated from flat upload")
+                db.session.commit()
+                if not args.keep:
+                    os.remove(entry.path)
+                migrated += 1
+
+        verb = "Would migrate" if args.dry_run else "Migrated"
+        print(f"✅ {verb} {migrated} file(s); {skipped} already versioned, {orphans} orphan(s).")
+
+if __name__ == "__main__":
+    main()